@@ -0,0 +1,218 @@
+# bench/suite.py
+"""
+Benchmarks de rendimiento con conjuntos fijos (semilla) y resultados en JSON,
+para comparar corridas y marcar regresiones.
+
+- solvers: por backend (kociemba y los métodos de HybridSolver) y por conjunto
+  (scrambles de profundidad 1..25 y estados aleatorios uniformes): tasa de
+  resolución (verificada aplicando la solución), largo medio, latencia p50/p99,
+  throughput y pico de RSS del proceso.
+- micro: Cube3x3Env.step / state_embedding / copy, sims/s de run_mcts y
+  forward de PolicyValueNet a varios tamaños de lote.
+
+    results = run_suite(methods=["kociemba", "mcts"])
+    regressions = compare(results, json.load(open("baseline.json")))
+"""
+import json, platform, resource, sys, time
+from typing import Callable, Dict, Iterable, List, Optional
+import numpy as np
+from envs.cube3x3 import MOVES, ORDER, SOLVED_STATE
+from utils.move_compiler import FACES, compile_moves
+
+DEPTHS = tuple(range(1, 26))
+# presupuestos acotados: un ítem que no sale no tiene que frenar toda la corrida
+BENCH_OPTIONS = {
+    "mcts": dict(sims=32, max_steps=30),
+    "astar": dict(max_nodes=20_000, time_limit=2.0),
+    "beam": dict(beam_width=128, max_depth=30),
+    "ida": dict(time_limit=5.0),
+}
+# métricas comparables y hacia dónde es mejor
+HIGHER_IS_BETTER = ("solve_rate", "items_per_sec", "ops_per_sec", "sims_per_sec", "rows_per_sec")
+LOWER_IS_BETTER = ("mean_moves", "p50_ms", "p99_ms", "peak_rss_mb")
+
+# ---------- conjuntos fijos ----------
+def scramble_set(depth: int, n: int, seed: int = 0) -> List[str]:
+    """
+    n scrambles de exactamente `depth` giros: nunca dos seguidos de la misma cara
+    ni caras opuestas fuera de orden canónico, así no se simplifican.
+    """
+    rng = np.random.default_rng([seed, depth])
+    out = []
+    for _ in range(n):
+        seq, prev = [], None
+        while len(seq) < depth:
+            m = MOVES[rng.integers(len(MOVES))]
+            if prev is not None and (m[0] == prev or (FACES.index(m[0]) // 2 == FACES.index(prev) // 2
+                                                     and FACES.index(m[0]) < FACES.index(prev))):
+                continue
+            seq.append(m)
+            prev = m[0]
+        out.append(" ".join(seq))
+    return out
+
+def random_state_set(n: int, seed: int = 0) -> List[str]:
+    """n estados uniformes (facelets URFDLB), la distribución real de un cubo mezclado."""
+    from solver.cubie import random_cubie, to_stickers
+    rng = np.random.default_rng([seed, 1000])
+    return ["".join(ORDER[c] for c in to_stickers(random_cubie(rng))) for _ in range(n)]
+
+def bench_sets(depths: Iterable[int] = DEPTHS, per_depth: int = 3, n_random: int = 10,
+               seed: int = 0) -> Dict[str, List[str]]:
+    sets = {f"depth_{d:02d}": scramble_set(d, per_depth, seed) for d in depths}
+    if n_random:
+        sets["random"] = random_state_set(n_random, seed)
+    return sets
+
+# ---------- helpers ----------
+def peak_rss_mb() -> float:
+    """Pico de RSS del proceso (acumulado: no baja entre backends)."""
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return kb / (1024 * 1024) if sys.platform == "darwin" else kb / 1024
+
+def _pct(ms: List[float], q: float) -> Optional[float]:
+    return float(np.percentile(ms, q)) if ms else None
+
+def _rate(fn: Callable[[], object], min_time: float = 0.25, reps: int = 1) -> float:
+    """Llamadas por segundo de fn (repite hasta min_time; reps = operaciones por llamada)."""
+    fn()  # calentamiento
+    n, t0 = 0, time.perf_counter()
+    while True:
+        fn()
+        n += 1
+        dt = time.perf_counter() - t0
+        if dt >= min_time:
+            return n * reps / dt
+
+def _solver_fn(method: str, options: dict) -> Optional[Callable[[str], Optional[str]]]:
+    """cubo (scramble o facelets) -> solución o None; None si el backend no está disponible."""
+    if method == "kociemba":
+        import kociemba
+        from utils.move_compiler import to_facelets
+        return lambda cube: kociemba.solve(to_facelets(cube))
+    from solver.hybrid_solver import CKPT_3x3, HybridSolver
+    net = None
+    if method != "ida":
+        from models.registry import get_model
+        net = get_model(CKPT_3x3)
+        if net is None:
+            return None
+    return lambda cube: HybridSolver("3x3", method=method, net=net, **options).search(cube)
+
+# ---------- benchmarks ----------
+def bench_solver(method: str, sets: Dict[str, List[str]], options: Optional[dict] = None) -> Optional[dict]:
+    from utils.move_compiler import to_state
+    options = dict(BENCH_OPTIONS.get(method, {}), **(options or {}))
+    solve = _solver_fn(method, options)
+    if solve is None:
+        return None
+    solve(sets[next(iter(sets))][0])  # calentamiento: tablas, modelo, JIT de numpy
+    per_set = {}
+    for name, items in sets.items():
+        ms, lengths, solved = [], [], 0
+        t_set = time.perf_counter()
+        for cube in items:
+            t0 = time.perf_counter()
+            try:
+                sol = solve(cube)
+            except Exception:
+                sol = None
+            ms.append((time.perf_counter() - t0) * 1000)
+            if sol is not None and np.array_equal(compile_moves(sol).apply(to_state(cube)), SOLVED_STATE):
+                solved += 1
+                lengths.append(len(sol.split()))
+        wall = time.perf_counter() - t_set
+        per_set[name] = {"n": len(items), "solve_rate": solved / len(items),
+                         "mean_moves": float(np.mean(lengths)) if lengths else None,
+                         "p50_ms": _pct(ms, 50), "p99_ms": _pct(ms, 99),
+                         "items_per_sec": len(items) / wall if wall > 0 else None}
+    return {"options": options, "sets": per_set, "peak_rss_mb": peak_rss_mb()}
+
+def bench_micro(batch_sizes=(1, 16, 64, 256), mcts_sims: int = 128, min_time: float = 0.25) -> dict:
+    import torch
+    from envs.cube3x3 import Cube3x3Env
+    from models.policy_value_net import PolicyValueNet
+    from rl.mcts import run_mcts
+
+    env = Cube3x3Env()
+    env.apply_moves("R U F' L2 D B'")
+    out = {
+        "env_step": {"ops_per_sec": _rate(lambda: env.step(3), min_time, reps=1)},
+        "env_state_embedding": {"ops_per_sec": _rate(env.state_embedding, min_time)},
+        "env_copy": {"ops_per_sec": _rate(env.copy, min_time)},
+    }
+    torch.manual_seed(0)
+    net = PolicyValueNet(324, 18).eval()
+    for b in (1, 8):
+        out[f"run_mcts_batch{b}"] = {"sims_per_sec": _rate(
+            lambda: run_mcts(env, net, n_sims=mcts_sims, batch_size=b), min_time, reps=mcts_sims)}
+    for b in batch_sizes:
+        x = torch.randn(b, 324)
+        with torch.inference_mode():
+            rate = _rate(lambda: net(x), min_time, reps=b)
+        out[f"forward_batch{b}"] = {"rows_per_sec": rate, "ms_per_call": 1000 * b / rate}
+    return out
+
+def run_suite(methods: Iterable[str] = ("kociemba", "mcts", "astar", "beam"), depths: Iterable[int] = DEPTHS,
+              per_depth: int = 3, n_random: int = 10, seed: int = 0, micro: bool = True,
+              options: Optional[Dict[str, dict]] = None, log=print) -> dict:
+    import torch
+    sets = bench_sets(depths, per_depth, n_random, seed)
+    results = {"meta": {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                        "torch": torch.__version__, "platform": platform.platform(),
+                        "seed": seed, "per_depth": per_depth, "n_random": n_random},
+               "solvers": {}, "micro": {}}
+    for method in methods:
+        t0 = time.perf_counter()
+        res = bench_solver(method, sets, (options or {}).get(method))
+        if res is None:
+            log(f"[bench] {method}: sin modelo entrenado, se saltea")
+            continue
+        results["solvers"][method] = res
+        rates = [s["solve_rate"] for s in res["sets"].values()]
+        log(f"[bench] {method}: tasa media {np.mean(rates):.2f} en {len(sets)} conjuntos "
+            f"({time.perf_counter() - t0:.1f}s)")
+    if micro:
+        results["micro"] = bench_micro()
+        log("[bench] micro: " + ", ".join(f"{k} {next(iter(v.values())):,.0f}/s" for k, v in results["micro"].items()))
+    return results
+
+# ---------- comparación ----------
+def _flatten(d: dict, prefix: str = "") -> Dict[str, float]:
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}.{k}" if prefix else k
+        if isinstance(v, dict):
+            out.update(_flatten(v, key))
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            out[key] = float(v)
+    return out
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.2) -> List[str]:
+    """
+    Métricas que empeoraron más que `tolerance` (relativo) respecto del baseline.
+    Una métrica del baseline que falta en esta corrida (un backend que se salteó,
+    un benchmark que desapareció) también cuenta como regresión.
+    """
+    cur = _flatten({k: current.get(k, {}) for k in ("solvers", "micro")})
+    base = _flatten({k: baseline.get(k, {}) for k in ("solvers", "micro")})
+    regressions = []
+    for key, b in sorted(base.items()):
+        c = cur.get(key)
+        metric = key.rsplit(".", 1)[-1]
+        if metric not in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+            continue
+        if c is None:
+            regressions.append(f"{key}: falta en esta corrida (baseline {b:.4g})")
+            continue
+        if b == 0:
+            continue
+        if metric in HIGHER_IS_BETTER and c < b * (1 - tolerance):
+            regressions.append(f"{key}: {c:.4g} < {b:.4g}")
+        elif metric in LOWER_IS_BETTER and c > b * (1 + tolerance):
+            regressions.append(f"{key}: {c:.4g} > {b:.4g}")
+    return regressions
+
+def save(results: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
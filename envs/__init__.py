@@ -1 +1 @@
-from .cube3x3 import Cube3x3Env, MOVES
\ No newline at end of file
+from .cube3x3 import Cube3x3Env, VectorCube3x3Env, MOVES
\ No newline at end of file
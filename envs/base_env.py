@@ -34,3 +34,43 @@ class BasePuzzleEnv(ABC):
 
     @abstractmethod
     def action_to_move(self, action: int) -> str: ...
+
+
+class BaseVectorPuzzleEnv(ABC):
+    """
+    Versión por lotes de BasePuzzleEnv: N puzzles avanzan juntos.
+    Las acciones, máscaras y embeddings son arrays con N filas.
+    """
+
+    @property
+    @abstractmethod
+    def num_envs(self) -> int: ...
+
+    @abstractmethod
+    def reset_to_solved(self) -> None: ...
+
+    @abstractmethod
+    def scramble(self, n_moves: Any) -> None:
+        """n_moves: int (todos igual) o array de N largos."""
+        ...
+
+    @abstractmethod
+    def is_solved(self) -> "numpy.ndarray":
+        """Máscara bool de forma (N,)."""
+        ...
+
+    @abstractmethod
+    def step(self, actions: "numpy.ndarray") -> None:
+        """actions: (N,) una acción por fila."""
+        ...
+
+    @abstractmethod
+    def copy(self) -> "BaseVectorPuzzleEnv": ...
+
+    @abstractmethod
+    def state_embedding(self) -> "numpy.ndarray":
+        """Embeddings apilados, forma (N, D)."""
+        ...
+
+    @abstractmethod
+    def get_env(self, i: int) -> BasePuzzleEnv: ...
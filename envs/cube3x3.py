@@ -1,9 +1,9 @@
 # envs/cube3x3_env.py
-import random
+import copy, random
 import numpy as np
 import pycuber as pc
 from typing import List
-from .base_env import BasePuzzleEnv
+from .base_env import BasePuzzleEnv, BaseVectorPuzzleEnv
 
 ORDER = "URFDLB"
 # 18 movimientos estándar
@@ -13,6 +13,91 @@ MOVES = [
 ]
 MOVE_TO_IDX = {m:i for i,m in enumerate(MOVES)}
 
+N_STICKERS = 54
+N_COLORS = 6
+STATE_DIM = N_STICKERS * N_COLORS  # 324
+
+# ---------- motor de permutaciones ----------
+# Sticker i = 9*cara + 3*fila + col, caras en orden URFDLB (mismo layout que kociemba).
+# Cada sticker se ubica por (posición del cubie, normal) en coordenadas x=R, y=U, z=F.
+_FACE_NORMAL = {
+    "U": (0, 1, 0), "R": (1, 0, 0), "F": (0, 0, 1),
+    "D": (0, -1, 0), "L": (-1, 0, 0), "B": (0, 0, -1),
+}
+
+def _sticker_pos(f, r, c):
+    if f == "U": return (c - 1, 1, r - 1)
+    if f == "R": return (1, 1 - r, 1 - c)
+    if f == "F": return (c - 1, 1 - r, 1)
+    if f == "D": return (c - 1, -1, 1 - r)
+    if f == "L": return (-1, 1 - r, c - 1)
+    if f == "B": return (1 - c, 1 - r, -1)
+    raise ValueError(f)
+
+def _rotate_cw(v, axis):
+    """Cuarto de vuelta horario mirando la cara desde afuera (= -90° sobre su normal)."""
+    x, y, z = v
+    if axis == (0, 1, 0):  return (-z, y, x)
+    if axis == (0, -1, 0): return (z, y, -x)
+    if axis == (1, 0, 0):  return (x, z, -y)
+    if axis == (-1, 0, 0): return (x, -z, y)
+    if axis == (0, 0, 1):  return (y, -x, z)
+    if axis == (0, 0, -1): return (-y, x, z)
+    raise ValueError(axis)
+
+def _build_perms() -> np.ndarray:
+    key_to_idx = {}
+    for fi, f in enumerate(ORDER):
+        for r in range(3):
+            for c in range(3):
+                key_to_idx[(_sticker_pos(f, r, c), _FACE_NORMAL[f])] = 9 * fi + 3 * r + c
+
+    def quarter(face):
+        axis = _FACE_NORMAL[face]
+        perm = np.arange(N_STICKERS)
+        for (pos, normal), src in key_to_idx.items():
+            if sum(p * a for p, a in zip(pos, axis)) != 1:
+                continue  # fuera de la capa que gira
+            dst = key_to_idx[(_rotate_cw(pos, axis), _rotate_cw(normal, axis))]
+            perm[dst] = src  # nuevo[dst] = viejo[src]
+        return perm
+
+    perms = np.zeros((len(MOVES), N_STICKERS), dtype=np.intp)
+    for i, mv in enumerate(MOVES):
+        q = quarter(mv[0])
+        turns = 1 if len(mv) == 1 else (3 if mv[1] == "'" else 2)
+        p = np.arange(N_STICKERS)
+        for _ in range(turns):
+            p = p[q]
+        perms[i] = p
+    return perms
+
+# MOVE_PERMS[a]: estado_nuevo = estado[MOVE_PERMS[a]]
+MOVE_PERMS = _build_perms()
+MOVE_PERMS.setflags(write=False)
+SOLVED_STATE = np.repeat(np.arange(N_COLORS, dtype=np.uint8), 9)
+SOLVED_STATE.setflags(write=False)
+_EYE = np.eye(N_COLORS, dtype=np.float32)
+
+# Zobrist: una clave aleatoria de 64 bits por (sticker, color); el hash es el XOR.
+ZOBRIST = np.random.default_rng(0x5EED).integers(0, 2**63, size=(N_STICKERS, N_COLORS), dtype=np.uint64)
+ZOBRIST.setflags(write=False)
+_STICKER_IDX = np.arange(N_STICKERS)
+
+def state_hash(state: np.ndarray) -> int:
+    return int(np.bitwise_xor.reduce(ZOBRIST[_STICKER_IDX, state]))
+
+def state_hashes(states: np.ndarray) -> np.ndarray:
+    """Hash Zobrist de un lote (N, 54) -> (N,) uint64."""
+    return np.bitwise_xor.reduce(ZOBRIST[_STICKER_IDX, states], axis=-1)
+
+def parse_moves(seq: str) -> List[int]:
+    """'R U2 F'' -> índices de MOVES."""
+    try:
+        return [MOVE_TO_IDX[m] for m in seq.replace(",", " ").split()]
+    except KeyError as e:
+        raise ValueError(f"Movimiento inválido: {e.args[0]}") from None
+
 def _face_matrix(cube, f):
     faces = getattr(cube, "faces", None)
     if faces is not None:
@@ -26,56 +111,134 @@ def _face_matrix(cube, f):
 
 class Cube3x3Env(BasePuzzleEnv):
     """
+    Estado: 54 stickers uint8 (0..5 = URFDLB), cada movimiento es un gather.
     Observación: one-hot de 54 stickers × 6 colores = 324 dims.
-    El mapeo de color->letra se ancla por los centros.
+    PyCuber sólo se usa en los bordes (from_pycuber / to_pycuber).
     """
-    def __init__(self):
-        self.cube = pc.Cube()
+    def __init__(self, state: np.ndarray = None):
+        self.state = SOLVED_STATE.copy() if state is None else np.asarray(state, dtype=np.uint8).copy()
 
     def reset_to_solved(self) -> None:
-        self.cube = pc.Cube()
+        self.state = SOLVED_STATE.copy()
 
     def scramble(self, n_moves: int) -> None:
-        seq = [random.choice(MOVES) for _ in range(n_moves)]
-        self.cube(pc.Formula(" ".join(seq)))
+        for _ in range(n_moves):
+            self.step(random.randrange(len(MOVES)))
+
+    def apply_moves(self, seq: str) -> None:
+        """Toda la secuencia en un solo gather (compilada y cacheada por utils.move_compiler)."""
+        from utils.move_compiler import compile_moves  # import tardío: utils depende de envs
+        self.state = compile_moves(seq).apply(self.state)
 
     def is_solved(self) -> bool:
-        return str(self.cube) == str(pc.Cube())
+        return np.array_equal(self.state, SOLVED_STATE)
+
+    def state_hash(self) -> int:
+        return state_hash(self.state)
 
     def legal_actions(self) -> List[int]:
         return list(range(len(MOVES)))  # todas legales
 
     def step(self, action: int) -> None:
-        mv = MOVES[action]
-        self.cube(pc.Formula(mv))
+        self.state = self.state[MOVE_PERMS[action]]
 
     def copy(self) -> "Cube3x3Env":
-        env = Cube3x3Env()
-        # pycuber tiene copy()
-        env.cube = self.cube.copy()
+        env = Cube3x3Env.__new__(Cube3x3Env)
+        env.state = self.state.copy()
         return env
 
-    def _color_to_letter_map(self):
-        m = {}
-        for f in ORDER:
-            mat = _face_matrix(self.cube, f)
-            center = mat[1][1]
-            m[center] = f
-        return m
-
     def state_embedding(self) -> np.ndarray:
-        cmap = self._color_to_letter_map()  # color real -> letra
-        planes = []
-        for f in ORDER:
-            mat = _face_matrix(self.cube, f)
-            for r in range(3):
-                for c in range(3):
-                    letter = cmap[mat[r][c]]  # U,R,F,D,L,B
-                    onehot = np.zeros(6, dtype=np.float32)
-                    onehot["URFDLB".index(letter)] = 1.0
-                    planes.append(onehot)
-        arr = np.concatenate(planes, axis=0)  # 324
-        return arr
+        return _EYE[self.state].reshape(-1)  # 324
 
     def action_to_move(self, action: int) -> str:
         return MOVES[action]
+
+    # ---------- bordes: facelets / pycuber ----------
+    def to_facelets(self) -> str:
+        """String de 54 facelets en orden URFDLB (kociemba)."""
+        return "".join(ORDER[i] for i in self.state)
+
+    @classmethod
+    def from_facelets(cls, facelets: str) -> "Cube3x3Env":
+        if len(facelets) != N_STICKERS:
+            raise ValueError(f"Se esperaban {N_STICKERS} facelets, hay {len(facelets)}")
+        return cls(np.array([ORDER.index(ch) for ch in facelets], dtype=np.uint8))
+
+    @classmethod
+    def from_pycuber(cls, cube) -> "Cube3x3Env":
+        # el mapeo de color->letra se ancla por los centros
+        mats = {f: _face_matrix(cube, f) for f in ORDER}
+        cmap = {mats[f][1][1]: i for i, f in enumerate(ORDER)}
+        state = [cmap[mats[f][r][c]] for f in ORDER for r in range(3) for c in range(3)]
+        return cls(np.array(state, dtype=np.uint8))
+
+    def to_pycuber(self) -> "pc.Cube":
+        letters = self.to_facelets()
+        # array_to_cubies espera caras en orden LUFDRB con los colores del cubo armado de pycuber
+        arr = "".join(letters[9 * ORDER.index(f): 9 * ORDER.index(f) + 9] for f in "LUFDRB")
+        return pc.Cube(pc.array_to_cubies(arr))
+
+
+class VectorCube3x3Env(BaseVectorPuzzleEnv):
+    """
+    N cubos en un único array (N, 54) uint8.
+    step aplica una acción por fila con un solo gather.
+    """
+    def __init__(self, n: int = None, states: np.ndarray = None, seed: int = None):
+        if states is None:
+            if n is None:
+                raise ValueError("Indicá n o states")
+            states = np.broadcast_to(SOLVED_STATE, (n, N_STICKERS))
+        self.states = np.array(states, dtype=np.uint8).reshape(-1, N_STICKERS)
+        self.rng = np.random.default_rng(seed)
+
+    @property
+    def num_envs(self) -> int:
+        return self.states.shape[0]
+
+    def __len__(self): return self.num_envs
+
+    def reset_to_solved(self) -> None:
+        self.states[:] = SOLVED_STATE
+
+    def scramble(self, n_moves) -> None:
+        lens = np.broadcast_to(np.asarray(n_moves), (self.num_envs,))
+        for d in range(int(lens.max(initial=0))):
+            active = lens > d
+            if active.all():
+                self.step(self.rng.integers(0, len(MOVES), size=self.num_envs))
+                continue
+            rows = np.nonzero(active)[0]
+            actions = self.rng.integers(0, len(MOVES), size=len(rows))
+            self.states[rows] = np.take_along_axis(self.states[rows], MOVE_PERMS[actions], axis=1)
+
+    def is_solved(self) -> np.ndarray:
+        return (self.states == SOLVED_STATE).all(axis=1)
+
+    def state_hash(self) -> np.ndarray:
+        return state_hashes(self.states)
+
+    def legal_actions(self) -> List[int]:
+        return list(range(len(MOVES)))
+
+    def step(self, actions) -> None:
+        self.states = np.take_along_axis(self.states, MOVE_PERMS[np.asarray(actions)], axis=1)
+
+    def children(self) -> np.ndarray:
+        """Los 18 sucesores de cada estado: (N, 18, 54)."""
+        return self.states[:, MOVE_PERMS]
+
+    def copy(self) -> "VectorCube3x3Env":
+        env = VectorCube3x3Env(states=self.states)
+        env.rng = copy.deepcopy(self.rng)  # mismo punto del stream, pero independiente
+        return env
+
+    def state_embedding(self) -> np.ndarray:
+        return _EYE[self.states].reshape(self.num_envs, STATE_DIM)
+
+    def get_env(self, i: int) -> Cube3x3Env:
+        return Cube3x3Env(self.states[i])
+
+    @classmethod
+    def from_envs(cls, envs: List[Cube3x3Env]) -> "VectorCube3x3Env":
+        return cls(states=np.stack([e.state for e in envs]))
@@ -0,0 +1,103 @@
+# envs/symmetry.py
+"""
+Las 48 simetrías espaciales del 3x3 (24 rotaciones × espejo) sobre el estado de
+54 stickers. Una simetría s reubica los stickers y renombra los colores para que
+los centros sigan en su lugar:
+
+    s(estado) = COLOR_MAP[s][estado[STICKER_PERMS[s]]]
+
+y conjuga los movimientos: s(estado · m) = s(estado) · MOVE_MAP[s][m].
+El índice 0 es la identidad.
+"""
+import itertools
+import numpy as np
+from .cube3x3 import (ORDER, MOVES, MOVE_PERMS, N_STICKERS, _FACE_NORMAL, _sticker_pos,
+                      state_hashes)
+
+def _build():
+    key_to_idx = {}
+    for fi, f in enumerate(ORDER):
+        for r in range(3):
+            for c in range(3):
+                key_to_idx[(_sticker_pos(f, r, c), _FACE_NORMAL[f])] = 9 * fi + 3 * r + c
+    normal_to_face = {n: i for i, n in enumerate(_FACE_NORMAL[f] for f in ORDER)}
+
+    # matrices de permutación con signo: 6 permutaciones × 8 signos = 48
+    mats = []
+    for perm in itertools.permutations(range(3)):
+        for signs in itertools.product((1, -1), repeat=3):
+            g = np.zeros((3, 3), dtype=int)
+            for row, (col, sg) in enumerate(zip(perm, signs)):
+                g[row, col] = sg
+            mats.append(g)
+    mats.sort(key=lambda g: (round(np.linalg.det(g)) < 0, not np.array_equal(g, np.eye(3))))
+
+    def apply(g, v):
+        return tuple(int(x) for x in g @ np.array(v))
+
+    sticker_perms = np.zeros((48, N_STICKERS), dtype=np.intp)
+    color_maps = np.zeros((48, len(ORDER)), dtype=np.uint8)
+    for s, g in enumerate(mats):
+        for (pos, normal), i in key_to_idx.items():
+            sticker_perms[s, key_to_idx[(apply(g, pos), apply(g, normal))]] = i
+        for fi, f in enumerate(ORDER):
+            color_maps[s, fi] = normal_to_face[apply(g, _FACE_NORMAL[f])]
+
+    # conjugación de movimientos: M' = SP^-1[M[SP]]
+    perm_to_move = {MOVE_PERMS[m].tobytes(): m for m in range(len(MOVES))}
+    move_maps = np.zeros((48, len(MOVES)), dtype=np.intp)
+    for s in range(48):
+        sp = sticker_perms[s]
+        inv = np.argsort(sp)
+        for m in range(len(MOVES)):
+            move_maps[s, m] = perm_to_move[inv[MOVE_PERMS[m][sp]].astype(np.intp).tobytes()]
+    is_mirror = np.array([round(np.linalg.det(g)) < 0 for g in mats])
+    return sticker_perms, color_maps, move_maps, is_mirror
+
+STICKER_PERMS, COLOR_MAP, MOVE_MAP, IS_MIRROR = _build()
+N_SYMMETRIES = len(STICKER_PERMS)
+# INV_MOVE_MAP[s][MOVE_MAP[s][m]] = m
+INV_MOVE_MAP = np.argsort(MOVE_MAP, axis=1)
+for _arr in (STICKER_PERMS, COLOR_MAP, MOVE_MAP, IS_MIRROR, INV_MOVE_MAP):
+    _arr.setflags(write=False)
+
+def apply_symmetry(state: np.ndarray, s: int) -> np.ndarray:
+    return COLOR_MAP[s][np.asarray(state)[STICKER_PERMS[s]]]
+
+def all_symmetries(state: np.ndarray) -> np.ndarray:
+    """Las 48 imágenes del estado: (48, 54)."""
+    return np.take_along_axis(COLOR_MAP, np.asarray(state)[STICKER_PERMS], axis=1)
+
+def canonical(state: np.ndarray):
+    """
+    Representante canónico (mínimo lexicográfico entre las 48 imágenes).
+    Devuelve (estado canónico, índice de simetría que lo produce).
+    """
+    imgs = all_symmetries(state)
+    cand = np.arange(N_SYMMETRIES)
+    for j in range(N_STICKERS):
+        col = imgs[cand, j]
+        cand = cand[col == col.min()]
+        if len(cand) == 1:
+            break
+    s = int(cand[0])
+    return imgs[s], s
+
+def canonical_hashes(states: np.ndarray) -> np.ndarray:
+    """Hash invariante por simetría de un lote (N, 54): mínimo Zobrist de las 48 imágenes."""
+    states = np.asarray(states).reshape(-1, N_STICKERS)
+    imgs = COLOR_MAP[np.arange(N_SYMMETRIES)[None, :, None], states[:, STICKER_PERMS]]  # (N,48,54)
+    return state_hashes(imgs).min(axis=1)
+
+def augment(states: np.ndarray, pis: np.ndarray, rng=np.random, syms: np.ndarray = None):
+    """
+    Copia simétrica al azar de cada par (estado, pi): stickers (B,54), pi (B,18).
+    La política se permuta con la conjugación de movimientos.
+    """
+    states = np.asarray(states)
+    if syms is None:
+        syms = rng.randint(0, N_SYMMETRIES, size=len(states))
+    moved = np.take_along_axis(states, STICKER_PERMS[syms], axis=1)
+    new_states = np.take_along_axis(COLOR_MAP[syms], moved, axis=1)
+    new_pis = np.take_along_axis(np.asarray(pis), INV_MOVE_MAP[syms], axis=1)
+    return new_states, new_pis
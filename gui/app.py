@@ -1,72 +1,23 @@
 # gui/app.py
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pycuber as pc
 
-from solver.kociemba_solver import Kociemba3x3Solver
+from envs.cube3x3 import SOLVED_STATE
+from utils.move_compiler import compile_moves, state_to_letters
 from solver.hybrid_solver import HybridSolver
+from gui.solve_worker import SolveJob
+from gui.renderer import CELL, PAD, FACE_COLOR, ORDER_FACELETS, StickerCanvas, hit_test
 from gui.viewer3d import show_cube_3d  # nuevo
 
 SUPPORTED = ["3x3", "4x4", "5x5", "Pyraminx", "Megaminx"]
-
-FACE_COLOR = {
-    "U": "#FFFFFF",
-    "R": "#FF4D4D",
-    "F": "#00CC66",
-    "D": "#FFFF33",
-    "L": "#FF9900",
-    "B": "#3399FF",
-}
-ORDER_DRAW = "U L F R B D"
-ORDER_FACELETS = "URFDLB"
-FACE_OFFSETS = {"U": (3,0), "L": (0,3), "F": (3,3), "R": (6,3), "B": (9,3), "D": (3,6)}
-CELL, PAD = 26, 2
+METHODS_3x3 = ["kociemba", "mcts", "astar", "beam", "ida"]
+POLL_MS = 100
 
 def parse_moves(seq): return [p for p in seq.replace(",", " ").split() if p]
-def invert_moves(moves):
-    out=[]
-    for m in moves[::-1]:
-        if m.endswith("2"): out.append(m)
-        elif m.endswith("'"): out.append(m[:-1])
-        else: out.append(m+"'")
-    return out
-
-def _mat_py(cube, f):
-    faces = getattr(cube, "faces", None)
-    if faces is not None:
-        face = faces[f]
-        return [[str(face[r][c]) for c in range(3)] for r in range(3)]
-    gf = getattr(cube, "get_face", None)
-    if gf is not None:
-        face = gf(f)
-        return [[str(face[r][c]) for c in range(3)] for r in range(3)]
-    raise RuntimeError("pycuber no permite leer la cara.")
-
-def draw_state(canvas, letters):
-    canvas.delete("all")
-    for face in ORDER_DRAW.split():
-        oc, orow = FACE_OFFSETS[face]
-        mat = letters[face]
-        for r in range(3):
-            for c in range(3):
-                fill = FACE_COLOR.get(mat[r][c], "#999")
-                x0 = (oc+c)*(CELL+PAD); y0 = (orow+r)*(CELL+PAD)
-                x1 = x0+CELL; y1 = y0+CELL
-                canvas.create_rectangle(x0,y0,x1,y1, fill=fill, outline="#333", width=2)
 
 def solved_letters():
     return {f:[[f]*3 for _ in range(3)] for f in ORDER_FACELETS}
 
-def pycuber_to_letters(cube):
-    cmap={}
-    for f in ORDER_FACELETS:
-        m=_mat_py(cube,f); cmap[m[1][1]]=f
-    letters={}
-    for f in ORDER_FACELETS:
-        m=_mat_py(cube,f)
-        letters[f]=[[cmap[m[r][c]] for c in range(3)] for r in range(3)]
-    return letters
-
 def letters_to_facelets(letters):
     s=[]
     for f in ORDER_FACELETS:
@@ -75,16 +26,6 @@ def letters_to_facelets(letters):
             for c in range(3): s.append(m[r][c])
     return "".join(s)
 
-def hit_test(x,y):
-    for face in ORDER_DRAW.split():
-        oc, orow = FACE_OFFSETS[face]
-        for r in range(3):
-            for c in range(3):
-                x0=(oc+c)*(CELL+PAD); y0=(orow+r)*(CELL+PAD)
-                x1=x0+CELL; y1=y0+CELL
-                if x0<=x<=x1 and y0<=y<=y1: return face,r,c
-    return None
-
 def launch_app():
     root = tk.Tk()
     root.title("IA Rubik Solver")
@@ -117,6 +58,17 @@ def launch_app():
                        bg=FACE_COLOR[f], fg="black", indicatoron=False,
                        width=3, relief="raised").grid(row=0, column=i, padx=2)
 
+    ttk.Label(left, text="Método / tiempo máx (s):").grid(row=9, column=0, sticky="w")
+    opts = ttk.Frame(left); opts.grid(row=9, column=1, sticky="w")
+    method_var = tk.StringVar(value="kociemba")
+    ttk.Combobox(opts, textvariable=method_var, values=METHODS_3x3, state="readonly", width=9)\
+        .grid(row=0, column=0, padx=5)
+    budget_var = tk.StringVar(value="30")
+    ttk.Entry(opts, textvariable=budget_var, width=5).grid(row=0, column=1)
+
+    status_var = tk.StringVar(value="")
+    ttk.Label(left, textvariable=status_var).grid(row=10, column=0, columnspan=2, sticky="w")
+
     out = tk.Text(left, height=18, width=44, state="disabled")
     out.grid(row=6, column=0, columnspan=2, pady=8)
     def log(msg):
@@ -127,18 +79,20 @@ def launch_app():
     canvas_w=(12*(CELL+PAD)); canvas_h=(9*(CELL+PAD))
     cvs = tk.Canvas(right, width=canvas_w, height=canvas_h, bg="#1e1e1e", highlightthickness=0)
     cvs.pack(fill="both", expand=True)
+    stickers = StickerCanvas(cvs)
 
     # ---- Estado / animación ----
     manual = solved_letters()
-    cube = pc.Cube()
+    state = SOLVED_STATE.copy()  # stickers; las secuencias se aplican compiladas (un gather)
     anim_moves=[]; anim_idx=0; anim_speed_ms=300
+    job=None  # SolveJob en curso (la búsqueda corre en un hilo; acá sólo se consulta)
 
     # historial por color (para límite 9 y “despintar el último”)
     paint_history = {f: [] for f in ORDER_FACELETS}
 
     def refresh():
-        if edit_mode.get(): draw_state(cvs, manual)
-        else: draw_state(cvs, pycuber_to_letters(cube))
+        if edit_mode.get(): stickers.render_letters(manual)
+        else: stickers.render(state)
 
     def count_color(letter):
         return sum(1 for f in ORDER_FACELETS for r in range(3) for c in range(3) if manual[f][r][c]==letter)
@@ -161,8 +115,8 @@ def launch_app():
         paint_history[new_letter].append((face,r,c))
 
     def reset_all():
-        nonlocal manual,cube,anim_moves,anim_idx
-        manual=solved_letters(); cube=pc.Cube(); anim_moves=[]; anim_idx=0
+        nonlocal manual,state,anim_moves,anim_idx
+        manual=solved_letters(); state=SOLVED_STATE.copy(); anim_moves=[]; anim_idx=0
         for k in paint_history: paint_history[k].clear()
         refresh()
 
@@ -172,7 +126,7 @@ def launch_app():
         if not hit: return
         f,r,c=hit
         set_sticker(f,r,c,paint_letter.get())
-        draw_state(cvs, manual)
+        stickers.render_letters(manual)
 
     cvs.bind("<Button-1>", on_click)
 
@@ -181,9 +135,9 @@ def launch_app():
         if kind!="3x3":
             log(f"Solver híbrido para {kind} aún no implementado.\nListo para integrar DL y heurísticas.")
             return
-        nonlocal cube
+        nonlocal state
         try:
-            cube=pc.Cube(); cube(pc.Formula(scramble_var.get().strip()))
+            state=compile_moves(scramble_var.get().strip()).apply(SOLVED_STATE)
             refresh(); log("[3x3] Scramble aplicado.")
         except Exception as e:
             messagebox.showerror("Scramble", str(e))
@@ -200,34 +154,54 @@ def launch_app():
                 raise ValueError(f"Estado inválido (colores != 9): {counts}")
             return letters_to_facelets(manual)
         else:
-            return letters_to_facelets(pycuber_to_letters(cube))
+            return letters_to_facelets(state_to_letters(state))
 
     def solve():
-        nonlocal anim_moves, anim_idx, cube
+        nonlocal job
+        if job is not None: return
         out.config(state="normal"); out.delete("1.0","end"); out.config(state="disabled")
         kind=cube_type.get()
         if kind!="3x3":
             log(HybridSolver(kind).solve(scramble_var.get().strip())); return
         try:
             facelets=facelets_current()
-            solver=Kociemba3x3Solver()
-            sol=solver.solve_from_facelets(facelets)
-            moves=parse_moves(sol); log(f"[3x3] Solución: {sol}"); log(f"Movimientos: {len(moves)}")
-
-            # preparar animación: partir del estado scrambled (inverso de moves)
-            inv=invert_moves(moves)
-            cube=pc.Cube()
-            if inv: cube(pc.Formula(" ".join(inv)))
-            refresh()
-            anim_moves[:]=moves; anim_idx=0
+            budget=float(budget_var.get())
+            if budget<=0: raise ValueError("El tiempo máximo tiene que ser positivo")
         except Exception as e:
-            messagebox.showerror("Resolver", str(e))
+            messagebox.showerror("Resolver", str(e)); return
+        job=SolveJob(facelets, method_var.get(), budget_s=budget).start()
+        solve_btn.config(state="disabled"); cancel_btn.config(state="normal")
+        root.after(POLL_MS, poll_solve)
+
+    def poll_solve():
+        nonlocal job, anim_moves, anim_idx, state
+        res=job.poll()
+        if res is None:
+            status_var.set(job.progress()); root.after(POLL_MS, poll_solve); return
+        job=None
+        solve_btn.config(state="normal"); cancel_btn.config(state="disabled")
+        status_var.set(f"Listo en {res['seconds']:.1f}s")
+        if "error" in res:
+            if res["error"]=="cancelado": log("[3x3] Búsqueda cancelada.")
+            else: messagebox.showerror("Resolver", res["error"])
+            return
+        if res["fallback"]:
+            log(f"[3x3] {res['requested']} no resolvió ({res.get('timeout', 'sin solución')}); se usó Kociemba.")
+        sol=res["solution"]
+        moves=parse_moves(sol); log(f"[3x3] Solución ({res['method']}): {sol}"); log(f"Movimientos: {len(moves)}")
+        # preparar animación: partir del estado scrambled (inverso de la solución)
+        state=compile_moves(sol).undo(SOLVED_STATE)
+        refresh()
+        anim_moves[:]=moves; anim_idx=0
+
+    def cancel_solve():
+        if job is not None: job.cancel(); status_var.set("Cancelando…")
 
     def step_animation():
-        nonlocal anim_idx,cube
+        nonlocal anim_idx,state
         if anim_idx>=len(anim_moves): return
         mv=anim_moves[anim_idx]
-        try: cube(pc.Formula(mv)); refresh()
+        try: state=compile_moves(mv).apply(state); refresh()
         except Exception as e:
             messagebox.showerror("Animación", f"Movimiento inválido: {mv}\n{e}"); return
         anim_idx+=1
@@ -236,9 +210,8 @@ def launch_app():
     def animate_solution():
         if not anim_moves:
             messagebox.showinfo("Animación","Primero tocá 'Resolver'."); return
-        nonlocal anim_idx,cube
-        inv=invert_moves(anim_moves); cube=pc.Cube()
-        if inv: cube(pc.Formula(" ".join(inv)))
+        nonlocal anim_idx,state
+        state=compile_moves(" ".join(anim_moves)).undo(SOLVED_STATE)
         refresh(); anim_idx=0; root.after(anim_speed_ms, step_animation)
 
     def open_3d():
@@ -250,7 +223,7 @@ def launch_app():
                 # si hay solución: moves = solución; el viewer reproduce con ESPACIO
                 moves = anim_moves[:] if anim_moves else []
             else:
-                state_letters = pycuber_to_letters(cube)
+                state_letters = state_to_letters(state)
                 moves = anim_moves[:] if anim_moves else []
             show_cube_3d(state_letters, moves=moves, speed=0.5)
         except Exception as e:
@@ -259,8 +232,10 @@ def launch_app():
     # Botones
     ttk.Button(left, text="Aplicar Scramble", command=apply_scramble)\
         .grid(row=4, column=0, pady=6, sticky="w")
-    ttk.Button(left, text="Resolver", command=solve)\
-        .grid(row=4, column=1, pady=6, sticky="w")
+    solve_btn=ttk.Button(left, text="Resolver", command=solve)
+    solve_btn.grid(row=4, column=1, pady=6, sticky="w")
+    cancel_btn=ttk.Button(left, text="Cancelar", command=cancel_solve, state="disabled")
+    cancel_btn.grid(row=11, column=0, columnspan=2, pady=6)
 
     ttk.Button(left, text="Animar solución", command=animate_solution)\
         .grid(row=5, column=0, pady=6, sticky="w")
@@ -0,0 +1,57 @@
+# gui/renderer.py
+"""
+Desplegado 2D del cubo en un tk.Canvas, sin redibujar: los 54 rectángulos se
+crean una vez y cada render sólo recolorea los stickers que cambiaron. No
+importa tkinter, así que se usa con cualquier objeto con la API de Canvas.
+"""
+import numpy as np
+from utils.move_compiler import letters_to_state
+
+FACE_COLOR = {
+    "U": "#FFFFFF",
+    "R": "#FF4D4D",
+    "F": "#00CC66",
+    "D": "#FFFF33",
+    "L": "#FF9900",
+    "B": "#3399FF",
+}
+ORDER_FACELETS = "URFDLB"
+FACE_OFFSETS = {"U": (3,0), "L": (0,3), "F": (3,3), "R": (6,3), "B": (9,3), "D": (3,6)}
+CELL, PAD = 26, 2
+
+_PITCH = CELL+PAD
+_FILLS = [FACE_COLOR[f] for f in ORDER_FACELETS]
+# celda de 3x3 en la grilla del desplegado -> cara (las vacías no están)
+_GRID_FACE = {(oc//3, orow//3): f for f, (oc, orow) in FACE_OFFSETS.items()}
+
+class StickerCanvas:
+    """items[i] es el rectángulo del sticker i en el orden de facelets (URFDLB, fila por fila)."""
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.items = []
+        for f in ORDER_FACELETS:
+            oc, orow = FACE_OFFSETS[f]
+            for r in range(3):
+                for c in range(3):
+                    x0 = (oc+c)*_PITCH; y0 = (orow+r)*_PITCH
+                    self.items.append(canvas.create_rectangle(x0, y0, x0+CELL, y0+CELL, fill="#999",
+                                                              outline="#333", width=2))
+        self.shown = np.full(54, 255, dtype=np.uint8)  # nada coincide: el primer render pinta todo
+
+    def render(self, state):
+        """state: uint8[54] con colores 0..5 (URFDLB), como envs.cube3x3."""
+        state = np.asarray(state)
+        for i in np.flatnonzero(state != self.shown):
+            self.canvas.itemconfigure(self.items[i], fill=_FILLS[state[i]])
+        self.shown = state.copy()
+
+    def render_letters(self, letters):
+        self.render(letters_to_state(letters))
+
+def hit_test(x,y):
+    """(cara, fila, columna) bajo el punto, o None si cae en un hueco o entre stickers."""
+    col, dx = divmod(int(x), _PITCH); row, dy = divmod(int(y), _PITCH)
+    face = _GRID_FACE.get((col//3, row//3))
+    if face is None or dx > CELL or dy > CELL: return None
+    oc, orow = FACE_OFFSETS[face]
+    return face, row-orow, col-oc
@@ -0,0 +1,112 @@
+# gui/solve_worker.py
+"""
+Resolución en segundo plano para la GUI: la búsqueda corre en un hilo y la
+ventana consulta job.poll() con root.after, así Tk nunca se congela.
+
+Cancelar y el presupuesto de tiempo no tocan el código de los solvers: la red
+se envuelve en un callable que, antes de cada evaluación, levanta
+SolveCancelled o SolveTimeout. El mismo envoltorio cuenta evaluaciones y
+filas, que es el progreso que se muestra mientras busca.
+"""
+import threading, time
+from typing import Optional
+import kociemba
+
+class SolveCancelled(Exception):
+    pass
+
+class SolveTimeout(TimeoutError):
+    pass
+
+class _GuardedNet:
+    def __init__(self, net, job: "SolveJob"):
+        self.net = net
+        self.job = job
+
+    def __call__(self, x):
+        self.job._check()
+        out = self.net(x)
+        self.job.evals += 1
+        self.job.rows += len(x)
+        return out
+
+    def eval(self):
+        return self
+
+class SolveJob:
+    """
+    job = SolveJob(facelets, "mcts", budget_s=20).start()
+    job.poll() -> None mientras busca; después dict con solution/method (el que
+    resolvió)/requested (el pedido)/fallback/seconds o error ("cancelado", ...).
+    """
+    def __init__(self, facelets: str, method: str = "kociemba", budget_s: float = 30.0, **options):
+        self.facelets = facelets
+        self.method = method
+        self.budget_s = budget_s
+        self.options = options
+        self.evals = 0
+        self.rows = 0
+        self.t0 = time.monotonic()
+        self.deadline = self.t0 + budget_s
+        self._cancel = threading.Event()
+        self._result: Optional[dict] = None
+        self._thread = threading.Thread(target=self._run, name="gui-solve", daemon=True)
+
+    def start(self) -> "SolveJob":
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.t0
+
+    def progress(self) -> str:
+        msg = f"{self.method}: {self.elapsed:.1f}s / {self.budget_s:.0f}s"
+        return msg + (f", {self.evals:,} evaluaciones ({self.rows:,} estados)" if self.evals else "")
+
+    def poll(self) -> Optional[dict]:
+        return self._result if not self._thread.is_alive() else None
+
+    def _check(self):
+        if self._cancel.is_set():
+            raise SolveCancelled()
+        if time.monotonic() >= self.deadline:
+            raise SolveTimeout(f"Se agotaron los {self.budget_s:.0f}s")
+
+    def _search(self) -> Optional[str]:
+        if self.method == "kociemba":
+            return kociemba.solve(self.facelets)
+        from solver.hybrid_solver import CKPT_3x3, HybridSolver
+        options = dict(self.options)
+        net = None
+        if self.method in ("astar", "ida"):
+            options.setdefault("time_limit", max(self.deadline - time.monotonic(), 0.0))
+        if self.method != "ida":  # IDA* no usa la red: sólo corta por time_limit, no se cancela a mitad
+            from models.registry import get_model
+            model = get_model(CKPT_3x3)
+            if model is None:
+                return None
+            net = _GuardedNet(model, self)
+        return HybridSolver("3x3", method=self.method, net=net, **options).search(self.facelets)
+
+    def _run(self):
+        res = {"requested": self.method, "method": self.method, "fallback": False}
+        try:
+            try:
+                sol = self._search()
+                if sol is None:
+                    self._check()  # cancelado o sin tiempo: no disfrazarlo de "sin solución"
+            except SolveTimeout as e:
+                sol, res["timeout"] = None, str(e)
+            if sol is None:  # Kociemba tarda milisegundos: siempre hay respuesta
+                sol, res["method"], res["fallback"] = kociemba.solve(self.facelets), "kociemba", True
+            res["solution"] = sol
+        except SolveCancelled:
+            res["error"] = "cancelado"
+        except Exception as e:
+            res["error"] = f"{type(e).__name__}: {e}"
+        res["seconds"] = self.elapsed
+        self._result = res
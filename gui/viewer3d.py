@@ -13,7 +13,7 @@ from OpenGL.GL import (
     GL_DEPTH_BUFFER_BIT, GL_DEPTH_TEST, GL_PROJECTION, GL_MODELVIEW, GL_QUADS
 )
 from OpenGL.GLU import gluPerspective, gluLookAt
-import pycuber as pc
+from utils.move_compiler import compile_moves, letters_to_state, state_to_letters
 
 COLORS = {
     "U": (1.0, 1.0, 1.0),
@@ -34,7 +34,7 @@ class Cube3DWindow(pyglet.window.Window):
         self.rot_x = -25.0
         self.rot_y = -35.0
 
-        self.cube = pc.Cube()
+        self.state = letters_to_state(state_letters)  # stickers; se muestran como letras
         self.state_letters = state_letters  # net inicial (letras por sticker)
         self.moves = moves or []
         self.speed = speed
@@ -74,6 +74,7 @@ class Cube3DWindow(pyglet.window.Window):
             self.close()
         elif symbol == key.SPACE and self.moves:
             self.move_idx = 0
+            self.state = letters_to_state(self.state_letters)
             pyglet.clock.schedule_interval(self._play_step, self.speed)
 
     def _play_step(self, dt):
@@ -82,38 +83,16 @@ class Cube3DWindow(pyglet.window.Window):
             return
         mv = self.moves[self.move_idx]
         try:
-            self.cube(pc.Formula(mv))
-        except Exception:
+            self.state = compile_moves(mv).apply(self.state)
+        except ValueError:
             pyglet.clock.unschedule(self._play_step)
             return
         self.move_idx += 1
 
     # ---------- helpers ----------
-    def _mat(self, cube, f):
-        faces = getattr(cube, "faces", None)
-        if faces is not None:
-            face = faces[f]
-            return [[str(face[r][c]) for c in range(3)] for r in range(3)]
-        gf = getattr(cube, "get_face", None)
-        if gf is not None:
-            face = gf(f)
-            return [[str(face[r][c]) for c in range(3)] for r in range(3)]
-        raise RuntimeError("pycuber no permite leer la cara")
-
-    def _letters_from_cube(self):
-        cmap = {}
-        for f in ORDER_FACELETS:
-            m = self._mat(self.cube, f)
-            cmap[m[1][1]] = f
-        letters = {}
-        for f in ORDER_FACELETS:
-            m = self._mat(self.cube, f)
-            letters[f] = [[cmap[m[r][c]] for c in range(3)] for r in range(3)]
-        return letters
-
     def _draw_cube(self):
-        # Si ya aplicamos pasos, usamos el estado real del pc.Cube.
-        letters = self._letters_from_cube() if self.move_idx > 0 else self.state_letters
+        # Si ya aplicamos pasos, usamos el estado de stickers actual.
+        letters = state_to_letters(self.state) if self.move_idx > 0 else self.state_letters
 
         size = 1.8
         cell = size / 3.0
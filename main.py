@@ -4,18 +4,66 @@ def run_gui():
     from gui.app import launch_app
     launch_app()
 
+def search_options(args):
+    if args.method == "astar":
+        return dict(batch_size=args.search_batch, weight=args.weight, max_nodes=args.max_nodes)
+    if args.method == "beam":
+        return dict(beam_width=args.beam_width, max_depth=args.max_depth)
+    if args.method == "ida":
+        return dict(time_limit=args.time_limit)
+    return {}
+
 def run_console(args):
     from solver.hybrid_solver import HybridSolver
     kind = args.cube_type
     scramble = args.scramble
-    solver = HybridSolver(kind)          # <- en vez de Kociemba directo para 3x3
+    options = search_options(args)
+    solver = HybridSolver(kind, method=args.method, backend=args.backend, num_threads=args.threads, **options)  # <- en vez de Kociemba directo para 3x3
     print(solver.solve(scramble))
 
 
 def run_train(args):
     from rl.self_play import train_self_play
     device = "cuda" if args.cuda and os.environ.get("CUDA_VISIBLE_DEVICES","") != "" else "cpu"
-    train_self_play(
+    # flags que sólo entiende train_self_play: en avi o con actores se perderían en silencio
+    single = {"--resume": args.resume, "--profile": args.profile, "--trace": args.trace,
+              "--ckpt-dir": args.ckpt_dir, "--keep": args.keep is not None, "--arena": args.arena}
+    used = [flag for flag, v in single.items() if v]
+    if used and (args.train_mode == "avi" or args.workers > 0):
+        sys.exit(f"{', '.join(used)}: por ahora sólo está soportado en self-play de un proceso (--mode selfplay --workers 0)")
+    if args.train_mode == "avi" and args.workers > 0:
+        sys.exit("--workers: el modo avi corre en un solo proceso (usar --mode selfplay para actores)")
+    if args.inference_server and (args.train_mode == "avi" or args.workers == 0):
+        sys.exit("--inference-server requiere actores (--mode selfplay --workers N)")
+    if args.resume and args.replay_path:
+        sys.exit("--resume no se combina con --replay-path: el checkpoint no guarda una copia del replay en disco")
+    if args.train_mode == "avi":
+        from rl.avi import train_avi
+        train_avi(
+            out_path=args.out,
+            device=device,
+            steps=args.steps,
+            batch_size=args.batch,
+            lr=args.lr,
+            depth_range=(args.scr_min, args.scr_max),
+            states_per_iter=args.avi_states,
+            updates_per_iter=args.avi_updates,
+            target_every=args.target_every,
+            gamma=args.gamma,
+            eval_every=args.eval_every,
+            replay_capacity=args.replay_capacity,
+            replay_path=args.replay_path,
+            augment=not args.no_augment,
+        )
+        return
+    train = train_self_play
+    extra = dict(profile=args.profile, trace_path=args.trace, ckpt_dir=args.ckpt_dir,
+                 keep=3 if args.keep is None else args.keep, resume=args.resume, arena=args.arena)
+    if args.workers > 0:
+        from rl.actor_learner import train_actor_learner
+        train = train_actor_learner
+        extra = dict(workers=args.workers, sync_every=args.sync_every, inference_server=args.inference_server)
+    train(
         out_path=args.out,
         device=device,
         steps=args.steps,
@@ -25,8 +73,77 @@ def run_train(args):
         curriculum=(args.scr_min, args.scr_max),
         max_steps=args.max_steps,
         eval_every=args.eval_every,
+        mcts_batch=args.mcts_batch,
+        tt_size=args.tt_size,
+        replay_capacity=args.replay_capacity,
+        replay_path=args.replay_path,
+        augment=not args.no_augment,
+        **extra,
     )
 
+def run_arena(args):
+    from rl.arena import arena_loop
+    best = arena_loop(args.ckpt_dir, depths=args.depths, per_depth=args.per_depth, max_steps=args.max_steps,
+                      seed=args.seed, once=args.once)
+    if best is not None:
+        print(f"Mejor: {best['checkpoint']} (it {best['it']}, tasa media {best['mean_solve_rate']:.3f})")
+
+def run_pdb(args):
+    from solver.pdb import SPACE_SETS, load_pdb
+    for name in args.sets:
+        for space in SPACE_SETS[name](args.dir):
+            table = load_pdb(space, args.dir, verify=args.verify)
+            print(f"{space.name}: {space.size:,} entradas, distancias {table.meta['histogram']}")
+
+def run_batch(args):
+    from solver.batch import run_batch as batch
+    options = search_options(args)
+    if args.method != "kociemba":
+        options.update(backend=args.backend, num_threads=args.threads)
+    inp = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        batch(inp, out, method=args.method, workers=args.workers, log=sys.stderr, **options)
+    finally:
+        for f in (inp, out):
+            if f not in (sys.stdin, sys.stdout):
+                f.close()
+
+def add_search_args(p):
+    p.add_argument("--backend", choices=["eager", "torchscript", "onnx"], default="eager",
+                   help="Cómo servir la red (onnx requiere onnxruntime)")
+    p.add_argument("--threads", type=int, default=None, help="Hilos intra-op de inferencia")
+    p.add_argument("--search-batch", type=int, default=64, help="[astar] Nodos expandidos por forward")
+    p.add_argument("--weight", type=float, default=2.0, help="[astar] f = g + weight*h")
+    p.add_argument("--max-nodes", type=int, default=200_000, help="[astar] Presupuesto de nodos expandidos")
+    p.add_argument("--beam-width", type=int, default=256, help="[beam] Caminos conservados por profundidad")
+    p.add_argument("--max-depth", type=int, default=40, help="[beam] Profundidad máxima")
+    p.add_argument("--time-limit", type=float, default=None, help="[ida] Segundos máximos de búsqueda")
+
+def run_bench(args):
+    import json
+    from bench.suite import compare, run_suite, save
+    depths = range(args.min_depth, args.max_depth + 1)
+    results = run_suite(methods=args.methods, depths=depths, per_depth=args.per_depth,
+                        n_random=args.random, seed=args.seed, micro=not args.no_micro)
+    save(results, args.out)
+    print(f"Resultados en {args.out}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESIÓN {r}")
+        if regressions:
+            sys.exit(1)
+        print(f"Sin regresiones respecto de {args.baseline} (tolerancia {args.tolerance:.0%})")
+
+def run_serve(args):
+    import asyncio
+    from service.server import serve
+    asyncio.run(serve(args.host, args.port, method=args.method, backend=args.backend, num_threads=args.threads,
+                      workers=args.workers, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms,
+                      deadline_ms=args.deadline_ms))
+
 def main():
     parser = argparse.ArgumentParser(description="IA Rubik Solver")
     sub = parser.add_subparsers(dest="mode")
@@ -35,19 +152,92 @@ def main():
     cli = sub.add_parser("cli", help="Modo consola")
     cli.add_argument("--cube-type", choices=["3x3","4x4","5x5","Pyraminx","Megaminx"], default="3x3")
     cli.add_argument("--scramble", required=True, help="Ej: 'U R U' R''")
+    cli.add_argument("--method", choices=["mcts", "astar", "beam", "ida"], default="mcts",
+                     help="Búsqueda guiada por la red, o ida = óptimo con pattern databases")
+    add_search_args(cli)
+
+    bt = sub.add_parser("batch", help="Resolver un archivo de scrambles/facelets (JSONL por streaming)")
+    bt.add_argument("--input", default="-", help="Un scramble, 54 facelets o un objeto JSON por línea ('-' = stdin)")
+    bt.add_argument("--output", default="-", help="Resultados JSONL ('-' = stdout); el resumen va a stderr")
+    bt.add_argument("--method", choices=["kociemba", "mcts", "astar", "beam", "ida"], default="kociemba")
+    bt.add_argument("--workers", type=int, default=None, help="Procesos (kociemba) o hilos (resto); por defecto, los CPUs")
+    add_search_args(bt)
 
     tr = sub.add_parser("train", help="Entrenar self-play (3x3)")
+    tr.add_argument("--mode", dest="train_mode", choices=["selfplay", "avi"], default="selfplay",
+                    help="selfplay = MCTS; avi = scrambles inversos + value iteration (sin MCTS)")
     tr.add_argument("--steps", type=int, default=2000)
     tr.add_argument("--batch", type=int, default=256)
     tr.add_argument("--lr", type=float, default=1e-3)
     tr.add_argument("--sims", type=int, default=128, help="Simulaciones MCTS por jugada")
+    tr.add_argument("--mcts-batch", type=int, default=8, help="Hojas evaluadas por forward (virtual loss)")
+    tr.add_argument("--tt-size", type=int, default=1 << 18, help="Entradas de la tabla de transposición (0 = sin tabla)")
     tr.add_argument("--scr-min", type=int, default=1)
     tr.add_argument("--scr-max", type=int, default=10)
     tr.add_argument("--max-steps", type=int, default=60)
     tr.add_argument("--eval-every", type=int, default=500)
+    tr.add_argument("--replay-capacity", type=int, default=200_000)
+    tr.add_argument("--replay-path", default=None, help="Directorio para el replay en disco (np.memmap, sobrevive reinicios)")
+    tr.add_argument("--no-augment", action="store_true", help="No usar las 48 simetrías del cubo al entrenar")
+    tr.add_argument("--avi-states", type=int, default=10_000, help="[avi] Estados generados por iteración")
+    tr.add_argument("--avi-updates", type=int, default=20, help="[avi] Pasos de gradiente por iteración")
+    tr.add_argument("--target-every", type=int, default=10, help="[avi] Iteraciones entre syncs de la red objetivo")
+    tr.add_argument("--gamma", type=float, default=0.95, help="[avi] Descuento por movimiento del objetivo de valor")
+    tr.add_argument("--workers", type=int, default=0, help="Procesos actores de self-play (0 = un solo proceso)")
+    tr.add_argument("--inference-server", action="store_true",
+                    help="Los actores comparten un servidor de inferencia con lotes dinámicos (memoria compartida)")
+    tr.add_argument("--sync-every", type=int, default=10, help="Updates del learner entre publicaciones de pesos")
+    tr.add_argument("--profile", action="store_true",
+                    help="[selfplay] Tiempos por fase y log periódico de games/s, sims/s, net-calls/s")
+    tr.add_argument("--trace", default=None, help="[selfplay] Exportar un Chrome trace (Perfetto) a este JSON")
+    tr.add_argument("--resume", action="store_true",
+                    help="[selfplay] Retomar desde el último checkpoint completo (modelo, Adam, replay, RNGs)")
+    tr.add_argument("--ckpt-dir", default=None, help="[selfplay] Directorio de checkpoints (default: <out>_ckpts/)")
+    tr.add_argument("--keep", type=int, default=None, help="[selfplay] Checkpoints completos que se conservan (default: 3)")
+    tr.add_argument("--arena", action="store_true",
+                    help="[selfplay] Evaluar cada checkpoint en un proceso aparte (scrambles fijos, greedy)")
     tr.add_argument("--out", default="models/checkpoints/pvnet_3x3.pt")
     tr.add_argument("--cuda", action="store_true")
 
+    ar = sub.add_parser("arena", help="Evaluar checkpoints con scrambles fijos (sigue al directorio hasta Ctrl+C)")
+    ar.add_argument("--ckpt-dir", default=os.path.join("models", "checkpoints", "pvnet_3x3_ckpts"))
+    ar.add_argument("--depths", type=int, nargs="+", default=[1, 3, 5, 7, 10, 13, 15, 20])
+    ar.add_argument("--per-depth", type=int, default=100)
+    ar.add_argument("--max-steps", type=int, default=40, help="Movimientos máximos del rollout greedy")
+    ar.add_argument("--seed", type=int, default=0)
+    ar.add_argument("--once", action="store_true", help="Evaluar el último checkpoint y salir")
+
+    pdb = sub.add_parser("pdb", help="Construir/verificar pattern databases (IDA*)")
+    pdb.add_argument("--sets", nargs="+", choices=["korf", "phase1", "phase2"], default=["korf"],
+                     help="korf = esquinas + 2x6 aristas (IDA*); phase1/phase2 = coordenadas de Kociemba")
+    pdb.add_argument("--dir", default=os.path.join("models", "pdb"))
+    pdb.add_argument("--verify", action="store_true", help="Verificar el crc32 de las tablas existentes")
+
+    bn = sub.add_parser("bench", help="Benchmarks de solvers y micro-benchmarks (JSON, comparación con baseline)")
+    bn.add_argument("--methods", nargs="+", choices=["kociemba", "mcts", "astar", "beam", "ida"],
+                    default=["kociemba", "mcts", "astar", "beam"])
+    bn.add_argument("--min-depth", type=int, default=1)
+    bn.add_argument("--max-depth", type=int, default=25)
+    bn.add_argument("--per-depth", type=int, default=3, help="Scrambles por profundidad")
+    bn.add_argument("--random", type=int, default=10, help="Estados aleatorios uniformes")
+    bn.add_argument("--seed", type=int, default=0)
+    bn.add_argument("--no-micro", action="store_true", help="Saltear los micro-benchmarks")
+    bn.add_argument("--out", default="bench_results.json")
+    bn.add_argument("--baseline", default=None, help="JSON de una corrida anterior: sale con código 1 si hay regresiones")
+    bn.add_argument("--tolerance", type=float, default=0.2, help="Empeoramiento relativo tolerado")
+
+    sv = sub.add_parser("serve", help="Servicio HTTP/JSON local (POST /solve, GET /metrics)")
+    sv.add_argument("--host", default="127.0.0.1")
+    sv.add_argument("--port", type=int, default=8765)
+    sv.add_argument("--method", choices=["kociemba", "mcts", "astar", "beam", "ida"], default="mcts",
+                    help="Método por defecto si el pedido no trae 'method'")
+    sv.add_argument("--backend", choices=["eager", "torchscript", "onnx"], default="eager")
+    sv.add_argument("--threads", type=int, default=None, help="Hilos intra-op de inferencia")
+    sv.add_argument("--workers", type=int, default=4, help="Búsquedas concurrentes")
+    sv.add_argument("--max-batch", type=int, default=256, help="Filas máximas por forward compartido")
+    sv.add_argument("--max-wait-ms", type=float, default=2.0, help="Espera máxima para juntar un lote")
+    sv.add_argument("--deadline-ms", type=float, default=10_000, help="Deadline por defecto de cada pedido")
+
     args = parser.parse_args()
 
     if args.mode == "gui" or (args.mode is None and ("DISPLAY" in os.environ or sys.platform.startswith("win"))):
@@ -56,6 +246,16 @@ def main():
         run_console(args)
     elif args.mode == "train":
         run_train(args)
+    elif args.mode == "arena":
+        run_arena(args)
+    elif args.mode == "pdb":
+        run_pdb(args)
+    elif args.mode == "batch":
+        run_batch(args)
+    elif args.mode == "bench":
+        run_bench(args)
+    elif args.mode == "serve":
+        run_serve(args)
     else:
         parser.print_help()
 
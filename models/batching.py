@@ -0,0 +1,126 @@
+# models/batching.py
+"""
+Micro-batching de inferencia entre búsquedas concurrentes (hilos).
+
+Cada búsqueda usa un cliente del MicroBatcher como `net`: la llamada encola sus
+filas y bloquea hasta el resultado. Un hilo de fondo junta pedidos hasta
+max_batch filas o max_wait_ms desde el primero, hace UN forward y reparte las
+salidas. Con deadline, la llamada levanta DeadlineExceeded cuando se vence: así
+se corta una búsqueda en curso sin tocar su código.
+"""
+import queue, threading, time
+import torch
+from typing import List, Optional, Tuple
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+class _Request:
+    __slots__ = ("x", "done", "out", "error")
+
+    def __init__(self, x):
+        self.x = x
+        self.done = threading.Event()
+        self.out = None
+        self.error = None
+
+class BatchClient:
+    """Se usa igual que la red: client(x) -> (logits, v)."""
+    def __init__(self, batcher: "MicroBatcher", deadline: Optional[float] = None):
+        self.batcher = batcher
+        self.deadline = deadline  # time.monotonic()
+
+    def __call__(self, x: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        return self.batcher.infer(x, self.deadline)
+
+    def eval(self):
+        return self
+
+class MicroBatcher:
+    def __init__(self, model, max_batch: int = 256, max_wait_ms: float = 2.0):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.requests = 0
+        self.largest = 0
+        self._thread = threading.Thread(target=self._loop, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def client(self, deadline: Optional[float] = None) -> BatchClient:
+        return BatchClient(self, deadline)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def infer(self, x: torch.Tensor, deadline: Optional[float] = None):
+        if deadline is not None and time.monotonic() >= deadline:
+            raise DeadlineExceeded("Se venció el deadline antes de evaluar")
+        req = _Request(x)
+        self._queue.put(req)
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+        if not req.done.wait(timeout):
+            raise DeadlineExceeded("Se venció el deadline esperando la inferencia")
+        if req.error is not None:
+            raise req.error
+        return req.out
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch: List[_Request] = [first]
+            rows = len(first.x)
+            end = time.monotonic() + self.max_wait
+            stop = False
+            while rows < self.max_batch:
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    req = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if req is None:
+                    stop = True
+                    break
+                batch.append(req)
+                rows += len(req.x)
+            self._run(batch, rows)
+            if stop:
+                return
+
+    def _run(self, batch: List[_Request], rows: int):
+        try:
+            with torch.inference_mode():
+                x = batch[0].x if len(batch) == 1 else torch.cat([r.x for r in batch])
+                logits, v = self.model(x)
+            sizes = [len(r.x) for r in batch]
+            for r, lg, vv in zip(batch, torch.split(logits, sizes), torch.split(v, sizes)):
+                r.out = (lg, vv)
+        except Exception as e:  # el error le llega a cada búsqueda del lote
+            for r in batch:
+                r.error = e
+        with self._lock:
+            self.batches += 1
+            self.rows += rows
+            self.requests += len(batch)
+            self.largest = max(self.largest, rows)
+        for r in batch:
+            r.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"batches": self.batches, "rows": self.rows, "requests": self.requests,
+                    "mean_batch_rows": self.rows / self.batches if self.batches else 0.0,
+                    "requests_per_batch": self.requests / self.batches if self.batches else 0.0,
+                    "largest_batch_rows": self.largest, "queue_depth": self.queue_depth}
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
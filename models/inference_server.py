@@ -0,0 +1,161 @@
+# models/inference_server.py
+"""
+Servidor de inferencia compartido entre procesos (actores de self-play).
+
+Cada cliente tiene su slot en memoria compartida (tensores share_memory_):
+escribe ahí sus embeddings, anota la cantidad de filas y encola su id en un
+ring buffer compartido de control. Un único proceso servidor junta los
+pedidos pendientes en un lote dinámico (hasta max_batch filas o max_wait_ms
+desde el primero), hace UN forward de PolicyValueNet y escribe policy/value
+en los slots de salida de cada cliente. Los pesos son los del PolicyValueNet
+compartido que publica el learner: no hay una copia por actor.
+
+El cliente se usa igual que la red (client(x) -> (logits, v)), así que se
+pasa tal cual como `net` a run_mcts / play_game.
+"""
+import time
+from typing import Optional
+import torch
+import torch.multiprocessing as mp
+from envs.cube3x3 import MOVES, STATE_DIM
+from .policy_value_net import PolicyValueNet
+
+# índices del tensor de estadísticas
+_BATCHES, _ROWS, _REQUESTS, _QUEUE_S, _FORWARD_S = range(5)
+
+class InferenceClient:
+    """Proxy picklable (se pasa como argumento del Process) hacia el slot `idx`."""
+    def __init__(self, idx: int, chan: dict, timeout: float = 60.0):
+        self.idx = idx
+        self.chan = chan
+        self.timeout = timeout
+
+    def __call__(self, x: torch.Tensor):
+        c, i = self.chan, self.idx
+        max_rows = c["inp"].shape[1]
+        if len(x) > max_rows:  # pedidos grandes se parten en varios viajes
+            parts = [self(x[k:k + max_rows]) for k in range(0, len(x), max_rows)]
+            return torch.cat([p[0] for p in parts]), torch.cat([p[1] for p in parts])
+        n = len(x)
+        c["inp"][i, :n].copy_(x.detach().to("cpu", torch.float32))
+        c["rows"][i] = n
+        c["t_submit"][i] = time.monotonic()
+        with c["lock"]:
+            tail = int(c["head_tail"][1])
+            c["ring"][tail % len(c["ring"])] = i
+            c["head_tail"][1] = tail + 1
+        c["ready"].release()
+        if not c["done"][i].acquire(timeout=self.timeout):
+            raise TimeoutError("El servidor de inferencia no respondió")
+        return c["logits"][i, :n].clone(), c["v"][i, :n].clone()
+
+    def eval(self):
+        return self
+
+def _serve(chan: dict, shared_net, version, stop, max_batch: int, max_wait: float, threads: Optional[int]):
+    if threads:
+        torch.set_num_threads(threads)
+    net = PolicyValueNet(STATE_DIM, len(MOVES)).eval()
+    local_version = None
+    ring, head_tail, lock = chan["ring"], chan["head_tail"], chan["lock"]
+
+    def pop() -> int:
+        with lock:
+            head = int(head_tail[0])
+            head_tail[0] = head + 1
+            return int(ring[head % len(ring)])
+
+    while not stop.is_set():
+        if not chan["ready"].acquire(timeout=0.1):
+            continue
+        ids = [pop()]
+        rows = int(chan["rows"][ids[0]])
+        deadline = time.monotonic() + max_wait
+        while rows < max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not chan["ready"].acquire(timeout=remaining):
+                break
+            ids.append(pop())
+            rows += int(chan["rows"][ids[-1]])
+
+        current = version.value if version is not None else 0
+        if current != local_version:
+            if version is not None:
+                with version.get_lock():
+                    net.load_state_dict(shared_net.state_dict())
+            else:
+                net.load_state_dict(shared_net.state_dict())
+            local_version = current
+
+        t0 = time.monotonic()
+        queued = float(sum(t0 - chan["t_submit"][i].item() for i in ids))  # antes de liberar: el cliente lo pisa
+        sizes = [int(chan["rows"][i]) for i in ids]
+        x = torch.cat([chan["inp"][i, :n] for i, n in zip(ids, sizes)])
+        with torch.inference_mode():
+            logits, v = net(x)
+        k = 0
+        for i, n in zip(ids, sizes):
+            chan["logits"][i, :n] = logits[k:k + n]
+            chan["v"][i, :n] = v[k:k + n]
+            k += n
+            chan["done"][i].release()
+        st = chan["stats"]
+        st[_BATCHES] += 1
+        st[_ROWS] += rows
+        st[_REQUESTS] += len(ids)
+        st[_QUEUE_S] += queued
+        st[_FORWARD_S] += time.monotonic() - t0
+
+class InferenceServer:
+    """
+    server = InferenceServer(shared_net, n_clients=workers, version=version).start()
+    Process(target=actor, args=(server.client(rank), ...))
+
+    shared_net: PolicyValueNet con share_memory(); version (mp.Value) indica
+    cuándo el learner publicó pesos nuevos (se copian bajo su lock).
+    """
+    def __init__(self, shared_net, n_clients: int, version=None, max_rows: int = 256,
+                 max_batch: int = 1024, max_wait_ms: float = 1.0, threads: Optional[int] = None):
+        ctx = mp.get_context("spawn")
+        self.chan = {
+            "inp": torch.zeros(n_clients, max_rows, STATE_DIM).share_memory_(),
+            "logits": torch.zeros(n_clients, max_rows, len(MOVES)).share_memory_(),
+            "v": torch.zeros(n_clients, max_rows).share_memory_(),
+            "rows": torch.zeros(n_clients, dtype=torch.int64).share_memory_(),
+            "t_submit": torch.zeros(n_clients, dtype=torch.float64).share_memory_(),
+            # cada cliente tiene a lo sumo un pedido en vuelo: el ring nunca se llena
+            "ring": torch.zeros(n_clients, dtype=torch.int64).share_memory_(),
+            "head_tail": torch.zeros(2, dtype=torch.int64).share_memory_(),
+            "stats": torch.zeros(5, dtype=torch.float64).share_memory_(),
+            "lock": ctx.Lock(),
+            "ready": ctx.Semaphore(0),
+            "done": [ctx.Semaphore(0) for _ in range(n_clients)],
+        }
+        self.n_clients = n_clients
+        self._stop = ctx.Event()
+        self._proc = ctx.Process(target=_serve, name="inference-server", daemon=True,
+                                 args=(self.chan, shared_net, version, self._stop, max_batch,
+                                       max_wait_ms / 1000.0, threads))
+
+    def start(self) -> "InferenceServer":
+        self._proc.start()
+        return self
+
+    def client(self, idx: int) -> InferenceClient:
+        if not 0 <= idx < self.n_clients:
+            raise ValueError(f"Cliente {idx} fuera de rango (n_clients={self.n_clients})")
+        return InferenceClient(idx, self.chan)
+
+    def stats(self) -> dict:
+        b, rows, reqs, queue_s, fwd_s = self.chan["stats"].tolist()
+        return {"batches": int(b), "rows": int(rows), "requests": int(reqs),
+                "mean_batch_rows": rows / b if b else 0.0,
+                "mean_requests_per_batch": reqs / b if b else 0.0,
+                "mean_queue_ms": 1000 * queue_s / reqs if reqs else 0.0,
+                "mean_forward_ms": 1000 * fwd_s / b if b else 0.0}
+
+    def close(self) -> None:
+        self._stop.set()
+        self._proc.join(timeout=5)
+        if self._proc.is_alive():
+            self._proc.terminate()
@@ -0,0 +1,108 @@
+# models/registry.py
+"""
+Registro de modelos por proceso: cada checkpoint se carga una sola vez y queda
+"caliente" para todos los solve(). Si cambia el mtime del archivo se recarga
+(hot-reload). Opcionalmente sirve un grafo congelado (TorchScript u ONNX).
+"""
+import os, threading, warnings
+import numpy as np
+import torch
+from typing import Dict, Optional, Tuple
+from .policy_value_net import PolicyValueNet
+
+BACKENDS = ["eager", "torchscript", "onnx"]
+
+class InferenceModel:
+    """
+    Envoltorio que se usa igual que PolicyValueNet: model(x) -> (logits, v),
+    siempre bajo torch.inference_mode. Sirve como `net` en run_mcts y los solvers.
+    """
+    def __init__(self, fn, backend: str, path: str, mtime: float, version: int):
+        self._fn = fn
+        self.backend = backend
+        self.path = path
+        self.mtime = mtime
+        self.version = version  # cuántas veces se (re)cargó
+
+    def __call__(self, x: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        with torch.inference_mode():
+            return self._fn(x)
+
+    def eval(self):
+        return self
+
+def _load_eager(path, device, state_dim, n_actions):
+    net = PolicyValueNet(state_dim, n_actions).to(device)
+    net.load_state_dict(torch.load(path, map_location=device))
+    net.eval()
+    return net
+
+def _to_torchscript(net, device, state_dim):
+    example = torch.zeros(1, state_dim, device=device)
+    with torch.no_grad(), warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)  # torch.jit está deprecado en torch recientes
+        traced = torch.jit.trace(net, example)
+        return torch.jit.freeze(traced.eval())
+
+def _to_onnx(net, path, state_dim):
+    try:
+        import onnxruntime as ort
+    except ImportError as e:
+        raise ImportError("El backend onnx requiere `pip install onnx onnxruntime`") from e
+    onnx_path = os.path.splitext(path)[0] + ".onnx"
+    if not os.path.exists(onnx_path) or os.path.getmtime(onnx_path) < os.path.getmtime(path):
+        net = net.cpu()
+        torch.onnx.export(net, (torch.zeros(1, state_dim),), onnx_path,
+                          input_names=["x"], output_names=["logits", "v"],
+                          dynamic_axes={"x": {0: "batch"}, "logits": {0: "batch"}, "v": {0: "batch"}},
+                          dynamo=False)
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = torch.get_num_threads()
+    sess = ort.InferenceSession(onnx_path, opts, providers=["CPUExecutionProvider"])
+
+    def run(x):
+        logits, v = sess.run(None, {"x": x.detach().cpu().numpy().astype(np.float32)})
+        return torch.from_numpy(logits), torch.from_numpy(v)
+    return run
+
+class ModelRegistry:
+    def __init__(self):
+        self._models: Dict[tuple, InferenceModel] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str, device: str = "cpu", backend: str = "eager",
+            state_dim: int = 324, n_actions: int = 18, num_threads: Optional[int] = None) -> Optional[InferenceModel]:
+        """Devuelve el modelo listo para inferencia, o None si el checkpoint no existe."""
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend desconocido: {backend} (opciones: {BACKENDS})")
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        path = os.path.abspath(path)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        key = (path, device, backend)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None and model.mtime == mtime:
+                return model
+            net = _load_eager(path, device, state_dim, n_actions)
+            if backend == "torchscript":
+                fn = _to_torchscript(net, device, state_dim)
+            elif backend == "onnx":
+                fn = _to_onnx(net, path, state_dim)
+            else:
+                fn = net
+            version = model.version + 1 if model is not None else 1
+            model = self._models[key] = InferenceModel(fn, backend, path, mtime, version)
+            return model
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+REGISTRY = ModelRegistry()
+
+def get_model(path: str, device: str = "cpu", backend: str = "eager", **kwargs) -> Optional[InferenceModel]:
+    return REGISTRY.get(path, device=device, backend=backend, **kwargs)
@@ -0,0 +1,178 @@
+# rl/actor_learner.py
+"""
+Self-play distribuido: N procesos actores juegan episodios estilo play_game y
+mandan las trayectorias por una cola; el learner entrena y cada sync_every
+updates publica los pesos en una copia de PolicyValueNet en memoria compartida.
+"""
+import os, time, random, queue
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+from envs.cube3x3 import STATE_DIM, MOVES
+from models.policy_value_net import PolicyValueNet
+from models.inference_server import InferenceServer
+from rl.replay import ReplayBuffer, to_stickers
+from rl.self_play import play_game, game_schedule, train_step
+from rl.transposition import TranspositionTable
+
+def _actor(rank, shared_net, version, games_started, stop, traj_q, cfg, client=None):
+    torch.set_num_threads(1)
+    seed = cfg["seed"] + rank
+    random.seed(seed); np.random.seed(seed); torch.manual_seed(seed)
+
+    if client is not None:  # forwards en el servidor de inferencia compartido
+        net = client
+        local_version = version.value
+    else:
+        net = PolicyValueNet(STATE_DIM, len(MOVES))
+        with version.get_lock():
+            net.load_state_dict(shared_net.state_dict())
+            local_version = version.value
+    tt = TranspositionTable(cfg["tt_size"], len(MOVES)) if cfg["tt_size"] else None
+
+    while not stop.is_set():
+        if version.value != local_version:
+            if client is None:
+                with version.get_lock():
+                    net.load_state_dict(shared_net.state_dict())
+            local_version = version.value
+            if tt is not None:
+                tt.clear()
+        with games_started.get_lock():
+            games_started.value += 1
+            it = games_started.value
+
+        scramble_len, temperature = game_schedule(it, cfg["curriculum"])
+        states, pis, z, solved = play_game(
+            net, "cpu",
+            scramble_len=scramble_len,
+            max_steps=cfg["max_steps"],
+            n_sims=cfg["sims_per_move"],
+            temperature=temperature,
+            mcts_batch=cfg["mcts_batch"],
+            tt=tt
+        )
+        # los estados viajan como stickers uint8 (54 B en vez de 324 float32)
+        traj = (to_stickers(np.stack(states)), np.stack(pis).astype(np.float32), z, solved)
+        while not stop.is_set():
+            try:
+                traj_q.put(traj, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+    # no esperar a vaciar la cola al salir (el learner puede ya no estar leyendo)
+    traj_q.cancel_join_thread()
+
+def _publish(net, shared_net, version):
+    with version.get_lock():
+        with torch.no_grad():
+            for name, t in shared_net.state_dict().items():
+                t.copy_(net.state_dict()[name].detach().cpu())
+        version.value += 1
+
+def train_actor_learner(
+    out_path="models/checkpoints/pvnet_3x3.pt",
+    device="cpu",
+    steps=2_000,
+    batch_size=256,
+    lr=1e-3,
+    sims_per_move=128,
+    curriculum=(1, 10),
+    max_steps=60,
+    eval_every=500,
+    mcts_batch=8,
+    tt_size=1 << 18,
+    workers=4,
+    sync_every=10,
+    seed=0,
+    replay_capacity=200_000,
+    replay_path=None,
+    augment=True,
+    inference_server=False,
+):
+    """
+    Igual que train_self_play (steps = episodios) pero con `workers` actores en
+    paralelo. Reporta games/s y positions/s cada eval_every episodios.
+    inference_server=True: los actores no tienen red propia y mandan sus
+    forwards a un InferenceServer compartido que los junta en lotes.
+    Devuelve los contadores de la corrida (games, positions, updates, version).
+    """
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    ctx = mp.get_context("spawn")
+
+    net = PolicyValueNet(STATE_DIM, len(MOVES)).to(device)
+    opt = torch.optim.Adam(net.parameters(), lr=lr)
+    buf = ReplayBuffer(replay_capacity, path=replay_path)
+
+    shared_net = PolicyValueNet(STATE_DIM, len(MOVES))
+    shared_net.load_state_dict({k: v.cpu() for k, v in net.state_dict().items()})
+    shared_net.share_memory()
+    version = ctx.Value("i", 0)
+    games_started = ctx.Value("i", 0)
+    stop = ctx.Event()
+    traj_q = ctx.Queue(maxsize=4 * workers)
+    cfg = dict(seed=seed, curriculum=curriculum, max_steps=max_steps, sims_per_move=sims_per_move,
+               mcts_batch=mcts_batch, tt_size=tt_size)
+    server = InferenceServer(shared_net, workers, version=version).start() if inference_server else None
+    procs = [ctx.Process(target=_actor, args=(r, shared_net, version, games_started, stop, traj_q, cfg,
+                                              server.client(r) if server is not None else None),
+                         daemon=True) for r in range(workers)]
+    for p in procs:
+        p.start()
+
+    solved_rate_hist = []
+    games = positions = updates = 0
+    t_start = t_last = time.time()
+    games_last = positions_last = 0
+    try:
+        while games < steps:
+            try:
+                states, pis, z, solved = traj_q.get(timeout=1.0)
+            except queue.Empty:
+                if not any(p.is_alive() for p in procs):
+                    raise RuntimeError("Todos los actores terminaron inesperadamente")
+                continue
+            buf.push_many(states, pis, z)
+            games += 1
+            positions += len(states)
+
+            solved_rate_hist.append(1 if solved else 0)
+            if len(solved_rate_hist) > 200: solved_rate_hist = solved_rate_hist[-200:]
+
+            if len(buf) >= batch_size:
+                train_step(net, opt, buf, batch_size, device, augment)
+                updates += 1
+                if updates % sync_every == 0:
+                    _publish(net, shared_net, version)
+
+            if games % eval_every == 0:
+                now = time.time()
+                dt = max(now - t_last, 1e-9)
+                sr = sum(solved_rate_hist) / len(solved_rate_hist)
+                print(f"[{games}] solved_rate(últimos {len(solved_rate_hist)}): {sr:.3f} | "
+                      f"{(games - games_last) / dt:.2f} games/s, {(positions - positions_last) / dt:.1f} positions/s, "
+                      f"updates={updates}, pesos v{version.value}")
+                if server is not None:
+                    st = server.stats()
+                    print(f"    inferencia: lote medio {st['mean_batch_rows']:.1f} filas "
+                          f"({st['mean_requests_per_batch']:.1f} pedidos), espera en cola {st['mean_queue_ms']:.2f} ms, "
+                          f"forward {st['mean_forward_ms']:.2f} ms")
+                t_last, games_last, positions_last = now, games, positions
+                torch.save(net.state_dict(), out_path)
+                buf.flush()
+    finally:
+        stop.set()
+        for p in procs:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        if server is not None:
+            server.close()
+
+    elapsed = max(time.time() - t_start, 1e-9)
+    print(f"{games} episodios en {elapsed:.1f}s: {games / elapsed:.2f} games/s, "
+          f"{positions / elapsed:.1f} positions/s ({workers} actores)")
+    torch.save(net.state_dict(), out_path)
+    buf.flush()
+    print(f"Modelo guardado en: {out_path}")
+    return {"games": games, "positions": positions, "updates": updates, "version": version.value}
@@ -0,0 +1,158 @@
+# rl/arena.py
+"""
+Arena de evaluación: un proceso aparte que toma cada checkpoint apenas se
+escribe y lo mide contra un conjunto fijo de scrambles (misma semilla siempre,
+bench.suite.scramble_set), así los números se comparan entre corridas.
+
+La búsqueda es greedy por política (argmax, sin deshacer el último giro) y va
+en lote: todos los cubos avanzan juntos y cada paso es un forward sobre los
+que siguen sin armar, con todos los hilos de torch. Por profundidad se reporta
+tasa de resolución, largo medio y tiempo medio hasta resolver; los resultados
+van a <ckpt_dir>/arena.jsonl y el mejor modelo se copia a <ckpt_dir>/best.pt.
+"""
+import json, os, time
+from typing import Dict, Iterable, Optional
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+from envs.cube3x3 import MOVES, MOVE_TO_IDX, STATE_DIM, VectorCube3x3Env
+from models.policy_value_net import PolicyValueNet
+
+DEPTHS = (1, 3, 5, 7, 10, 13, 15, 20)
+_INVERSE = np.array([MOVE_TO_IDX[m[0] + {"": "'", "'": "", "2": "2"}[m[1:]]] for m in MOVES])
+
+def greedy_solve(net, states: np.ndarray, max_steps: int = 40, device: str = "cpu"):
+    """
+    Rollout greedy en lote. Devuelve (resuelto bool[N], movimientos int[N],
+    segundos float[N] hasta resolver; nan si no se resolvió).
+    """
+    venv = VectorCube3x3Env(states=states)
+    n = venv.num_envs
+    moves = np.zeros(n, dtype=np.int64)
+    seconds = np.full(n, np.nan)
+    last = np.full(n, -1)
+    solved = venv.is_solved()
+    seconds[solved] = 0.0
+    t0 = time.perf_counter()
+    with torch.inference_mode():
+        for _ in range(max_steps):
+            active = np.nonzero(~solved)[0]
+            if len(active) == 0:
+                break
+            sub = VectorCube3x3Env(states=venv.states[active])
+            logits, _ = net(torch.from_numpy(sub.state_embedding()).to(device))
+            logits = logits.float().cpu().numpy()
+            undo = last[active] >= 0
+            logits[np.nonzero(undo)[0], _INVERSE[last[active][undo]]] = -np.inf
+            a = logits.argmax(1)
+            sub.step(a)
+            venv.states[active] = sub.states
+            last[active] = a
+            moves[active] += 1
+            now = sub.is_solved()
+            solved[active[now]] = True
+            seconds[active[now]] = time.perf_counter() - t0
+    return solved, moves, seconds
+
+def fixed_suite(depths: Iterable[int] = DEPTHS, per_depth: int = 100, seed: int = 0) -> Dict[int, np.ndarray]:
+    from bench.suite import scramble_set
+    from utils.move_compiler import scramble_state
+    return {d: np.stack([scramble_state(s) for s in scramble_set(d, per_depth, seed)]) for d in depths}
+
+def evaluate(net, suite: Dict[int, np.ndarray], max_steps: int = 40, device: str = "cpu") -> dict:
+    """Todas las profundidades en un único rollout; métricas por profundidad."""
+    depths = list(suite)
+    states = np.concatenate([suite[d] for d in depths])
+    solved, moves, seconds = greedy_solve(net, states, max_steps, device)
+    out, i = {}, 0
+    for d in depths:
+        sl = slice(i, i + len(suite[d]))
+        ok = solved[sl]
+        out[str(d)] = {"solve_rate": float(ok.mean()),
+                       "mean_moves": float(moves[sl][ok].mean()) if ok.any() else None,
+                       "mean_solve_ms": float(seconds[sl][ok].mean() * 1000) if ok.any() else None}
+        i += len(suite[d])
+    rates = [v["solve_rate"] for v in out.values()]
+    lengths = [v["mean_moves"] for v in out.values() if v["mean_moves"] is not None]
+    return {"depths": out, "mean_solve_rate": float(np.mean(rates)),
+            "mean_moves": float(np.mean(lengths)) if lengths else None}
+
+def _better(a: dict, b: Optional[dict]) -> bool:
+    """Más tasa de resolución media; a igual tasa, soluciones más cortas."""
+    if b is None:
+        return True
+    if a["mean_solve_rate"] != b["mean_solve_rate"]:
+        return a["mean_solve_rate"] > b["mean_solve_rate"]
+    return (a["mean_moves"] or float("inf")) < (b["mean_moves"] or float("inf"))
+
+def _format(name: str, res: dict, best: bool) -> str:
+    parts = [f"d{d} {v['solve_rate']:.2f}/{v['mean_moves'] or 0:.1f}mov/{v['mean_solve_ms'] or 0:.0f}ms"
+             for d, v in res["depths"].items()]
+    return f"[arena] {name} it={res['it']}: " + " ".join(parts) + \
+           f" | media {res['mean_solve_rate']:.3f}" + (" ★ mejor" if best else "")
+
+def arena_loop(ckpt_dir: str, stop=None, depths: Iterable[int] = DEPTHS, per_depth: int = 100,
+               max_steps: int = 40, seed: int = 0, poll_s: float = 2.0, threads: Optional[int] = None,
+               once: bool = False, log=print) -> Optional[dict]:
+    """
+    Evalúa el checkpoint más nuevo cada vez que aparece uno (si el learner va
+    más rápido se saltean los intermedios). Con stop (Event) seteado evalúa el
+    último pendiente y termina. Devuelve el resultado del mejor.
+    """
+    from rl.checkpoint import _atomic_save, latest_checkpoint, load_checkpoint
+    torch.set_num_threads(threads or os.cpu_count() or 1)
+    suite = fixed_suite(depths, per_depth, seed)
+    net = PolicyValueNet(STATE_DIM, len(MOVES)).eval()
+    log_path = os.path.join(ckpt_dir, "arena.jsonl")
+    best, best_path = None, os.path.join(ckpt_dir, "best.json")
+    if os.path.exists(best_path):
+        with open(best_path) as f:
+            best = json.load(f)
+    done = None
+    while True:
+        stopping = once or (stop is not None and stop.is_set())
+        path = latest_checkpoint(ckpt_dir) if os.path.isdir(ckpt_dir) else None
+        if path is not None and path != done:
+            done = path
+            try:
+                ck = load_checkpoint(path)
+            except (FileNotFoundError, EOFError, RuntimeError):  # lo borró el keep-N del writer
+                continue
+            net.load_state_dict(ck["model"])
+            t0 = time.perf_counter()
+            res = evaluate(net, suite, max_steps)
+            res.update(checkpoint=os.path.basename(path), it=ck["it"], eval_seconds=time.perf_counter() - t0)
+            is_best = _better(res, best)
+            if is_best:
+                best = res
+                _atomic_save(ck["model"], os.path.join(ckpt_dir, "best.pt"))
+                with open(best_path + ".tmp", "w") as f:
+                    json.dump(best, f)
+                os.replace(best_path + ".tmp", best_path)
+            with open(log_path, "a") as f:
+                f.write(json.dumps(res) + "\n")
+            log(_format(res["checkpoint"], res, is_best))
+            continue  # puede haber llegado otro mientras evaluábamos
+        if stopping:
+            return best
+        if stop is None:
+            time.sleep(poll_s)
+        else:
+            stop.wait(poll_s)
+
+class Arena:
+    """El arena_loop en un proceso aparte (spawn), para no frenar al learner."""
+    def __init__(self, ckpt_dir: str, **cfg):
+        ctx = mp.get_context("spawn")
+        self._stop = ctx.Event()
+        self._proc = ctx.Process(target=arena_loop, args=(ckpt_dir, self._stop), kwargs=cfg,
+                                 name="arena", daemon=True)
+
+    def start(self) -> "Arena":
+        self._proc.start()
+        return self
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Evalúa el último checkpoint pendiente y termina."""
+        self._stop.set()
+        self._proc.join(timeout)
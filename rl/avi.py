@@ -0,0 +1,118 @@
+# rl/avi.py
+"""
+Generación masiva de datos sin MCTS (estilo DeepCubeA, value iteration aproximada).
+
+Los estados se obtienen scrambleando hacia atrás desde el cubo armado, en lote
+con VectorCube3x3Env; el largo del scramble k es una cota del largo de solución.
+El objetivo de valor se arma con un paso de lookahead sobre los 18 hijos,
+evaluados en un solo forward de la red objetivo:
+
+    v(s) = 1                                    si s está armado
+    v(s) = -1 + gamma * (1 + max_a v(hijo_a))   (v(hijo)=1 si el hijo está armado)
+
+que es el punto fijo de v = -1 + 2*gamma^d (d = distancia a armado). Como d <= k,
+el objetivo nunca baja de -1 + 2*gamma^k. La política objetivo es one-hot del mejor hijo.
+"""
+import os, time, copy
+import numpy as np
+import torch
+from envs.cube3x3 import VectorCube3x3Env, MOVE_PERMS, SOLVED_STATE, STATE_DIM, MOVES, N_COLORS
+from models.policy_value_net import PolicyValueNet
+from rl.replay import ReplayBuffer
+from rl.self_play import train_step
+
+_EYE = np.eye(N_COLORS, dtype=np.float32)
+
+def generate_avi_batch(net, n_states, depth_range=(1, 20), gamma=0.95, device="cpu",
+                       chunk=2048, rng=None):
+    """
+    Devuelve (stickers uint8 [n,54], pi one-hot float32 [n,18], v float32 [n], k int [n]).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    lo, hi = depth_range
+    depths = rng.integers(lo, hi + 1, size=n_states)
+    venv = VectorCube3x3Env(n_states)
+    venv.rng = rng
+    venv.scramble(depths)
+    states = venv.states
+
+    A = len(MOVES)
+    values = np.empty(n_states, dtype=np.float32)
+    best = np.empty(n_states, dtype=np.int64)
+    with torch.no_grad():
+        for i in range(0, n_states, chunk):
+            s = states[i:i + chunk]
+            children = s[:, MOVE_PERMS]                                  # [B,18,54]
+            child_solved = (children == SOLVED_STATE).all(-1)            # [B,18]
+            emb = torch.from_numpy(_EYE[children].reshape(-1, STATE_DIM)).to(device)
+            _, v_child = net(emb)
+            v_child = v_child.reshape(len(s), A).cpu().numpy()
+            v_child[child_solved] = 1.0
+            best[i:i + chunk] = v_child.argmax(1)
+            values[i:i + chunk] = -1.0 + gamma * (1.0 + v_child.max(1))
+
+    values = np.maximum(values, -1.0 + 2.0 * gamma ** depths.astype(np.float32))
+    values[venv.is_solved()] = 1.0
+    pis = np.zeros((n_states, A), dtype=np.float32)
+    pis[np.arange(n_states), best] = 1.0
+    return states, pis, values, depths
+
+def train_avi(
+    out_path="models/checkpoints/pvnet_3x3.pt",
+    device="cpu",
+    steps=2_000,
+    batch_size=256,
+    lr=1e-3,
+    depth_range=(1, 20),
+    states_per_iter=10_000,
+    updates_per_iter=20,
+    target_every=10,
+    gamma=0.95,
+    eval_every=50,
+    replay_capacity=2_000_000,
+    replay_path=None,
+    seed=0,
+    augment=True
+):
+    """
+    steps = iteraciones. Cada iteración genera states_per_iter estados etiquetados
+    con la red objetivo, los escribe en el replay (con su k en buf.depth) y hace
+    updates_per_iter pasos de gradiente. La red objetivo se sincroniza cada
+    target_every iteraciones.
+    Usa PolicyValueNet(324, 18), así el checkpoint sirve tal cual para HybridSolver.
+    """
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    rng = np.random.default_rng(seed)
+    net = PolicyValueNet(STATE_DIM, len(MOVES)).to(device)
+    opt = torch.optim.Adam(net.parameters(), lr=lr)
+    target = copy.deepcopy(net).eval()
+    buf = ReplayBuffer(replay_capacity, path=replay_path)
+
+    generated = 0
+    t_gen = 0.0
+    t0 = time.time()
+    for it in range(1, steps + 1):
+        t = time.time()
+        states, pis, values, depths = generate_avi_batch(target, states_per_iter, depth_range, gamma,
+                                                    device, rng=rng)
+        t_gen += time.time() - t
+        buf.push_many(states, pis, values, depths)
+        generated += len(states)
+
+        losses = [train_step(net, opt, buf, batch_size, device, augment)
+                  for _ in range(updates_per_iter) if len(buf) >= batch_size]
+
+        if it % target_every == 0:
+            target.load_state_dict(net.state_dict())
+
+        if it % eval_every == 0:
+            loss = float(np.mean(losses)) if losses else float("nan")
+            print(f"[{it}] loss={loss:.4f} estados={generated} "
+                  f"({generated / max(t_gen, 1e-9) * 60:,.0f} estados/min de generación, "
+                  f"{generated / (time.time() - t0) * 60:,.0f} estados/min total)")
+            torch.save(net.state_dict(), out_path)
+            buf.flush()
+
+    torch.save(net.state_dict(), out_path)
+    buf.flush()
+    print(f"Modelo guardado en: {out_path}")
@@ -0,0 +1,116 @@
+# rl/checkpoint.py
+"""
+Checkpoints completos de entrenamiento (modelo, Adam, iteración, RNGs, replay)
+escritos por un hilo de fondo.
+
+El loop de entrenamiento sólo paga la copia en memoria (snapshot): serializar y
+escribir a disco pasa en el hilo. Cada archivo se escribe a un temporal y se
+renombra (os.replace), así un corte nunca deja un checkpoint a medias, y se
+conservan los `keep` más recientes.
+"""
+import copy, glob, os, queue, random, re, threading
+from typing import Optional
+import numpy as np
+import torch
+
+_NAME = "ckpt_{:08d}.pt"
+_NAME_RE = re.compile(r"ckpt_(\d{8})\.pt$")
+
+def rng_state() -> dict:
+    st = {"python": random.getstate(), "numpy": np.random.get_state(), "torch": torch.get_rng_state()}
+    if torch.cuda.is_available():
+        st["cuda"] = torch.cuda.get_rng_state_all()
+    return st
+
+def set_rng_state(st: dict) -> None:
+    random.setstate(st["python"])
+    np.random.set_state(st["numpy"])
+    torch.set_rng_state(st["torch"])
+    if "cuda" in st and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(st["cuda"])
+
+def snapshot(net, opt, it: int, buf=None, **counters) -> dict:
+    """Copia (en CPU) de todo lo necesario para retomar; después el loop puede seguir mutando."""
+    return {
+        "it": it,
+        "model": {k: v.detach().to("cpu", copy=True) for k, v in net.state_dict().items()},
+        "optimizer": copy.deepcopy(opt.state_dict()),
+        "rng": rng_state(),
+        "replay": buf.state_dict() if buf is not None else None,
+        "counters": counters,
+    }
+
+def checkpoints(directory: str):
+    """Checkpoints del directorio, del más viejo al más nuevo."""
+    paths = [p for p in glob.glob(os.path.join(directory, "ckpt_*.pt")) if _NAME_RE.search(p)]
+    return sorted(paths)
+
+def latest_checkpoint(directory: str) -> Optional[str]:
+    paths = checkpoints(directory)
+    return paths[-1] if paths else None
+
+def load_checkpoint(path: str, map_location="cpu") -> dict:
+    return torch.load(path, map_location=map_location, weights_only=False)
+
+def _atomic_save(obj, path: str) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        torch.save(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+class CheckpointWriter:
+    """
+    writer.save(snapshot(...)) encola y vuelve enseguida; el hilo escribe
+    <directory>/ckpt_<it>.pt y, si se pasó model_path, también el state_dict
+    sólo del modelo (el formato que cargan el registro y los solvers).
+    Un error de escritura se levanta en el próximo save()/close().
+    """
+    def __init__(self, directory: str, keep: int = 3, model_path: Optional[str] = None):
+        self.directory = directory
+        self.keep = keep
+        self.model_path = model_path
+        self.last_path: Optional[str] = None
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue(maxsize=2)  # backpressure si el disco no da abasto
+        self._error: Optional[BaseException] = None
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._loop, name="ckpt-writer", daemon=True)
+        self._thread.start()
+
+    def save(self, state: dict) -> None:
+        self._raise()
+        self._queue.put(state)
+
+    def _loop(self):
+        while True:
+            state = self._queue.get()
+            try:
+                if state is None:
+                    return
+                path = os.path.join(self.directory, _NAME.format(state["it"]))
+                _atomic_save(state, path)
+                if self.model_path:
+                    _atomic_save(state["model"], self.model_path)
+                self.last_path = path
+                for old in checkpoints(self.directory)[:-self.keep] if self.keep > 0 else []:
+                    os.remove(old)
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def wait(self) -> None:
+        """Bloquea hasta que se escribió todo lo encolado."""
+        self._queue.join()
+        self._raise()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        self._raise()
+
+    def _raise(self):
+        if self._error is not None:
+            err, self._error = self._error, None
+            raise RuntimeError(f"Falló la escritura del checkpoint: {err}") from err
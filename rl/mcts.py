@@ -2,73 +2,259 @@ import math
 import numpy as np
 import torch
 from typing import Dict
+from rl.transposition import TranspositionTable
+from utils import profiling as prof
 
-class Node:
-    def __init__(self, prior: float):
-        self.P = prior
-        self.N = 0
-        self.W = 0.0
-        self.Q = 0.0
-        self.children: Dict[int, "Node"] = {}
-        self.is_expanded = False
+class MCTSTree:
+    """
+    Árbol MCTS en struct-of-arrays. Cada nodo es una fila y las estadísticas de
+    sus aristas viven en arrays contiguos [nodo, acción]: N, W, P, VL (visitas en
+    vuelo) y child (índice del hijo, -1 si todavía no se creó). El pool crece
+    duplicando capacidad. Guarda el estado (env.state) de cada nodo, así bajar
+    por el árbol no copia entornos.
+
+    Con una TranspositionTable (tt) los hijos que llegan a una posición ya
+    presente en el árbol se enlazan a ese nodo (comparten estadísticas y
+    evaluación); requiere env.state_hash().
+    """
+    def __init__(self, env, capacity: int = 1024, tt: TranspositionTable = None):
+        self.n_actions = len(env.legal_actions())
+        self._scratch = env.copy()
+        self.tt = tt
+        self.index: Dict[int, int] = {}  # hash -> nodo (sólo con tt)
+        state = np.asarray(env.state)
+        A = self.n_actions
+        self.N = np.zeros((capacity, A), dtype=np.int32)
+        self.W = np.zeros((capacity, A), dtype=np.float64)
+        self.P = np.zeros((capacity, A), dtype=np.float32)
+        self.VL = np.zeros((capacity, A), dtype=np.int32)
+        self.child = np.full((capacity, A), -1, dtype=np.int32)
+        self.expanded = np.zeros(capacity, dtype=bool)
+        self.solved = np.zeros(capacity, dtype=bool)
+        self.states = np.zeros((capacity,) + state.shape, dtype=state.dtype)
+        self.hashes = np.zeros(capacity, dtype=np.uint64)
+        self.size = 0
+        self.root = self._new_node(state, env.is_solved(), env.state_hash() if tt is not None else 0)
+
+    @property
+    def capacity(self) -> int:
+        return self.N.shape[0]
+
+    def _grow(self):
+        cap = self.capacity * 2
+        for name in ("N", "W", "P", "VL", "child", "expanded", "solved", "states", "hashes"):
+            old = getattr(self, name)
+            new = np.full((cap,) + old.shape[1:], -1 if name == "child" else 0, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _new_node(self, state, solved: bool, h: int = 0) -> int:
+        if self.size == self.capacity:
+            self._grow()
+        i = self.size
+        self.size += 1
+        self.states[i] = state
+        self.solved[i] = solved
+        self.hashes[i] = h
+        return i
+
+    def child_of(self, node: int, a: int) -> int:
+        """Índice del hijo por la acción a; lo crea (sin expandir) si hace falta."""
+        c = self.child[node, a]
+        if c < 0:
+            env = self._scratch
+            env.state = self.states[node].copy()
+            env.step(a)
+            if self.tt is None:
+                c = self._new_node(env.state, env.is_solved())
+            else:
+                h = env.state_hash()
+                c = self.index.get(h)
+                if c is None:
+                    c = self.index[h] = self._new_node(env.state, env.is_solved(), h)
+                else:
+                    self.tt.transpositions += 1
+            self.child[node, a] = c
+        return int(c)
+
+    def detach(self, node: int, a: int) -> int:
+        """
+        Reemplaza el hijo (compartido) de la arista por un nodo propio sin expandir.
+        Se usa cuando el enlace cerraría un ciclo en el camino actual; la
+        evaluación del nuevo nodo sale igual de la tt.
+        """
+        c = self.child[node, a]
+        c = self.child[node, a] = self._new_node(self.states[c], self.solved[c], self.hashes[c])
+        return int(c)
+
+    def select(self, node: int, c_puct: float, virtual_loss: float) -> int:
+        """PUCT vectorizado sobre las acciones; las visitas en vuelo cuentan como derrotas."""
+        vl = self.VL[node]
+        n = self.N[node] + vl
+        w = self.W[node] - virtual_loss * vl
+        q = np.divide(w, n, out=np.zeros(self.n_actions), where=n > 0)
+        sqrt_total = math.sqrt(int(n.sum()) + 1)
+        score = q + c_puct * self.P[node] * sqrt_total / (1 + n)
+        return int(score.argmax())
+
+    def root_visits(self) -> np.ndarray:
+        return self.N[self.root].astype(np.float32)
+
+    def matches(self, env) -> bool:
+        return np.array_equal(self.states[self.root], env.state)
+
+    def advance(self, action: int) -> None:
+        """
+        Re-enraiza el árbol en el hijo jugado, conservando su subárbol y
+        descartando el resto (se compacta el pool).
+        """
+        new_root = self.child_of(self.root, action)
+        order, seen = [], np.zeros(self.size, dtype=bool)
+        frontier = np.array([new_root])
+        seen[new_root] = True
+        while len(frontier):
+            order.append(frontier)
+            kids = self.child[frontier].ravel()
+            kids = np.unique(kids[kids >= 0])
+            kids = kids[~seen[kids]]
+            seen[kids] = True
+            frontier = kids
+        order = np.concatenate(order)
+        remap = np.full(self.size, -1, dtype=np.int32)
+        remap[order] = np.arange(len(order), dtype=np.int32)
 
-def run_mcts(env, net, n_sims=200, c_puct=1.5, device="cpu"):
+        n = len(order)
+        cap = self.capacity
+        while cap // 2 >= max(n, 1024):
+            cap //= 2
+        for name in ("N", "W", "P", "VL", "expanded", "solved", "states", "hashes"):
+            old = getattr(self, name)
+            new = np.zeros((cap,) + old.shape[1:], dtype=old.dtype)
+            new[:n] = old[order]
+            setattr(self, name, new)
+        child = np.full((cap, self.n_actions), -1, dtype=np.int32)
+        c = self.child[order]
+        child[:n] = np.where(c >= 0, remap[np.maximum(c, 0)], -1)
+        self.child = child
+        self.size = n
+        self.root = 0
+        if self.tt is not None:
+            self.index = {int(h): i for i, h in reversed(list(enumerate(self.hashes[:n])))}
+
+def _evaluate(net, tree, nodes, device="cpu"):
+    """Un único forward para varios nodos. Devuelve (p [B,A], v [B])."""
+    env = tree._scratch
+    with prof.span("mcts.embed"):
+        embs = []
+        for i in nodes:
+            env.state = tree.states[i]
+            embs.append(env.state_embedding())
+    prof.count("mcts.net_calls")
+    prof.count("mcts.net_rows", len(embs))
+    with prof.span("mcts.forward"), torch.no_grad():
+        s = torch.from_numpy(np.stack(embs)).float().to(device)
+        logits, v = net(s)
+        p = torch.softmax(logits, dim=-1).cpu().numpy()
+    return p, v.reshape(-1).cpu().numpy()
+
+def _evaluate_cached(net, tree, nodes, device="cpu"):
+    """Como _evaluate, pero consultando/llenando la tabla de transposición del árbol."""
+    tt = tree.tt
+    if tt is None:
+        return _evaluate(net, tree, nodes, device)
+    nodes = np.asarray(nodes)
+    hashes = tree.hashes[nodes]
+    hit, p, v = tt.lookup_many(hashes)
+    miss = ~hit
+    if miss.any():
+        p_m, v_m = _evaluate(net, tree, nodes[miss], device)
+        tt.store_many(hashes[miss], p_m, v_m)
+        tt.net_evals += len(v_m)
+        p[miss], v[miss] = p_m, v_m
+    return p, v
+
+def run_mcts(env, net, n_sims=200, c_puct=1.5, device="cpu", batch_size=1, virtual_loss=1.0,
+             tree: MCTSTree = None, return_tree=False, tt: TranspositionTable = None):
     """
     MCTS estilo AlphaZero para 1 jugador.
     Devuelve distribución pi sobre acciones (visitas normalizadas).
+
+    batch_size: hojas que se juntan por ronda (leaf-parallel). Cada descenso marca
+    su camino con virtual loss para que las K hojas se repartan por el árbol, y
+    todas se evalúan en un solo forward. Con batch_size=1 es la búsqueda secuencial.
+
+    tree / return_tree: con return_tree=True devuelve (pi, tree). Después de jugar
+    la acción a, tree.advance(a) y pasarlo en la próxima llamada reutiliza el
+    subárbol y sus estadísticas. El env debe exponer su estado en env.state.
+
+    tt: TranspositionTable opcional. Las posiciones repetidas (U U', U D = D U...)
+    comparten nodo dentro del árbol y las evaluaciones se cachean entre llamadas;
+    tt.stats() reporta hit rate y forwards evitados.
     """
-    root = Node(prior=1.0)
-
-    def expand(node, env_copy):
-        with torch.no_grad():
-            s = torch.from_numpy(env_copy.state_embedding()).float().to(device).unsqueeze(0)
-            logits, v = net(s)
-            p = torch.softmax(logits, dim=-1)[0].cpu().numpy()  # [A]
-        for a in env_copy.legal_actions():
-            node.children[a] = Node(prior=float(p[a]))
-        node.is_expanded = True
-        return float(v.item())
-
-    def simulate(node, env_copy, depth=0):
-        if env_copy.is_solved():
-            # recompensa 1 al resolver
-            return 1.0
-        if depth > 100:  # seguridad
-            return -1.0
-
-        if not node.is_expanded:
-            v = expand(node, env_copy)
-            return v
-
-        # PUCT
-        total_N = sum(ch.N for ch in node.children.values()) + 1
-        best_score, best_a = -1e9, None
-        for a, ch in node.children.items():
-            U = c_puct * ch.P * math.sqrt(total_N) / (1 + ch.N)
-            score = ch.Q + U
-            if score > best_score:
-                best_score, best_a = score, a
-
-        # avanzar
-        next_env = env_copy.copy()
-        next_env.step(best_a)
-
-        v = simulate(node.children[best_a], next_env, depth+1)
-
-        # backup
-        ch = node.children[best_a]
-        ch.N += 1
-        ch.W += v
-        ch.Q = ch.W / ch.N
-        return v
-
-    for _ in range(n_sims):
-        simulate(root, env.copy())
-
-    visits = np.zeros(len(env.legal_actions()), dtype=np.float32)
-    for a, ch in root.children.items():
-        visits[a] = ch.N
+    if tree is None or not tree.matches(env):
+        tree = MCTSTree(env, tt=tt)
+
+    def descend():
+        """Baja hasta una hoja. Devuelve (camino [(nodo, acción)], hoja, valor o None si hay que evaluar)."""
+        node, path = tree.root, []
+        on_path = {node}
+        depth = 0
+        while True:
+            if tree.solved[node]:
+                # recompensa 1 al resolver
+                return path, node, 1.0
+            if depth > 100:  # seguridad
+                return path, node, -1.0
+            if not tree.expanded[node]:
+                return path, node, None
+            a = tree.select(node, c_puct, virtual_loss)
+            tree.VL[node, a] += 1
+            path.append((node, a))
+            parent, node = node, tree.child_of(node, a)
+            if node in on_path:  # transposición que cierra un ciclo
+                node = tree.detach(parent, a)
+            on_path.add(node)
+            depth += 1
+
+    def backup(path, v):
+        for node, a in path:
+            tree.VL[node, a] -= 1
+            tree.N[node, a] += 1
+            tree.W[node, a] += v
+
+    sims_done = 0
+    while sims_done < n_sims:
+        k = min(batch_size, n_sims - sims_done)
+        finished = []           # (camino, valor)
+        leaves, waiting = [], []  # hojas únicas a evaluar y caminos que esperan
+        leaf_slot = {}
+        with prof.span("mcts.select"):
+            for _ in range(k):
+                path, leaf, v = descend()
+                if v is not None:
+                    finished.append((path, v))
+                    continue
+                slot = leaf_slot.get(leaf)
+                if slot is None:
+                    slot = leaf_slot[leaf] = len(leaves)
+                    leaves.append(leaf)
+                waiting.append((path, slot))
+
+        if leaves:
+            p, values = _evaluate_cached(net, tree, leaves, device)
+            with prof.span("mcts.expand"):
+                tree.P[leaves] = p
+                tree.expanded[leaves] = True
+                finished.extend((path, float(values[slot])) for path, slot in waiting)
+
+        with prof.span("mcts.backup"):
+            for path, v in finished:
+                backup(path, v)
+        sims_done += k
+    prof.count("mcts.sims", sims_done)
+
+    visits = tree.root_visits()
     if visits.sum() == 0:
         visits += 1.0
     pi = visits / visits.sum()
-    return pi
+    return (pi, tree) if return_tree else pi
@@ -0,0 +1,141 @@
+# rl/replay.py
+import os, json
+import numpy as np
+import torch
+from typing import Optional, Tuple
+from envs.cube3x3 import N_STICKERS, N_COLORS, STATE_DIM, MOVES
+from envs.symmetry import augment as sym_augment
+
+_EYE = np.eye(N_COLORS, dtype=np.float32)
+
+def to_stickers(states: np.ndarray) -> np.ndarray:
+    """Acepta embeddings one-hot (…, 324) o stickers (…, 54) y devuelve stickers uint8."""
+    states = np.asarray(states)
+    if states.shape[-1] == STATE_DIM:
+        return states.reshape(states.shape[:-1] + (N_STICKERS, N_COLORS)).argmax(-1).astype(np.uint8)
+    return states.astype(np.uint8)
+
+class ReplayBuffer:
+    """
+    Buffer circular de capacidad fija sobre arrays contiguos:
+    stickers uint8 (54 B/posición), política objetivo float16, z float32 y
+    depth int16: distancia conocida a armado (el k del scramble en AVI, -1 si
+    no se sabe, como en self-play).
+    Insertar es O(1) por posición y sample() arma el batch con un gather de índices.
+
+    Con path=<dir> los arrays son np.memmap en disco (buffers de millones de
+    posiciones sin ocupar RAM) y el estado se recupera al reabrir el directorio.
+    """
+    META = "meta.json"
+
+    def __init__(self, capacity: int = 200_000, path: Optional[str] = None, n_actions: int = len(MOVES)):
+        self.capacity = capacity
+        self.n_actions = n_actions
+        self.path = path
+        self.size = 0
+        self.pos = 0
+        if path is None:
+            self.states = np.zeros((capacity, N_STICKERS), dtype=np.uint8)
+            self.pis = np.zeros((capacity, n_actions), dtype=np.float16)
+            self.z = np.zeros(capacity, dtype=np.float32)
+            self.depth = np.full(capacity, -1, dtype=np.int16)
+            return
+
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, self.META)
+        mode = "w+"
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta["capacity"] != capacity or meta["n_actions"] != n_actions:
+                raise ValueError(f"El replay en {path} tiene capacity={meta['capacity']}, "
+                                 f"n_actions={meta['n_actions']}")
+            self.size, self.pos = meta["size"], meta["pos"]
+            mode = "r+"
+        self.states = np.memmap(os.path.join(path, "states.u8"), dtype=np.uint8, mode=mode,
+                                shape=(capacity, N_STICKERS))
+        self.pis = np.memmap(os.path.join(path, "pis.f16"), dtype=np.float16, mode=mode,
+                             shape=(capacity, n_actions))
+        self.z = np.memmap(os.path.join(path, "z.f32"), dtype=np.float32, mode=mode, shape=(capacity,))
+        depth_path = os.path.join(path, "depth.i16")
+        fresh = mode == "w+" or not os.path.exists(depth_path)  # replays de antes no tenían depth
+        self.depth = np.memmap(depth_path, dtype=np.int16, mode="w+" if fresh else "r+", shape=(capacity,))
+        if fresh:
+            self.depth[:] = -1
+        if mode == "w+":
+            self.flush()
+
+    def __len__(self): return self.size
+
+    def push_many(self, states: np.ndarray, pis: np.ndarray, z, depth=-1) -> None:
+        states = to_stickers(states)
+        n = len(states)
+        if n == 0:
+            return
+        if n > self.capacity:  # sólo entran las últimas
+            states, pis = states[-self.capacity:], np.asarray(pis)[-self.capacity:]
+            z = np.broadcast_to(np.asarray(z, dtype=np.float32), (n,))[-self.capacity:]
+            depth = np.broadcast_to(np.asarray(depth, dtype=np.int16), (n,))[-self.capacity:]
+            n = self.capacity
+        idx = (self.pos + np.arange(n)) % self.capacity
+        self.states[idx] = states
+        self.pis[idx] = pis
+        self.z[idx] = z
+        self.depth[idx] = depth
+        self.pos = int((self.pos + n) % self.capacity)
+        self.size = min(self.size + n, self.capacity)
+
+    def push_episode(self, states, pis, z) -> None:
+        self.push_many(np.stack(states), np.stack(pis), float(z))
+
+    def sample_arrays(self, batch_size: int, rng=np.random) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(stickers uint8 [B,54], pi float32 [B,A], z float32 [B])."""
+        idx = rng.randint(0, self.size, size=batch_size)
+        return self.states[idx], self.pis[idx].astype(np.float32), self.z[idx]
+
+    def sample(self, batch_size: int, rng=np.random, augment: bool = False) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Batch listo para la red: (one-hot [B,324], pi [B,A], z [B]).
+        augment=True reemplaza cada par por una de sus 48 copias simétricas al azar.
+        """
+        s, p, z = self.sample_arrays(batch_size, rng)
+        if augment:
+            s, p = sym_augment(s, p, rng)
+        s = _EYE[s].reshape(len(s), STATE_DIM)
+        return torch.from_numpy(s), torch.from_numpy(p), torch.from_numpy(np.ascontiguousarray(z))
+
+    def state_dict(self) -> dict:
+        """
+        Copia del contenido para un checkpoint. Con path (memmap) el disco ya es
+        la copia persistente: se hace flush y sólo se guardan size/pos, así que
+        el checkpoint no sirve para retomar exacto (train_self_play lo rechaza).
+        """
+        st = {"capacity": self.capacity, "n_actions": self.n_actions, "size": self.size, "pos": self.pos}
+        if self.path is not None:
+            self.flush()
+            return st
+        n = self.size
+        st.update(states=self.states[:n].copy(), pis=self.pis[:n].copy(), z=self.z[:n].copy(),
+                  depth=self.depth[:n].copy())
+        return st
+
+    def load_state_dict(self, st: dict) -> None:
+        if st["capacity"] != self.capacity or st["n_actions"] != self.n_actions:
+            raise ValueError(f"El replay guardado tiene capacity={st['capacity']}, n_actions={st['n_actions']}")
+        if "states" in st:
+            n = len(st["states"])
+            self.states[:n], self.pis[:n], self.z[:n] = st["states"], st["pis"], st["z"]
+            self.depth[:n] = st.get("depth", -1)
+        self.size, self.pos = st["size"], st["pos"]
+
+    def flush(self) -> None:
+        """Baja los memmap a disco y guarda size/pos (no-op en memoria)."""
+        if self.path is None:
+            return
+        for arr in (self.states, self.pis, self.z, self.depth):
+            arr.flush()
+        tmp = os.path.join(self.path, self.META + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"capacity": self.capacity, "n_actions": self.n_actions,
+                       "size": self.size, "pos": self.pos}, f)
+        os.replace(tmp, os.path.join(self.path, self.META))
@@ -2,38 +2,35 @@ import os, random, time, math
 import numpy as np
 import torch
 import torch.nn.functional as F
-from torch.utils.data import Dataset, DataLoader
-from typing import List, Tuple
 from envs.cube3x3 import Cube3x3Env, MOVES
 from models.policy_value_net import PolicyValueNet
 from rl.mcts import run_mcts
+from rl.replay import ReplayBuffer
+from rl.arena import Arena
+from rl.checkpoint import CheckpointWriter, latest_checkpoint, load_checkpoint, set_rng_state, snapshot
+from rl.transposition import TranspositionTable
+from utils import profiling as prof
+
+def play_game(net, device, scramble_len, max_steps, n_sims, temperature=1.0, mcts_batch=1, tt=None):
+    with prof.span("selfplay.play_game"):
+        states, pis, z, solved = _play_game(net, device, scramble_len, max_steps, n_sims,
+                                            temperature, mcts_batch, tt)
+    prof.count("selfplay.games")
+    prof.count("selfplay.positions", len(states))
+    return states, pis, z, solved
 
-class Replay(Dataset):
-    def __init__(self, capacity=200_000):
-        self.capacity = capacity
-        self.data: List[Tuple[np.ndarray, np.ndarray, float]] = []
-
-    def push_episode(self, states, pis, z):
-        for s, p in zip(states, pis):
-            self.data.append((s.astype(np.float32), p.astype(np.float32), float(z)))
-        if len(self.data) > self.capacity:
-            self.data = self.data[-self.capacity:]
-
-    def __len__(self): return len(self.data)
-    def __getitem__(self, i):
-        s, p, z = self.data[i]
-        return torch.from_numpy(s), torch.from_numpy(p), torch.tensor(z, dtype=torch.float32)
-
-def play_game(net, device, scramble_len, max_steps, n_sims, temperature=1.0):
+def _play_game(net, device, scramble_len, max_steps, n_sims, temperature, mcts_batch, tt):
     env = Cube3x3Env()
     env.scramble(scramble_len)
 
     states, pis = [], []
     solved = False
+    tree = None  # se reutiliza el subárbol de la jugada elegida
 
     for t in range(max_steps):
         s = env.state_embedding()
-        pi = run_mcts(env, net, n_sims=n_sims, device=device)
+        pi, tree = run_mcts(env, net, n_sims=n_sims, device=device, batch_size=mcts_batch,
+                            tree=tree, return_tree=True, tt=tt)
         # muestreo con temperatura
         if temperature > 0:
             probs = np.power(pi, 1.0 / temperature)
@@ -43,6 +40,7 @@ def play_game(net, device, scramble_len, max_steps, n_sims, temperature=1.0):
             a = int(np.argmax(pi))
         states.append(s); pis.append(pi)
         env.step(a)
+        tree.advance(a)
         if env.is_solved():
             solved = True
             break
@@ -50,6 +48,37 @@ def play_game(net, device, scramble_len, max_steps, n_sims, temperature=1.0):
     z = 1.0 if solved else -1.0
     return states, pis, z, solved
 
+def game_schedule(it, curriculum):
+    """Largo de scramble y temperatura para el episodio número it."""
+    # currículo: crece la dificultad con el tiempo
+    lo, hi = curriculum
+    curr_len = min(hi, lo + (it // 400))  # aumenta cada 400 episodios aprox.
+    return random.randint(lo, curr_len), (1.0 if it < 1000 else 0.5)
+
+def train_step(net, opt, buf, batch_size, device, augment=True):
+    """
+    Un paso de gradiente sobre un batch muestreado del buffer. Devuelve la loss.
+    augment: cada ejemplo se reemplaza por una copia simétrica al azar (48 simetrías).
+    """
+    with prof.span("train.sample"):
+        s, p_target, z_target = buf.sample(batch_size, augment=augment)
+        s = s.to(device).float()
+        p_target = p_target.to(device).float()
+        z_target = z_target.to(device).float()
+
+    with prof.span("train.step"):
+        pi_logits, v = net(s)
+        policy_loss = -(p_target * torch.log_softmax(pi_logits, dim=-1)).sum(dim=-1).mean()
+        value_loss  = F.mse_loss(v, z_target)
+        loss = policy_loss + value_loss * 0.5
+
+        opt.zero_grad()
+        loss.backward()
+        opt.step()
+        loss = float(loss.item())
+    prof.count("train.steps")
+    return loss
+
 def train_self_play(
     out_path="models/checkpoints/pvnet_3x3.pt",
     device="cpu",
@@ -59,28 +88,80 @@ def train_self_play(
     sims_per_move=128,
     curriculum=(1, 10),
     max_steps=60,
-    eval_every=500
+    eval_every=500,
+    mcts_batch=8,
+    tt_size=1 << 18,
+    replay_capacity=200_000,
+    replay_path=None,
+    augment=True,
+    profile=False,
+    trace_path=None,
+    log_every_s=30.0,
+    ckpt_dir=None,
+    keep=3,
+    resume=False,
+    arena=False,
 ):
+    """
+    Cada eval_every iteraciones se guarda un checkpoint completo (modelo, Adam,
+    iteración, historial del currículo, RNGs y replay) en ckpt_dir (por defecto
+    <out_path sin extensión>_ckpts/), escrito en segundo plano; quedan los
+    `keep` más nuevos. resume=True retoma desde el último. arena=True evalúa
+    cada checkpoint en un proceso aparte (rl.arena) con scrambles fijos.
+    resume no se combina con replay_path: el replay en disco sigue de largo
+    después del checkpoint y no se puede volver exacto a ese punto.
+
+    profile: contadores y tiempos por fase (utils.profiling) y cada log_every_s
+    segundos un log de games/s, positions/s, sims/s, net-calls/s y reparto del
+    tiempo. trace_path: además exporta un Chrome trace al terminar.
+    """
+    if resume and replay_path is not None:
+        raise ValueError("resume no admite replay_path: el checkpoint no guarda una copia del replay en disco")
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     state_dim = 324
     n_actions = 18
 
     net = PolicyValueNet(state_dim, n_actions).to(device)
     opt = torch.optim.Adam(net.parameters(), lr=lr)
-    buf = Replay()
+    buf = ReplayBuffer(replay_capacity, path=replay_path)
+    tt = TranspositionTable(tt_size, n_actions) if tt_size else None
 
     solved_rate_hist = []
-
-    for it in range(1, steps+1):
-        # currículo: crece la dificultad con el tiempo
-        lo, hi = curriculum
-        curr_len = min(hi, lo + (it // 400))  # aumenta cada 400 episodios aprox.
+    start = 1
+    ckpt_dir = ckpt_dir or os.path.splitext(out_path)[0] + "_ckpts"
+    if resume:
+        path = latest_checkpoint(ckpt_dir)
+        if path is None:
+            raise FileNotFoundError(f"No hay checkpoints para retomar en {ckpt_dir}")
+        ck = load_checkpoint(path, map_location=device)
+        net.load_state_dict(ck["model"])
+        opt.load_state_dict(ck["optimizer"])
+        if ck["replay"] is not None:
+            buf.load_state_dict(ck["replay"])
+        set_rng_state(ck["rng"])
+        solved_rate_hist = list(ck["counters"].get("solved_rate_hist", []))
+        start = ck["it"] + 1
+        print(f"Retomando desde {path} (iteración {ck['it']}, replay {len(buf)} posiciones)")
+    writer = CheckpointWriter(ckpt_dir, keep=keep, model_path=out_path)
+    arena_proc = Arena(ckpt_dir).start() if arena else None
+
+    def checkpoint(it):
+        writer.save(snapshot(net, opt, it, buf, solved_rate_hist=list(solved_rate_hist)))
+    if profile or trace_path:
+        prof.reset()
+        prof.enable(trace=trace_path is not None)
+    rates = prof.RateLogger(log_every_s)
+
+    for it in range(start, steps+1):
+        scramble_len, temperature = game_schedule(it, curriculum)
         states, pis, z, solved = play_game(
             net, device,
-            scramble_len=random.randint(lo, curr_len),
+            scramble_len=scramble_len,
             max_steps=max_steps,
             n_sims=sims_per_move,
-            temperature=1.0 if it < 1000 else 0.5
+            temperature=temperature,
+            mcts_batch=mcts_batch,
+            tt=tt
         )
         buf.push_episode(states, pis, z)
 
@@ -90,25 +171,31 @@ def train_self_play(
 
         # entrenamiento on-policy simple
         if len(buf) >= batch_size:
-            loader = DataLoader(buf, batch_size=batch_size, shuffle=True, drop_last=True)
-            s, p_target, z_target = next(iter(loader))
-            s = s.to(device).float()
-            p_target = p_target.to(device).float()
-            z_target = z_target.to(device).float()
-
-            pi_logits, v = net(s)
-            policy_loss = -(p_target * torch.log_softmax(pi_logits, dim=-1)).sum(dim=-1).mean()
-            value_loss  = F.mse_loss(v, z_target)
-            loss = policy_loss + value_loss * 0.5
-
-            opt.zero_grad()
-            loss.backward()
-            opt.step()
+            train_step(net, opt, buf, batch_size, device, augment)
+            if tt is not None:
+                tt.clear()  # las evaluaciones cacheadas quedaron viejas
 
         if it % eval_every == 0:
             sr = (sum(solved_rate_hist)/len(solved_rate_hist)) if solved_rate_hist else 0.0
             print(f"[{it}] solved_rate(últimos {len(solved_rate_hist)}): {sr:.3f}")
-            torch.save(net.state_dict(), out_path)
-
-    torch.save(net.state_dict(), out_path)
-    print(f"Modelo guardado en: {out_path}")
+            if tt is not None:
+                st = tt.stats()
+                print(f"    tt: hit_rate={st['hit_rate']:.3f} forwards_evitados={st['net_evals_saved']} "
+                      f"({st['saved_fraction']:.1%}) desalojos={st['evictions']}")
+                tt.reset_stats()
+            with prof.span("train.checkpoint"):
+                checkpoint(it)
+        rates.maybe_log()
+
+    if steps % eval_every != 0 or start > steps:
+        checkpoint(max(steps, start - 1))
+    writer.close()
+    print(f"Modelo guardado en: {out_path} (checkpoints en {ckpt_dir})")
+    if arena_proc is not None:
+        arena_proc.close()  # evalúa el último checkpoint antes de salir
+    if prof.ENABLED:
+        rates.maybe_log(force=True)
+        if trace_path:
+            n = prof.export_chrome_trace(trace_path)
+            print(f"Trace ({n} eventos) en: {trace_path}")
+        prof.disable()
@@ -0,0 +1,75 @@
+# rl/transposition.py
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+class TranspositionTable:
+    """
+    Cache de evaluaciones de la red indexada por hash de posición (Zobrist).
+    Tabla de tamaño fijo (potencia de 2), slot = hash & mask; una colisión de
+    slot reemplaza la entrada vieja (always-replace), así la memoria queda acotada.
+
+    También lleva los contadores para medir la ganancia: consultas, aciertos,
+    desalojos, transposiciones dentro del árbol y forwards evitados.
+    """
+    def __init__(self, capacity: int = 1 << 18, n_actions: int = 18):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity debe ser potencia de 2")
+        self.mask = np.uint64(capacity - 1)
+        self.keys = np.zeros(capacity, dtype=np.uint64)  # 0 = vacío
+        self.P = np.zeros((capacity, n_actions), dtype=np.float32)
+        self.V = np.zeros(capacity, dtype=np.float32)
+        self.reset_stats()
+
+    @property
+    def capacity(self) -> int:
+        return len(self.keys)
+
+    def reset_stats(self) -> None:
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+        self.transpositions = 0  # hijos enlazados a un nodo ya existente del árbol
+        self.net_evals = 0       # posiciones que sí pasaron por la red
+
+    def clear(self) -> None:
+        """Vacía la tabla (p.ej. después de actualizar los pesos de la red)."""
+        self.keys[:] = 0
+
+    def _slots(self, hashes: np.ndarray) -> np.ndarray:
+        return (hashes & self.mask).astype(np.intp)
+
+    def lookup_many(self, hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Devuelve (hit [B] bool, p [B,A], v [B]); p/v sólo son válidos donde hit."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        slots = self._slots(hashes)
+        hit = self.keys[slots] == hashes
+        self.lookups += len(hashes)
+        self.hits += int(hit.sum())
+        return hit, self.P[slots], self.V[slots]
+
+    def store_many(self, hashes: np.ndarray, p: np.ndarray, v: np.ndarray) -> None:
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        slots = self._slots(hashes)
+        old = self.keys[slots]
+        self.evictions += int(((old != 0) & (old != hashes)).sum())
+        self.keys[slots] = hashes
+        self.P[slots] = p
+        self.V[slots] = v
+
+    def lookup(self, h: int) -> Optional[Tuple[np.ndarray, float]]:
+        hit, p, v = self.lookup_many(np.array([h], dtype=np.uint64))
+        return (p[0], float(v[0])) if hit[0] else None
+
+    def stats(self) -> Dict[str, float]:
+        saved = self.hits + self.transpositions
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "evictions": self.evictions,
+            "transpositions": self.transpositions,
+            "net_evals": self.net_evals,
+            "net_evals_saved": saved,
+            "saved_fraction": saved / (saved + self.net_evals) if saved + self.net_evals else 0.0,
+            "occupancy": float((self.keys != 0).mean()),
+        }
@@ -0,0 +1,246 @@
+# service/server.py
+"""
+Servicio de resolución HTTP/JSON sobre asyncio (sólo stdlib), pensado para
+correr en localhost. El modelo y las tablas de Kociemba quedan cargados; las
+búsquedas corren en un pool de hilos y todas comparten un MicroBatcher, así
+las evaluaciones de la red de pedidos concurrentes salen en forwards comunes.
+
+    POST /solve   {"cube": "<scramble o 54 facelets URFDLB>",
+                   "method": "kociemba|mcts|astar|beam|ida",   (opcional)
+                   "deadline_ms": 5000, "options": {...}}       (opcionales)
+                  options válidas por método en OPTIONS; otra cosa es un 400
+    GET  /metrics profundidad de colas, latencias (histogramas) y stats del batcher
+    GET  /health
+"""
+import asyncio, json, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+import kociemba
+from utils.metrics import HistogramSet
+from solver.hybrid_solver import CKPT_3x3, METHODS as DL_METHODS, HybridSolver
+from solver.kociemba_solver import _WARMUP
+from utils.move_compiler import to_facelets, to_state
+
+METHODS = ["kociemba"] + DL_METHODS
+# opciones que un cliente puede pasar en "options", por método (nombre -> tipo);
+# lo demás (device, pdb_dir, spaces...) es configuración del servidor
+_NUM = (int, float)
+OPTIONS = {
+    "kociemba": {},
+    "mcts": {"sims": int, "max_steps": int, "mcts_batch": int},
+    "astar": {"batch_size": int, "weight": _NUM, "max_nodes": int, "time_limit": _NUM},
+    "beam": {"beam_width": int, "max_depth": int, "value_weight": _NUM},
+    "ida": {"max_nodes": int, "time_limit": _NUM},
+}
+
+def check_options(method: str, options: dict) -> Optional[str]:
+    """Mensaje de error si alguna opción no existe para el método o no es un número positivo."""
+    accepted = OPTIONS[method]
+    for key, value in options.items():
+        if key not in accepted:
+            return f"Opción desconocida para {method}: {key} (opciones: {sorted(accepted) or 'ninguna'})"
+        if isinstance(value, bool) or not isinstance(value, accepted[key]) or value <= 0:
+            return f"Opción {key}: se espera un número positivo{' entero' if accepted[key] is int else ''}"
+    return None
+_NEEDS_NET = ("mcts", "astar", "beam")
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            500: "Internal Server Error", 504: "Gateway Timeout"}
+MAX_BODY = 1 << 20
+
+class SolveService:
+    def __init__(self, method: str = "mcts", backend: str = "eager", num_threads: Optional[int] = None,
+                 workers: int = 4, max_batch: int = 256, max_wait_ms: float = 2.0,
+                 deadline_ms: float = 10_000, device: str = "cpu", ckpt: str = CKPT_3x3):
+        if method not in METHODS:
+            raise ValueError(f"Método desconocido: {method} (opciones: {METHODS})")
+        self.method = method
+        self.deadline_ms = deadline_ms
+        self.device = device
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="solve")
+        self.latency = HistogramSet()
+        self.queue_wait = HistogramSet()
+        self.responses = {}
+        self.pending = 0    # pedidos esperando un hilo libre
+        self.inflight = 0   # pedidos resolviéndose
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+        # todo caliente antes del primer pedido
+        from models.registry import get_model
+        from models.batching import MicroBatcher
+        self.model = get_model(ckpt, device=device, backend=backend, num_threads=num_threads)
+        self.batcher = MicroBatcher(self.model, max_batch, max_wait_ms) if self.model is not None else None
+        kociemba.solve(_WARMUP)
+        if method == "ida":
+            from solver.ida_solver import preload_tables
+            preload_tables()
+
+    # ---------- resolución (en un hilo del pool) ----------
+    def _solve_sync(self, cube: str, method: str, deadline: float, options: dict, t_submit: float) -> dict:
+        with self._lock:
+            self.pending -= 1
+            self.inflight += 1
+        self.queue_wait.observe(method, (time.monotonic() - t_submit) * 1000)
+        try:
+            t0 = time.monotonic()
+            sol, used = None, method
+            if method != "kociemba" and (method not in _NEEDS_NET or self.batcher is not None):
+                opts = dict(options)
+                if method in ("astar", "ida"):
+                    opts.setdefault("time_limit", max(deadline - time.monotonic(), 0.0))
+                net = self.batcher.client(deadline) if self.batcher is not None else None
+                sol = HybridSolver("3x3", method=method, net=net, **opts).search(cube)
+            if sol is None:
+                sol, used = kociemba.solve(to_facelets(cube)), "kociemba"
+            return {"solution": sol, "moves": len(sol.split()), "method": used,
+                    "fallback": used != method, "seconds": time.monotonic() - t0}
+        finally:
+            with self._lock:
+                self.inflight -= 1
+
+    async def solve(self, payload: dict) -> Tuple[int, dict]:
+        cube = payload.get("cube") or payload.get("scramble") or payload.get("facelets")
+        method = payload.get("method", self.method)
+        options = payload.get("options") or {}
+        if not isinstance(cube, str):
+            return 400, {"error": "Falta 'cube' (scramble o 54 facelets)"}
+        if method not in METHODS:
+            return 400, {"error": f"Método desconocido: {method} (opciones: {METHODS})"}
+        if not isinstance(options, dict):
+            return 400, {"error": "'options' tiene que ser un objeto"}
+        error = check_options(method, options)
+        if error is not None:
+            return 400, {"error": error}
+        try:
+            to_state(cube)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+        budget = float(payload.get("deadline_ms", self.deadline_ms)) / 1000.0
+        t_submit = time.monotonic()
+        deadline = t_submit + budget
+        with self._lock:
+            self.pending += 1
+        fut = asyncio.get_running_loop().run_in_executor(
+            self.executor, self._solve_sync, cube, method, deadline, options, t_submit)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(fut), budget)
+        except (asyncio.TimeoutError, TimeoutError):
+            # el hilo sigue hasta su próxima llamada a la red, que ya levanta DeadlineExceeded
+            fut.add_done_callback(lambda f: f.exception())
+            return 504, {"error": "deadline", "deadline_ms": budget * 1000}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+        return 200, result
+
+    def metrics(self) -> dict:
+        with self._lock:
+            pending, inflight, responses = self.pending, self.inflight, dict(self.responses)
+        return {
+            "uptime_s": time.time() - self.started,
+            "responses": responses,
+            "queue_depth": {"solve": pending,
+                            "inference": self.batcher.queue_depth if self.batcher is not None else 0},
+            "inflight": inflight,
+            "latency_ms": self.latency.snapshot(),
+            "queue_wait_ms": self.queue_wait.snapshot(),
+            "batcher": self.batcher.stats() if self.batcher is not None else None,
+        }
+
+    # ---------- HTTP ----------
+    async def _route(self, verb: str, path: str, body: bytes) -> Tuple[int, dict]:
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            return 200, {"status": "ok", "model": self.model is not None}
+        if path == "/metrics":
+            return 200, self.metrics()
+        if path != "/solve":
+            return 404, {"error": f"No existe {path}"}
+        if verb != "POST":
+            return 405, {"error": "Usar POST"}
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            return 400, {"error": "JSON inválido"}
+        if not isinstance(payload, dict):
+            return 400, {"error": "Se esperaba un objeto JSON"}
+        t0 = time.monotonic()
+        status, result = await self.solve(payload)
+        label = result.get("method", payload.get("method", self.method)) if status == 200 else f"error_{status}"
+        self.latency.observe(str(label), (time.monotonic() - t0) * 1000)
+        return status, result
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                verb, path, headers, body = request
+                if verb is None:
+                    status, result = 400, {"error": path}
+                else:
+                    status, result = await self._route(verb, path, body)
+                with self._lock:
+                    self.responses[status] = self.responses.get(status, 0) + 1
+                keep_alive = verb is not None and headers.get("connection", "").lower() != "close"
+                writer.write(_encode(status, result, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.batcher is not None:
+            self.batcher.close()
+
+async def _read_request(reader: asyncio.StreamReader):
+    """(verbo, path, headers, body); None al cerrar la conexión; verbo None si es inválido."""
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode("latin-1").split()
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        k, _, v = h.decode("latin-1").partition(":")
+        headers[k.strip().lower()] = v.strip()
+    if len(parts) != 3:
+        return None, "Request line inválida", headers, b""
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        return None, "Content-Length inválido", headers, b""
+    if length > MAX_BODY:
+        return None, "Body demasiado grande", headers, b""
+    body = await reader.readexactly(length) if length else b""
+    return parts[0].upper(), parts[1], headers, body
+
+def _encode(status: int, payload: dict, keep_alive: bool) -> bytes:
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, **kwargs) -> None:
+    service = SolveService(**kwargs)
+    server = await service.start(host, port)
+    print(f"Sirviendo en http://{host}:{port} (POST /solve, GET /metrics) — método por defecto: {service.method}, "
+          f"modelo {'cargado' if service.model is not None else 'no encontrado (sólo Kociemba)'}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
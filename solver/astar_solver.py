@@ -0,0 +1,130 @@
+# solver/astar_solver.py
+import heapq, math, time
+import numpy as np
+import torch
+from typing import Optional
+from .base_solver import BaseSolver
+from envs.cube3x3 import (Cube3x3Env, MOVES, MOVE_PERMS, SOLVED_STATE, STATE_DIM, N_COLORS,
+                          state_hashes)
+
+_EYE = np.eye(N_COLORS, dtype=np.float32)
+# la cara de cada movimiento: no se expande la misma cara dos veces seguidas
+_FACE = np.array(["UDLRFB".index(m[0]) for m in MOVES])
+
+def value_to_cost(v: np.ndarray, gamma: float = 0.95) -> np.ndarray:
+    """Invierte v = -1 + 2*gamma^d para estimar la distancia d (heurística)."""
+    v = np.clip(v, -1.0 + 1e-6, 1.0)
+    return np.log((v + 1.0) / 2.0) / math.log(gamma)
+
+class BatchAStarSolver(BaseSolver):
+    """
+    A* ponderado por lotes (estilo DeepCubeA) con la cabeza de valor como heurística.
+    Cada iteración saca los `batch_size` mejores nodos abiertos, genera sus hijos,
+    los puntúa con un único forward de PolicyValueNet y usa un closed set por hash.
+    f = g + weight * h. Devuelve el camino apenas se genera el estado armado.
+    Las métricas de la última búsqueda quedan en last_stats.
+    """
+    def __init__(self, net, batch_size=64, weight=2.0, max_nodes=200_000, time_limit=None,
+                 gamma=0.95, device="cpu"):
+        self.net = net
+        self.batch_size = batch_size
+        self.weight = weight
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.gamma = gamma
+        self.device = device
+        self.last_stats = {}
+
+    def _heuristic(self, states: np.ndarray) -> np.ndarray:
+        with torch.no_grad():
+            s = torch.from_numpy(_EYE[states].reshape(len(states), STATE_DIM)).to(self.device)
+            _, v = self.net(s)
+        return value_to_cost(v.reshape(-1).cpu().numpy(), self.gamma)
+
+    def solve(self, scramble: str) -> Optional[str]:
+        env = Cube3x3Env()
+        env.apply_moves(scramble)
+        return self.solve_state(env.state)
+
+    def solve_state(self, state: np.ndarray) -> Optional[str]:
+        t0 = time.time()
+        self.last_stats = stats = {"expanded": 0, "generated": 1, "iterations": 0}
+        state = np.asarray(state, dtype=np.uint8)
+        if np.array_equal(state, SOLVED_STATE):
+            return self._finish(stats, t0, "")
+
+        # nodos en arrays que crecen: estado, g, padre, movimiento
+        states = [state]
+        g = [0]
+        parent = [-1]
+        move = [-1]
+        node_hash = [int(state_hashes(state[None])[0])]
+        closed = {node_hash[0]: 0}
+        h0 = float(self._heuristic(state[None])[0])
+        open_heap = [(self.weight * h0, 0)]
+
+        def path_to(i):
+            out = []
+            while parent[i] >= 0:
+                out.append(MOVES[move[i]])
+                i = parent[i]
+            return " ".join(reversed(out))
+
+        while open_heap:
+            if stats["expanded"] >= self.max_nodes:
+                break
+            if self.time_limit is not None and time.time() - t0 > self.time_limit:
+                break
+            stats["iterations"] += 1
+
+            batch = []
+            while open_heap and len(batch) < self.batch_size:
+                _, i = heapq.heappop(open_heap)
+                if closed[node_hash[i]] < g[i]:
+                    continue  # se llegó después por un camino más corto
+                batch.append(i)
+            if not batch:
+                continue
+            batch = np.array(batch)
+            stats["expanded"] += len(batch)
+
+            par_states = np.stack([states[i] for i in batch])
+            children = par_states[:, MOVE_PERMS]                       # [B,18,54]
+            bi, ai = np.nonzero(_FACE[None, :] != np.array([_FACE[move[i]] if move[i] >= 0 else -1
+                                                            for i in batch])[:, None])
+            children = children[bi, ai]
+            stats["generated"] += len(children)
+
+            solved = (children == SOLVED_STATE).all(-1)
+            if solved.any():
+                k = int(np.nonzero(solved)[0][0])
+                p = int(batch[bi[k]])
+                return self._finish(stats, t0, (path_to(p) + " " + MOVES[ai[k]]).strip())
+
+            child_g = np.array([g[i] for i in batch[bi]]) + 1
+            hashes = state_hashes(children).tolist()
+            keep = []
+            for j, h in enumerate(hashes):
+                old = closed.get(h)
+                if old is None or child_g[j] < old:
+                    closed[h] = int(child_g[j])
+                    keep.append(j)
+            if not keep:
+                continue
+            keep = np.array(keep)
+            h_cost = self._heuristic(children[keep])
+            for j, hc in zip(keep.tolist(), h_cost.tolist()):
+                idx = len(states)
+                states.append(children[j]); g.append(int(child_g[j])); node_hash.append(hashes[j])
+                parent.append(int(batch[bi[j]])); move.append(int(ai[j]))
+                heapq.heappush(open_heap, (g[idx] + self.weight * hc, idx))
+
+        self._finish(stats, t0, None)
+        return None
+
+    def _finish(self, stats, t0, solution):
+        elapsed = time.time() - t0
+        stats["seconds"] = elapsed
+        stats["nodes_per_sec"] = stats["expanded"] / elapsed if elapsed > 0 else 0.0
+        stats["solved"] = solution is not None
+        return solution
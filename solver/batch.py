@@ -0,0 +1,137 @@
+# solver/batch.py
+"""
+Resolución en lote por streaming: se lee un ítem por línea (scramble, 54
+facelets URFDLB u objeto JSON) y se emite un resultado JSON por línea, en el
+mismo orden. Nada se acumula: la entrada se consume de a poco con una cantidad
+acotada de ítems en vuelo, así la memoria no depende del tamaño del archivo.
+
+Backends: "kociemba" reparte sobre procesos (solve_many); los métodos de
+HybridSolver corren en hilos que comparten un MicroBatcher, así las
+evaluaciones de la red de búsquedas concurrentes salen en forwards comunes.
+"""
+import json, os, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional, TextIO, Tuple
+from solver.kociemba_solver import InvalidItem, SolveResult, solve_many
+from solver.hybrid_solver import METHODS as HYBRID_METHODS
+from utils.metrics import LatencyHistogram
+
+BACKENDS = ["kociemba"] + HYBRID_METHODS
+
+_CUBE_KEYS = ("cube", "scramble", "facelets")
+
+def read_items(lines: Iterable[str]) -> Iterator[Tuple[Optional[object], str, Optional[str]]]:
+    """
+    (id, cubo, error) por línea no vacía. Una línea JSON puede traer "cube",
+    "scramble" o "facelets" y un "id" opcional que se copia a la salida; si no
+    trae ninguno, error dice por qué (no se resuelve como cubo armado). Una
+    línea JSON rota pasa tal cual y se informa como error de ese ítem.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            try:
+                obj = json.loads(line)
+                key = next((k for k in _CUBE_KEYS if k in obj), None)
+                if key is None:
+                    yield obj.get("id"), line, f"Falta el cubo: se espera uno de {', '.join(_CUBE_KEYS)}"
+                else:
+                    yield obj.get("id"), str(obj[key]), None
+                continue
+            except (ValueError, AttributeError, TypeError):
+                pass
+        yield None, line, None
+
+def _solve_hybrid(items: Iterable[str], method: str, workers: int, backend: str = "eager",
+                  num_threads: Optional[int] = None, **options) -> Iterator[SolveResult]:
+    from models.registry import get_model
+    from models.batching import MicroBatcher
+    from solver.hybrid_solver import CKPT_3x3, HybridSolver
+    if method == "ida":  # las PDBs se abren (o construyen) una vez, antes de los hilos
+        from solver.ida_solver import PDB_DIR, preload_tables
+        preload_tables(options.get("pdb_dir", PDB_DIR))
+    model = None if method == "ida" else get_model(CKPT_3x3, backend=backend, num_threads=num_threads)
+    if model is None and method != "ida":
+        raise RuntimeError(f"No hay modelo entrenado en {CKPT_3x3} para el método {method}")
+    batcher = MicroBatcher(model) if model is not None else None
+
+    def one(i: int, item: str) -> SolveResult:
+        if isinstance(item, InvalidItem):
+            return SolveResult(i, item.input, None, item.error, 0.0)
+        t0 = time.perf_counter()
+        try:
+            net = batcher.client() if batcher is not None else None
+            sol = HybridSolver("3x3", method=method, net=net, **options).search(item)
+            err = None if sol is not None else "Sin solución"
+        except Exception as e:
+            sol, err = None, f"{type(e).__name__}: {e}"
+        return SolveResult(i, item, sol, err, time.perf_counter() - t0)
+
+    try:
+        with ThreadPoolExecutor(workers, thread_name_prefix="batch") as pool:
+            pending = deque()
+            it = enumerate(items)
+            while True:
+                for i, item in it:
+                    pending.append(pool.submit(one, i, item))
+                    if len(pending) >= 4 * workers:
+                        break
+                if not pending:
+                    return
+                yield pending.popleft().result()
+    finally:
+        if batcher is not None:
+            batcher.close()
+
+def solve_stream(items: Iterable[str], method: str = "kociemba", workers: Optional[int] = None,
+                 **options) -> Iterator[SolveResult]:
+    """SolveResult en orden de entrada, a medida que terminan (ver solve_many)."""
+    if method not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {method} (opciones: {BACKENDS})")
+    workers = workers or os.cpu_count() or 1
+    if method == "kociemba":
+        return solve_many(items, workers=workers)
+    return _solve_hybrid(items, method, workers, **options)
+
+def run_batch(inp: TextIO, out: TextIO, method: str = "kociemba", workers: Optional[int] = None,
+              log: Optional[TextIO] = None, **options) -> dict:
+    """Resuelve `inp` línea a línea, escribe JSONL en `out` y devuelve el resumen."""
+    ids = deque()  # (id, válido) de los ítems en vuelo (los resultados salen en orden)
+
+    def cubes():
+        # los inválidos viajan como InvalidItem: salen en su lugar, con el mismo
+        # tope de ítems en vuelo que el resto, sin pasar por el solver
+        for item_id, cube, error in read_items(inp):
+            ids.append((item_id, error is None))
+            yield cube if error is None else InvalidItem(cube, error)
+
+    latency = LatencyHistogram()
+    n = ok = total_moves = 0
+    t0 = time.perf_counter()
+    for r in solve_stream(cubes(), method, workers, **options):
+        item_id, valid = ids.popleft()
+        moves = len(r.solution.split()) if r.solution is not None else None
+        record = {"index": r.index, "input": r.input, "solution": r.solution, "moves": moves,
+                  "ms": round(r.seconds * 1000, 3), "error": r.error}
+        if item_id is not None:
+            record["id"] = item_id
+        out.write(json.dumps(record) + "\n")
+        n += 1
+        if r.error is None:
+            ok += 1
+            total_moves += moves
+        if valid:
+            latency.observe(r.seconds * 1000)
+    wall = time.perf_counter() - t0
+    summary = {"items": n, "solved": ok, "errors": n - ok, "seconds": wall,
+               "items_per_sec": n / wall if wall > 0 else 0.0,
+               "mean_moves": total_moves / ok if ok else None,
+               "p50_ms": latency.quantile(0.5), "p99_ms": latency.quantile(0.99), "method": method}
+    if log is not None:
+        log.write(f"[batch/{method}] {n} ítems ({ok} resueltos, {n - ok} con error) en {wall:.2f}s "
+                  f"= {summary['items_per_sec']:.1f} ítems/s | movimientos medios "
+                  f"{summary['mean_moves'] or 0:.2f} | p50 {summary['p50_ms'] or 0:.0f} ms, p99 {summary['p99_ms'] or 0:.0f} ms\n")
+    return summary
@@ -0,0 +1,104 @@
+# solver/beam_solver.py
+import time
+import numpy as np
+import torch
+from typing import Optional
+from .base_solver import BaseSolver
+from envs.cube3x3 import (Cube3x3Env, MOVES, MOVE_PERMS, SOLVED_STATE, STATE_DIM, N_COLORS,
+                          state_hashes)
+
+_EYE = np.eye(N_COLORS, dtype=np.float32)
+_FACE = np.array(["UDLRFB".index(m[0]) for m in MOVES])
+
+class BeamSearchSolver(BaseSolver):
+    """
+    Beam search guiado por la política: conserva los beam_width mejores caminos
+    parciales según  score = log-prob acumulada de la política + value_weight * v.
+    Por profundidad hay exactamente un forward (sobre todos los hijos únicos del
+    beam), así el costo por profundidad es fijo: latencia predecible.
+    Los estados repetidos (dentro del beam o ya visitados) se descartan.
+    """
+    def __init__(self, net, beam_width=256, max_depth=40, value_weight=1.0, device="cpu"):
+        self.net = net
+        self.beam_width = beam_width
+        self.max_depth = max_depth
+        self.value_weight = value_weight
+        self.device = device
+        self.last_stats = {}
+
+    def _forward(self, states: np.ndarray):
+        with torch.no_grad():
+            s = torch.from_numpy(_EYE[states].reshape(len(states), STATE_DIM)).to(self.device)
+            logits, v = self.net(s)
+            logp = torch.log_softmax(logits, dim=-1)
+        return logp.cpu().numpy(), v.reshape(-1).cpu().numpy()
+
+    def solve(self, scramble: str) -> Optional[str]:
+        env = Cube3x3Env()
+        env.apply_moves(scramble)
+        return self.solve_state(env.state)
+
+    def solve_state(self, state: np.ndarray) -> Optional[str]:
+        t0 = time.time()
+        stats = self.last_stats = {"depth": 0, "net_calls": 0, "generated": 0}
+        beam = np.asarray(state, dtype=np.uint8)[None]
+        if np.array_equal(beam[0], SOLVED_STATE):
+            return self._finish(stats, t0, "")
+
+        logp, _ = self._forward(beam)
+        stats["net_calls"] += 1
+        cum = np.zeros(1)
+        last_face = np.array([-1])
+        seen = set(state_hashes(beam).tolist())
+        history = []  # por profundidad: (índice del padre, acción) de cada entrada del beam
+
+        for depth in range(1, self.max_depth + 1):
+            stats["depth"] = depth
+            bi, ai = np.nonzero(_FACE[None, :] != last_face[:, None])
+            children = beam[bi][np.arange(len(bi))[:, None], MOVE_PERMS[ai]]
+            stats["generated"] += len(children)
+
+            solved = (children == SOLVED_STATE).all(-1)
+            if solved.any():
+                k = int(np.nonzero(solved)[0][0])
+                history.append((bi, ai))
+                return self._finish(stats, t0, self._path(history, k))
+
+            # únicos y no visitados; entre duplicados queda el de mejor log-prob
+            child_cum = cum[bi] + logp[bi, ai]
+            hashes = state_hashes(children)
+            order = np.argsort(-child_cum, kind="stable")
+            _, first = np.unique(hashes[order], return_index=True)
+            idx = order[first]
+            idx = idx[[h not in seen for h in hashes[idx].tolist()]]
+            if len(idx) == 0:
+                break
+
+            child_logp, child_v = self._forward(children[idx])
+            stats["net_calls"] += 1
+            score = child_cum[idx] + self.value_weight * child_v
+            top = np.argsort(-score, kind="stable")[:self.beam_width]
+            sel = idx[top]
+
+            beam = children[sel]
+            cum = child_cum[sel]
+            logp = child_logp[top]
+            last_face = _FACE[ai[sel]]
+            seen.update(hashes[sel].tolist())
+            history.append((bi[sel], ai[sel]))
+
+        return self._finish(stats, t0, None)
+
+    @staticmethod
+    def _path(history, k):
+        moves = []
+        for parents, actions in reversed(history):
+            moves.append(MOVES[actions[k]])
+            k = parents[k]
+        return " ".join(reversed(moves))
+
+    def _finish(self, stats, t0, solution):
+        elapsed = time.time() - t0
+        stats["seconds"] = elapsed
+        stats["solved"] = solution is not None
+        return solution
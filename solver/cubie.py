@@ -0,0 +1,255 @@
+# solver/cubie.py
+"""
+Modelo por cubies del 3x3 (esquinas y aristas con orientación) y las tablas de
+movimiento sobre coordenadas, al estilo Kociemba. Todo se deriva del motor de
+stickers (MOVE_PERMS), así las convenciones coinciden con envs/cube3x3.py.
+
+Representación "reemplazado por": cp[i] = esquina que ocupa la posición i,
+co[i] = su orientación (0..2); ídem ep/eo para aristas (0..1).
+Aplicar el movimiento M al estado S:  cp' = S.cp[M.cp],  co' = (S.co[M.cp] + M.co) % 3.
+"""
+import os, threading
+from functools import lru_cache
+from itertools import combinations
+from math import factorial
+from typing import NamedTuple, Optional
+import numpy as np
+from envs.cube3x3 import MOVES, MOVE_PERMS, SOLVED_STATE
+
+# facelets (índice kociemba 9*cara + 3*fila + col) de cada esquina: URF UFL ULB UBR DFR DLF DBL DRB
+CORNER_FACELETS = np.array([[8, 9, 20], [6, 18, 38], [0, 36, 47], [2, 45, 11],
+                            [29, 26, 15], [27, 44, 24], [33, 53, 42], [35, 17, 51]])
+# aristas: UR UF UL UB DR DF DL DB FR FL BL BR
+EDGE_FACELETS = np.array([[5, 10], [7, 19], [3, 37], [1, 46], [32, 16], [28, 25],
+                          [30, 43], [34, 52], [23, 12], [21, 41], [50, 39], [48, 14]])
+CORNER_COLORS = SOLVED_STATE[CORNER_FACELETS]
+EDGE_COLORS = SOLVED_STATE[EDGE_FACELETS]
+_U, _D = 0, 3
+
+N_MOVES = len(MOVES)
+N_CP = factorial(8)   # 40320
+N_CO = 3 ** 7         # 2187
+N_EO = 2 ** 11        # 2048
+N_SLICE = 495         # C(12, 4): posiciones (sin orden) de las aristas FR FL BL BR
+N_UD_EP = factorial(8)
+N_SLICE_PERM = 24
+SLICE_EDGES = (8, 9, 10, 11)
+# movimientos del subgrupo G1 = <U, D, R2, L2, F2, B2> (fase 2 de Kociemba)
+G1_MOVES = tuple(m for m, name in enumerate(MOVES) if name[0] in "UD" or name.endswith("2"))
+
+class CubieCube(NamedTuple):
+    cp: np.ndarray
+    co: np.ndarray
+    ep: np.ndarray
+    eo: np.ndarray
+
+def from_stickers(state: np.ndarray) -> CubieCube:
+    """Estado de 54 stickers -> CubieCube. ValueError si no es un cubo válido."""
+    state = np.asarray(state)
+    cp = np.zeros(8, dtype=np.int64); co = np.zeros(8, dtype=np.int64)
+    ep = np.zeros(12, dtype=np.int64); eo = np.zeros(12, dtype=np.int64)
+    for i, fac in enumerate(CORNER_FACELETS):
+        cols = state[fac]
+        ori = [k for k in range(3) if cols[k] in (_U, _D)]
+        if len(ori) != 1:
+            raise ValueError(f"Esquina inválida en la posición {i}")
+        o = ori[0]
+        match = [j for j in range(8) if CORNER_COLORS[j][1] == cols[(o + 1) % 3]
+                 and CORNER_COLORS[j][2] == cols[(o + 2) % 3]]
+        if not match:
+            raise ValueError(f"Esquina inválida en la posición {i}")
+        cp[i], co[i] = match[0], o
+    for i, fac in enumerate(EDGE_FACELETS):
+        a, b = state[fac]
+        for j, (x, y) in enumerate(EDGE_COLORS):
+            if (a, b) == (x, y):
+                ep[i], eo[i] = j, 0; break
+            if (a, b) == (y, x):
+                ep[i], eo[i] = j, 1; break
+        else:
+            raise ValueError(f"Arista inválida en la posición {i}")
+    if sorted(cp) != list(range(8)) or sorted(ep) != list(range(12)):
+        raise ValueError("Piezas repetidas: el estado no es un cubo válido")
+    return CubieCube(cp, co, ep, eo)
+
+def to_stickers(c: CubieCube) -> np.ndarray:
+    """Inversa de from_stickers."""
+    state = SOLVED_STATE.copy()  # centros fijos
+    for i, fac in enumerate(CORNER_FACELETS):
+        for k in range(3):
+            state[fac[(c.co[i] + k) % 3]] = CORNER_COLORS[c.cp[i]][k]
+    for i, fac in enumerate(EDGE_FACELETS):
+        for k in range(2):
+            state[fac[(c.eo[i] + k) % 2]] = EDGE_COLORS[c.ep[i]][k]
+    return state
+
+def _parity(p: np.ndarray) -> int:
+    return sum(int(p[i] > p[j]) for i in range(len(p)) for j in range(i + 1, len(p))) % 2
+
+def random_cubie(rng: np.random.Generator) -> CubieCube:
+    """Estado uniforme entre los 4.3e19 alcanzables (paridades y orientaciones consistentes)."""
+    cp, ep = rng.permutation(8), rng.permutation(12)
+    if _parity(cp) != _parity(ep):
+        ep[[0, 1]] = ep[[1, 0]]
+    co, eo = rng.integers(0, 3, 8), rng.integers(0, 2, 12)
+    co[-1] = -co[:-1].sum() % 3
+    eo[-1] = eo[:-1].sum() % 2
+    return CubieCube(cp, co, ep, eo)
+
+def multiply(a: CubieCube, b: CubieCube) -> CubieCube:
+    return CubieCube(a.cp[b.cp], (a.co[b.cp] + b.co) % 3, a.ep[b.ep], (a.eo[b.ep] + b.eo) % 2)
+
+SOLVED_CUBIE = from_stickers(SOLVED_STATE)
+MOVE_CUBIES = [from_stickers(SOLVED_STATE[MOVE_PERMS[m]]) for m in range(N_MOVES)]
+
+# ---------- coordenadas (vectorizadas sobre la primera dimensión) ----------
+def perm_rank(p: np.ndarray, n: int) -> np.ndarray:
+    """
+    Rank de k-permutaciones de {0..n-1}: p (..., k) valores distintos -> [0, n!/(n-k)!).
+    Con k == n es el rank de Lehmer (identidad -> 0).
+    """
+    p = np.asarray(p, dtype=np.int64)
+    k = p.shape[-1]
+    rank = np.zeros(p.shape[:-1], dtype=np.int64)
+    for i in range(k):
+        smaller = (p[..., :i] < p[..., i:i + 1]).sum(-1)
+        rank = rank * (n - i) + (p[..., i] - smaller)
+    return rank
+
+def perm_unrank(rank: np.ndarray, n: int, k: int) -> np.ndarray:
+    rank = np.asarray(rank, dtype=np.int64)
+    digits = np.zeros(rank.shape + (k,), dtype=np.int64)
+    for i in range(k - 1, -1, -1):
+        rank, digits[..., i] = np.divmod(rank, n - i)
+    avail = np.ones(rank.shape + (n,), dtype=bool)
+    out = np.zeros_like(digits)
+    for i in range(k):
+        # la (d+1)-ésima posición libre
+        v = (np.cumsum(avail, -1) > digits[..., i:i + 1]).argmax(-1)
+        out[..., i] = v
+        np.put_along_axis(avail, v[..., None], False, -1)
+    return out
+
+def ori_rank(o: np.ndarray, base: int) -> np.ndarray:
+    """Orientación de las primeras n-1 piezas en base `base` (la última queda determinada)."""
+    o = np.asarray(o, dtype=np.int64)
+    rank = np.zeros(o.shape[:-1], dtype=np.int64)
+    for i in range(o.shape[-1] - 1):
+        rank = rank * base + o[..., i]
+    return rank
+
+def ori_unrank(rank: np.ndarray, base: int, n: int) -> np.ndarray:
+    rank = np.asarray(rank, dtype=np.int64)
+    o = np.zeros(rank.shape + (n,), dtype=np.int64)
+    for i in range(n - 2, -1, -1):
+        rank, o[..., i] = np.divmod(rank, base)
+    o[..., n - 1] = (-o[..., :n - 1].sum(-1)) % base
+    return o
+
+_COMBOS = np.array(list(combinations(range(12), 4)))
+_COMBO_INDEX = np.full(1 << 12, -1, dtype=np.int64)
+_COMBO_INDEX[(1 << _COMBOS).sum(-1)] = np.arange(N_SLICE)
+
+def slice_rank(pos: np.ndarray) -> np.ndarray:
+    """Rank de las 4 posiciones (en cualquier orden) de las aristas del slice: [0, 495)."""
+    return _COMBO_INDEX[(1 << np.asarray(pos, dtype=np.int64)).sum(-1)]
+
+def in_g1(c: CubieCube) -> bool:
+    """Orientaciones en 0 y las aristas del slice dentro del slice."""
+    return not c.co.any() and not c.eo.any() and set(c.ep[8:].tolist()) == set(SLICE_EDGES)
+
+def edge_positions(ep: np.ndarray, pieces) -> np.ndarray:
+    """Posición actual de cada arista de `pieces`."""
+    inv = np.argsort(ep)
+    return inv[list(pieces)]
+
+# ---------- tablas de movimiento ----------
+@lru_cache(maxsize=None)
+def corner_perm_moves() -> np.ndarray:
+    """(8!, 18) int32: rank de cp -> rank tras cada movimiento."""
+    cp = perm_unrank(np.arange(N_CP), 8, 8)
+    out = np.empty((N_CP, N_MOVES), dtype=np.int32)
+    for m, mc in enumerate(MOVE_CUBIES):
+        out[:, m] = perm_rank(cp[:, mc.cp], 8)
+    out.setflags(write=False)
+    return out
+
+@lru_cache(maxsize=None)
+def corner_ori_moves() -> np.ndarray:
+    """(3^7, 18) int16: orientación de esquinas (por posición) tras cada movimiento."""
+    co = ori_unrank(np.arange(N_CO), 3, 8)
+    out = np.empty((N_CO, N_MOVES), dtype=np.int16)
+    for m, mc in enumerate(MOVE_CUBIES):
+        out[:, m] = ori_rank((co[:, mc.cp] + mc.co) % 3, 3)
+    out.setflags(write=False)
+    return out
+
+@lru_cache(maxsize=None)
+def edge_subset_moves(k: int, cache_dir: Optional[str] = None):
+    """
+    Tablas para un subconjunto de k aristas, seguidas por pieza:
+    (12!/(12-k)!, 18) int32 con el rank de sus posiciones tras cada movimiento, y
+    (12!/(12-k)!, 18) uint8 con la máscara de bits de las piezas que se voltean.
+    No dependen de qué aristas se siguen, sólo de k.
+    Con cache_dir se guardan como .npy y se leen con mmap (k=6 tarda ~5s en armarse).
+    """
+    if cache_dir is not None:
+        paths = [os.path.join(cache_dir, f"edges{k}_moves_{part}.npy") for part in ("perm", "flip")]
+        if all(os.path.exists(p) for p in paths):
+            return tuple(np.load(p, mmap_mode="r") for p in paths)
+    size = factorial(12) // factorial(12 - k)
+    pos = perm_unrank(np.arange(size), 12, k)
+    perm = np.empty((size, N_MOVES), dtype=np.int32)
+    flip = np.empty((size, N_MOVES), dtype=np.uint8)
+    weights = 1 << np.arange(k)
+    for m, mc in enumerate(MOVE_CUBIES):
+        new_pos = np.argsort(mc.ep)[pos]  # la pieza en p pasa a la posición i con M.ep[i] == p
+        perm[:, m] = perm_rank(new_pos, 12)
+        flip[:, m] = (mc.eo[new_pos] * weights).sum(-1)
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        for path, arr in zip(paths, (perm, flip)):
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npy"  # hilos/procesos en paralelo
+            np.save(tmp, arr)
+            os.replace(tmp, path)
+    perm.setflags(write=False); flip.setflags(write=False)
+    return perm, flip
+
+@lru_cache(maxsize=None)
+def edge_ori_moves() -> np.ndarray:
+    """(2^11, 18) int16: orientación de aristas (por posición) tras cada movimiento."""
+    eo = ori_unrank(np.arange(N_EO), 2, 12)
+    out = np.empty((N_EO, N_MOVES), dtype=np.int16)
+    for m, mc in enumerate(MOVE_CUBIES):
+        out[:, m] = ori_rank((eo[:, mc.ep] + mc.eo) % 2, 2)
+    out.setflags(write=False)
+    return out
+
+@lru_cache(maxsize=None)
+def slice_moves() -> np.ndarray:
+    """(495, 18) int16: posición del slice tras cada movimiento."""
+    out = np.empty((N_SLICE, N_MOVES), dtype=np.int16)
+    for m, mc in enumerate(MOVE_CUBIES):
+        out[:, m] = slice_rank(np.argsort(mc.ep)[_COMBOS])
+    out.setflags(write=False)
+    return out
+
+@lru_cache(maxsize=None)
+def ud_edge_perm_moves() -> np.ndarray:
+    """(8!, 10) int32: permutación de las 8 aristas U/D, sólo movimientos de G1."""
+    ep = perm_unrank(np.arange(N_UD_EP), 8, 8)
+    out = np.empty((N_UD_EP, len(G1_MOVES)), dtype=np.int32)
+    for j, m in enumerate(G1_MOVES):
+        out[:, j] = perm_rank(ep[:, MOVE_CUBIES[m].ep[:8]], 8)
+    out.setflags(write=False)
+    return out
+
+@lru_cache(maxsize=None)
+def slice_perm_moves() -> np.ndarray:
+    """(4!, 10) int16: orden de las aristas del slice, sólo movimientos de G1."""
+    sp = perm_unrank(np.arange(N_SLICE_PERM), 4, 4)
+    out = np.empty((N_SLICE_PERM, len(G1_MOVES)), dtype=np.int16)
+    for j, m in enumerate(G1_MOVES):
+        out[:, j] = perm_rank(sp[:, MOVE_CUBIES[m].ep[8:] - 8], 4)
+    out.setflags(write=False)
+    return out
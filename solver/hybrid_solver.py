@@ -1,54 +1,137 @@
 # solver/hybrid_solver.py
 from .base_solver import BaseSolver
-from typing import List
-import os, torch
+from typing import List, Optional
+import os
+import numpy as np
 from envs.cube3x3 import Cube3x3Env, MOVES
-from rl.mcts import run_mcts
-from models.policy_value_net import PolicyValueNet
 from solver.kociemba_solver import Kociemba3x3Solver
+from utils.move_compiler import to_facelets, to_state
+# torch y los módulos de búsqueda se importan recién al usar la red:
+# el camino sólo-Kociemba no paga ese costo.
 
 CKPT_3x3 = os.path.join("models", "checkpoints", "pvnet_3x3.pt")
 
+METHODS = ["mcts", "astar", "beam", "ida"]
+
 class HybridSolver(BaseSolver):
-    def __init__(self, kind: str):
+    """
+    method: "mcts" (una jugada por búsqueda MCTS), "astar" (A* ponderado por lotes)
+    o "beam" (beam search guiado por la política, costo fijo por profundidad).
+    "ida" no usa la red: IDA* óptimo con pattern databases (ver IDAStarSolver).
+    options: parámetros de la búsqueda elegida (p.ej. batch_size, weight, max_nodes,
+    beam_width, max_depth).
+    backend / num_threads: cómo se sirve la red desde el registro de modelos
+    ("eager", "torchscript" u "onnx"); el checkpoint se carga una vez por proceso.
+    net: red ya cargada (cualquier callable x -> (logits, v)) en lugar del registro,
+    p.ej. el cliente de un MicroBatcher.
+    """
+    def __init__(self, kind: str, method: str = "mcts", backend: str = "eager",
+                 num_threads: int = None, net=None, **options):
+        if method not in METHODS:
+            raise ValueError(f"Método desconocido: {method} (opciones: {METHODS})")
         self.kind = kind
+        self.method = method
+        self.backend = backend
+        self.num_threads = num_threads
+        self.options = options
+        self.net = net
+        self.last_stats = {}
+
+    def _load_net(self, device="cpu"):
+        if self.net is not None:
+            return self.net
+        from models.registry import get_model
+        # None si todavía no hay modelo
+        return get_model(CKPT_3x3, device=device, backend=self.backend, num_threads=self.num_threads)
+
+    def _solve_3x3_with_astar(self, state: np.ndarray, device="cpu"):
+        net = self._load_net(device)
+        if net is None:
+            return None
+        from solver.astar_solver import BatchAStarSolver
+        astar = BatchAStarSolver(net, device=device, **self.options)
+        sol = astar.solve_state(state)
+        self.last_stats = astar.last_stats
+        return sol
 
-    def _solve_3x3_with_net(self, scramble: str, sims=256, max_steps=120, device="cpu"):
-        # preparar entorno desde scramble
-        env = Cube3x3Env()
-        # Aplicar scramble en PyCuber, parseo simple
-        import pycuber as pc
-        env.cube = pc.Cube()
-        env.cube(pc.Formula(scramble))
+    def _solve_3x3_with_beam(self, state: np.ndarray, device="cpu"):
+        net = self._load_net(device)
+        if net is None:
+            return None
+        from solver.beam_solver import BeamSearchSolver
+        beam = BeamSearchSolver(net, device=device, **self.options)
+        sol = beam.solve_state(state)
+        self.last_stats = beam.last_stats
+        return sol
+
+    def _solve_3x3_with_ida(self, state: np.ndarray):
+        from solver.ida_solver import IDAStarSolver
+        ida = IDAStarSolver(**self.options)
+        sol = ida.solve_state(state)
+        self.last_stats = ida.last_stats
+        return sol
+
+    def _solve_3x3_with_net(self, state: np.ndarray, sims=256, max_steps=120, device="cpu", mcts_batch=16):
+        from rl.mcts import run_mcts
+        from rl.transposition import TranspositionTable
+        env = Cube3x3Env(state)
 
         # cargar red
-        net = PolicyValueNet(324, 18).to(device)
-        if os.path.exists(CKPT_3x3):
-            net.load_state_dict(torch.load(CKPT_3x3, map_location=device))
-            net.eval()
-        else:
-            return None  # sin modelo todavía
+        net = self._load_net(device)
+        if net is None:
+            return None
 
         plan: List[str] = []
+        tree = None
+        tt = TranspositionTable(1 << 16)
         for _ in range(max_steps):
             if env.is_solved(): break
-            pi = run_mcts(env, net, n_sims=sims, device=device)
+            pi, tree = run_mcts(env, net, n_sims=sims, device=device, batch_size=mcts_batch,
+                                tree=tree, return_tree=True, tt=tt)
             action = int(pi.argmax())
             plan.append(env.action_to_move(action))
             env.step(action)
+            tree.advance(action)
         if env.is_solved():
             return " ".join(plan)
         return None
 
+    def search(self, cube) -> Optional[str]:
+        """
+        Solución cruda del 3x3 con el método elegido (sin formato ni fallback):
+        cube es un scramble, 54 facelets URFDLB o un arreglo de stickers.
+        None si la búsqueda no encontró solución (o no hay modelo).
+        """
+        state = to_state(cube) if isinstance(cube, str) else np.asarray(cube, dtype=np.uint8)
+        if self.method == "astar":
+            return self._solve_3x3_with_astar(state)
+        if self.method == "beam":
+            return self._solve_3x3_with_beam(state)
+        if self.method == "ida":
+            return self._solve_3x3_with_ida(state)
+        return self._solve_3x3_with_net(state, **self.options)
+
     def solve(self, scramble: str) -> str:
         if self.kind == "3x3":
-            sol = self._solve_3x3_with_net(scramble)
-            if sol:
+            sol = self.search(scramble)
+            if self.method == "astar":
+                if sol:
+                    return (f"[DL+A*] Solución encontrada ({len(sol.split())}): {sol} "
+                            f"| {self.last_stats['expanded']} nodos, {self.last_stats['nodes_per_sec']:.0f} nodos/s")
+            elif self.method == "beam":
+                if sol:
+                    return (f"[DL+Beam] Solución encontrada ({len(sol.split())}): {sol} "
+                            f"| {self.last_stats['seconds'] * 1000:.0f} ms")
+            elif self.method == "ida":
+                if sol is not None:
+                    return (f"[IDA* óptimo] Solución óptima ({len(sol.split())}): {sol} "
+                            f"| {self.last_stats['nodes']} nodos, {self.last_stats['nodes_per_sec']:.0f} nodos/s")
+            elif sol:
                 return f"[DL+MCTS] Solución encontrada ({len(sol.split())}): {sol}"
             # fallback
             try:
                 ks = Kociemba3x3Solver()
-                return "[Fallback Kociemba] " + ks.solve_from_scramble(scramble)
+                return "[Fallback Kociemba] " + ks.solve_from_facelets(to_facelets(scramble))
             except Exception as e:
                 return f"No fue posible resolver con DL ni con Kociemba: {e}"
 
@@ -0,0 +1,132 @@
+# solver/ida_solver.py
+import time
+import numpy as np
+from typing import Optional
+from .base_solver import BaseSolver
+from .cubie import from_stickers, N_MOVES
+from .pdb import PDB_DIR, CornerSpace, EdgeSpace, default_spaces, load_pdb
+from envs.cube3x3 import Cube3x3Env, MOVES
+
+# poda de secuencias: nunca la misma cara dos veces seguidas, y de dos caras
+# opuestas (conmutan) sólo se genera un orden
+_FACE = np.array(["UDLRFB".index(m[0]) for m in MOVES])
+_ALLOWED = np.ones((N_MOVES + 1, N_MOVES), dtype=bool)  # fila 0 = raíz
+for _last in range(N_MOVES):
+    _f = _FACE[_last]
+    _ALLOWED[_last + 1] = (_FACE != _f) & ~((_FACE // 2 == _f // 2) & (_FACE < _f))
+
+def _covers_cube(spaces) -> bool:
+    """h == 0 sólo implica armado si los espacios cubren todas las piezas."""
+    corners = [sp for sp in spaces if isinstance(sp, CornerSpace)]
+    edges = set()
+    for sp in spaces:
+        if isinstance(sp, EdgeSpace):
+            edges.update(sp.pieces)
+    return (any(sp.permutation for sp in corners) and any(sp.orientation for sp in corners)
+            and edges == set(range(12)))
+
+def preload_tables(pdb_dir: Optional[str] = PDB_DIR):
+    """
+    Abre (o construye, la primera vez) las PDBs por defecto. Conviene llamarla
+    antes de arrancar hilos que creen un IDAStarSolver por pedido.
+    """
+    return [load_pdb(sp, pdb_dir) for sp in default_spaces(pdb_dir)]
+
+class IDAStarSolver(BaseSolver):
+    """
+    Solver óptimo (HTM) estilo Korf: IDA* sobre coordenadas de cubies con
+    pattern databases como heurística, h = max de las PDBs (esquinas y dos
+    grupos de 6 aristas por defecto). Las tablas se construyen la primera vez y
+    quedan cacheadas en pdb_dir.
+
+    La búsqueda en profundidad se hace por lotes: cada paso expande hasta `chunk`
+    nodos de la pila con numpy (hijos, índices y h de los 18 movimientos a la vez).
+    max_nodes / time_limit acotan la búsqueda: si se agotan, solve() devuelve None.
+    Las métricas de la última búsqueda quedan en last_stats (nodos, nodos/s, cota).
+    """
+    def __init__(self, spaces=None, pdb_dir: Optional[str] = PDB_DIR, max_nodes=None,
+                 time_limit=None, chunk=1 << 14):
+        self.spaces = spaces if spaces is not None else default_spaces(pdb_dir)
+        if not _covers_cube(self.spaces):
+            raise ValueError("Las PDBs tienen que cubrir todas las esquinas y aristas")
+        self.tables = [load_pdb(sp, pdb_dir) for sp in self.spaces]
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.chunk = chunk
+        self.last_stats = {}
+
+    def solve(self, scramble: str) -> Optional[str]:
+        env = Cube3x3Env()
+        env.apply_moves(scramble)
+        return self.solve_state(env.state)
+
+    def solve_state(self, state: np.ndarray) -> Optional[str]:
+        t0 = time.time()
+        stats = self.last_stats = {"nodes": 0, "iterations": 0, "bound": 0}
+        cubie = from_stickers(state)
+        root = [np.array([sp.index(cubie)], dtype=np.int64) for sp in self.spaces]
+        solved_idx = np.array([sp.solved for sp in self.spaces])
+        if all(int(r[0]) == s for r, s in zip(root, solved_idx)):
+            return self._finish(stats, t0, "")
+        bound = self._h(root)[0]
+        while True:
+            stats["bound"] = int(bound)
+            stats["iterations"] += 1
+            result = self._search(root, int(bound), stats, t0)
+            if isinstance(result, str):
+                return self._finish(stats, t0, result)
+            if result is None:
+                return self._finish(stats, t0, None)
+            bound = result
+
+    def _h(self, cols):
+        h = self.tables[0][cols[0]]
+        for table, col in zip(self.tables[1:], cols[1:]):
+            h = np.maximum(h, table[col])
+        return h
+
+    def _search(self, root, bound, stats, t0):
+        """
+        Una iteración de IDA* con cota `bound`. Devuelve la solución (str), la
+        próxima cota (int) o None si se agotó el presupuesto.
+        """
+        next_bound = np.iinfo(np.int64).max
+        # pila de lotes: (g, columnas por espacio, movimientos hechos [B,g], último movimiento + 1)
+        stack = [(0, root, np.zeros((1, 0), dtype=np.uint8), np.zeros(1, dtype=np.intp))]
+        while stack:
+            if self.max_nodes is not None and stats["nodes"] >= self.max_nodes:
+                return None
+            if self.time_limit is not None and time.time() - t0 > self.time_limit:
+                return None
+            g, cols, path, last = stack.pop()
+            children = [sp.neighbors(c) for sp, c in zip(self.spaces, cols)]  # [B,18] cada uno
+            mask = _ALLOWED[last]
+            stats["nodes"] += int(mask.sum())
+            f = g + 1 + self._h(children)
+            over = mask & (f > bound)
+            if over.any():
+                next_bound = min(next_bound, int(f[over].min()))
+            keep = mask & (f <= bound)
+            if g + 1 == bound:
+                # con h admisible y f <= cota en la última profundidad, h == 0: armado
+                bi, mi = np.nonzero(keep)
+                for b, m in zip(bi.tolist(), mi.tolist()):
+                    if all(int(c[b, m]) == sp.solved for sp, c in zip(self.spaces, children)):
+                        return " ".join(MOVES[a] for a in path[b].tolist() + [m])
+                continue
+            bi, mi = np.nonzero(keep)
+            if len(bi):
+                new_cols = [c[bi, mi] for c in children]
+                new_path = np.concatenate([path[bi], mi[:, None].astype(np.uint8)], axis=1)
+                # trozos en orden inverso: el primero queda arriba de la pila (DFS)
+                for s in reversed(range(0, len(bi), self.chunk)):
+                    sl = slice(s, s + self.chunk)
+                    stack.append((g + 1, [c[sl] for c in new_cols], new_path[sl], mi[sl] + 1))
+        return next_bound
+
+    def _finish(self, stats, t0, solution):
+        elapsed = time.time() - t0
+        stats["seconds"] = elapsed
+        stats["nodes_per_sec"] = stats["nodes"] / elapsed if elapsed > 0 else 0.0
+        stats["solved"] = solution is not None
+        return solution
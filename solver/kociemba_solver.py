@@ -1,40 +1,14 @@
 # solver/kociemba_solver.py
+import os, time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, NamedTuple, Optional
 import kociemba
-import pycuber as pc
+# scramble -> facelets es una permutación compilada (y cacheada) de utils.move_compiler
+from utils.move_compiler import scramble_to_facelets, to_facelets
 
 ORDER = "URFDLB"
 
-def _face_matrix(cube, f):
-    faces = getattr(cube, "faces", None)
-    if faces is not None:
-        face = faces[f]
-        return [[str(face[r][c]) for c in range(3)] for r in range(3)]
-    gf = getattr(cube, "get_face", None)
-    if gf is not None:
-        face = gf(f)
-        return [[str(face[r][c]) for c in range(3)] for r in range(3)]
-    raise RuntimeError("No se pudo acceder a la cara del cubo con pycuber.")
-
-def _color_to_letter_map(cube):
-    m = {}
-    for f in ORDER:
-        mat = _face_matrix(cube, f)
-        center = mat[1][1]
-        m[center] = f
-    return m
-
-def scramble_to_facelets(scramble: str) -> str:
-    cube = pc.Cube()
-    cube(pc.Formula(scramble))
-    cmap = _color_to_letter_map(cube)
-    facelets = []
-    for f in ORDER:
-        mat = _face_matrix(cube, f)
-        for r in range(3):
-            for c in range(3):
-                facelets.append(cmap[mat[r][c]])
-    return "".join(facelets)
-
 class Kociemba3x3Solver:
     def solve(self, scramble: str) -> str:
         return self.solve_from_scramble(scramble)
@@ -46,3 +20,73 @@ class Kociemba3x3Solver:
     def solve_from_facelets(self, facelets: str) -> str:
         """String de 54 facelets en orden URFDLB (kociemba)."""
         return kociemba.solve(facelets)
+
+    def solve_many(self, items, workers=None, chunksize=16):
+        """Ver solve_many(): lote de scrambles/facelets en paralelo, en orden."""
+        return solve_many(items, workers=workers, chunksize=chunksize)
+
+# ---------- lote: muchos estados sobre un pool de procesos ----------
+_WARMUP = "DRLUUBFBRBLURRLRUBLRDDFDLFUFUFFDBRDUBRUFLLFDDBFLUBLRBD"
+
+class SolveResult(NamedTuple):
+    index: int
+    input: str
+    solution: Optional[str]
+    error: Optional[str]
+    seconds: float
+
+class InvalidItem(NamedTuple):
+    """Ítem que ya se sabe inválido: viaja por el lote sólo para salir en su lugar, con su error."""
+    input: str
+    error: str
+
+def _init_worker():
+    # la primera llamada carga las tablas de poda; se hace una vez por proceso
+    kociemba.solve(_WARMUP)
+
+def _solve_chunk(chunk):
+    out = []
+    for i, item in chunk:
+        if isinstance(item, InvalidItem):
+            out.append(SolveResult(i, item.input, None, item.error, 0.0))
+            continue
+        t0 = time.perf_counter()
+        try:
+            sol, err = kociemba.solve(to_facelets(item)), None
+        except Exception as e:
+            sol, err = None, f"{type(e).__name__}: {e}"
+        out.append(SolveResult(i, item, sol, err, time.perf_counter() - t0))
+    return out
+
+def solve_many(items: Iterable[str], workers: Optional[int] = None, chunksize: int = 16,
+               max_inflight: Optional[int] = None) -> Iterator[SolveResult]:
+    """
+    Resuelve scrambles o facelets repartidos en `workers` procesos y entrega los
+    SolveResult en el mismo orden de entrada, a medida que terminan. La entrada se
+    consume de a poco (a lo sumo max_inflight chunks en vuelo), así la memoria no
+    depende del tamaño del iterable. Los errores se informan por ítem (también
+    los InvalidItem de la entrada, sin resolver nada).
+    """
+    workers = workers or os.cpu_count() or 1
+    max_inflight = max_inflight or 4 * workers
+    it = iter(enumerate(items))
+
+    def next_chunk() -> List:
+        chunk = []
+        for pair in it:
+            chunk.append(pair)
+            if len(chunk) == chunksize:
+                break
+        return chunk
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = deque()
+        while True:
+            while len(pending) < max_inflight:
+                chunk = next_chunk()
+                if not chunk:
+                    break
+                pending.append(pool.submit(_solve_chunk, chunk))
+            if not pending:
+                return
+            yield from pending.popleft().result()
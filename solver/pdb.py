@@ -0,0 +1,287 @@
+# solver/pdb.py
+"""
+Pattern databases: distancia exacta (en movimientos HTM) de cada valor de una
+coordenada al valor armado, calculada con un BFS vectorizado sobre las tablas
+de movimiento de solver/cubie.py. Cada PDB es una cota inferior admisible.
+
+Espacios disponibles (todos con .name, .size, .solved, .moves, index(), neighbors()):
+    CornerSpace()                 8! * 3^7 = 88.179.840 estados
+    CornerSpace(orientation=False) / CornerSpace(permutation=False)   (chicos)
+    EdgeSpace(pieces)             12!/(12-k)! * 2^k (k=6: 42.577.920)
+    Phase1Space("twist"|"flip")   orientación × posición del slice (fase 1 de Kociemba)
+    Phase2Space("corners"|"edges") permutación × orden del slice, sólo movimientos de G1
+
+Formato en disco (<dir>/<name>.pdb): 4 KiB de header (MAGIC + JSON con versión,
+espacio, tamaño, crc32 e histograma) y después las distancias empaquetadas de a
+dos por byte (nibble bajo = índice par). Se leen con np.memmap: la carga no
+depende del tamaño de la tabla y varios procesos comparten la page cache.
+El progreso de la construcción va a stderr (stdout puede ser la salida JSONL de batch).
+"""
+import os, sys, json, threading, time, zlib
+import numpy as np
+from typing import Dict, Optional
+from .cubie import (CubieCube, N_CP, N_CO, N_SLICE, N_SLICE_PERM, N_MOVES,
+                    SLICE_EDGES, G1_MOVES, SOLVED_CUBIE, perm_rank, ori_rank, slice_rank,
+                    edge_positions, in_g1, corner_perm_moves, corner_ori_moves, edge_subset_moves,
+                    edge_ori_moves, slice_moves, ud_edge_perm_moves, slice_perm_moves)
+
+PDB_DIR = os.path.join("models", "pdb")
+UNSEEN = 255
+MAX_DIST = 15  # un nibble; las distancias mayores se saturan (sigue siendo cota inferior)
+MAGIC = b"RUBIKPDB"
+VERSION = 1
+HEADER_SIZE = 4096
+ALL_MOVES = tuple(range(N_MOVES))
+
+# ---------- espacios de coordenadas ----------
+class CornerSpace:
+    """Permutación y/o orientación de las 8 esquinas: idx = cp * 3^7 + co."""
+    moves = ALL_MOVES
+
+    def __init__(self, permutation: bool = True, orientation: bool = True):
+        if not (permutation or orientation):
+            raise ValueError("CornerSpace necesita permutación u orientación")
+        self.permutation = permutation
+        self.orientation = orientation
+        self.name = {(True, True): "corners", (True, False): "corner_perm",
+                     (False, True): "corner_ori"}[(permutation, orientation)]
+        self._cp = corner_perm_moves() if permutation else None
+        self._co = corner_ori_moves() if orientation else None
+        self._n_co = N_CO if orientation else 1
+        self.size = (N_CP if permutation else 1) * self._n_co
+        self.solved = self.index(SOLVED_CUBIE)
+
+    def index(self, c: CubieCube) -> int:
+        cp = int(perm_rank(c.cp, 8)) if self.permutation else 0
+        co = int(ori_rank(c.co, 3)) if self.orientation else 0
+        return cp * self._n_co + co
+
+    def neighbors(self, idx: np.ndarray) -> np.ndarray:
+        """(B,) -> (B, 18) índices tras cada movimiento."""
+        cp, co = np.divmod(np.asarray(idx, dtype=np.int64), self._n_co)
+        out = self._cp[cp].astype(np.int64) * self._n_co if self.permutation else 0
+        if self.orientation:
+            out = out + self._co[co]
+        return out
+
+class EdgeSpace:
+    """Posición y orientación de un subconjunto de aristas: idx = rank(posiciones) * 2^k + bits."""
+    moves = ALL_MOVES
+
+    def __init__(self, pieces, cache_dir: Optional[str] = None):
+        self.pieces = tuple(int(p) for p in pieces)
+        self.k = len(self.pieces)
+        self.name = "edges_" + "-".join(map(str, self.pieces))
+        self._perm, self._flip = edge_subset_moves(self.k, cache_dir)
+        self.size = len(self._perm) << self.k
+        self._weights = 1 << np.arange(self.k)
+        self.solved = self.index(SOLVED_CUBIE)
+
+    def index(self, c: CubieCube) -> int:
+        pos = edge_positions(c.ep, self.pieces)
+        return (int(perm_rank(pos, 12)) << self.k) + int((c.eo[pos] * self._weights).sum())
+
+    def neighbors(self, idx: np.ndarray) -> np.ndarray:
+        idx = np.asarray(idx, dtype=np.int64)
+        ep, eo = idx >> self.k, idx & ((1 << self.k) - 1)
+        return (self._perm[ep].astype(np.int64) << self.k) | (eo[:, None] ^ self._flip[ep])
+
+class _ProductSpace:
+    """idx = a * size_b + b, con tablas de movimiento independientes para a y b."""
+    def __init__(self, name, table_a, table_b, moves):
+        self.name = name
+        self.moves = moves
+        self._a, self._b = table_a, table_b
+        self._size_b = len(table_b)
+        self.size = len(table_a) * self._size_b
+        self.solved = self.index(SOLVED_CUBIE)
+
+    def neighbors(self, idx: np.ndarray) -> np.ndarray:
+        a, b = np.divmod(np.asarray(idx, dtype=np.int64), self._size_b)
+        return self._a[a].astype(np.int64) * self._size_b + self._b[b]
+
+class Phase1Space(_ProductSpace):
+    """Fase 1 de Kociemba: twist (3^7) o flip (2^11) × posición del slice (495)."""
+    def __init__(self, orientation: str = "twist"):
+        if orientation not in ("twist", "flip"):
+            raise ValueError("Phase1Space: orientation tiene que ser 'twist' o 'flip'")
+        self.orientation = orientation
+        table = corner_ori_moves() if orientation == "twist" else edge_ori_moves()
+        super().__init__(f"phase1_{orientation}_slice", table, slice_moves(), ALL_MOVES)
+
+    def index(self, c: CubieCube) -> int:
+        o = ori_rank(c.co, 3) if self.orientation == "twist" else ori_rank(c.eo, 2)
+        return int(o) * N_SLICE + int(slice_rank(edge_positions(c.ep, SLICE_EDGES)))
+
+class Phase2Space(_ProductSpace):
+    """Fase 2 de Kociemba (dentro de G1): perm. de esquinas o de aristas U/D (8!) × orden del slice (4!)."""
+    def __init__(self, pieces: str = "corners"):
+        if pieces not in ("corners", "edges"):
+            raise ValueError("Phase2Space: pieces tiene que ser 'corners' o 'edges'")
+        self.pieces = pieces
+        table = corner_perm_moves()[:, list(G1_MOVES)] if pieces == "corners" else ud_edge_perm_moves()
+        super().__init__(f"phase2_{pieces}_slice", table, slice_perm_moves(), G1_MOVES)
+
+    def index(self, c: CubieCube) -> int:
+        if not in_g1(c):
+            raise ValueError("El estado no está en G1 (fase 2)")
+        p = perm_rank(c.cp, 8) if self.pieces == "corners" else perm_rank(c.ep[:8], 8)
+        return int(p) * N_SLICE_PERM + int(perm_rank(c.ep[8:] - 8, 4))
+
+def default_spaces(cache_dir: Optional[str] = PDB_DIR):
+    """Korf: esquinas completas + dos grupos de 6 aristas, combinados con max."""
+    return [CornerSpace(), EdgeSpace(range(6), cache_dir), EdgeSpace(range(6, 12), cache_dir)]
+
+SPACE_SETS = {
+    "korf": default_spaces,
+    "phase1": lambda cache_dir=None: [Phase1Space("twist"), Phase1Space("flip")],
+    "phase2": lambda cache_dir=None: [Phase2Space("corners"), Phase2Space("edges")],
+}
+
+# ---------- BFS ----------
+def build_pdb(space, chunk: int = 1 << 20, verbose: bool = False) -> np.ndarray:
+    """
+    BFS por niveles desde el armado, sobre un arreglo uint8 de distancias.
+    Mientras la frontera es chica se expande hacia adelante (releyéndola del
+    propio arreglo por bloques, memoria extra acotada por chunk); cuando la
+    frontera supera a los estados sin visitar conviene ir hacia atrás: cada
+    estado sin visitar mira si algún vecino está en el nivel actual. Eso vale
+    porque todos los conjuntos de movimientos usados son cerrados por inversa.
+    """
+    t0 = time.time()
+    dist = np.full(space.size, UNSEEN, dtype=np.uint8)
+    dist[space.solved] = 0
+    depth, count, unseen = 0, 1, space.size - 1
+    while count:
+        backward = count > unseen
+        for start in range(0, space.size, chunk):
+            block = dist[start:start + chunk]
+            if backward:
+                todo = np.flatnonzero(block == UNSEEN) + start
+                if len(todo):
+                    hit = (dist[space.neighbors(todo)] == depth).any(1)
+                    dist[todo[hit]] = depth + 1
+                continue
+            frontier = np.flatnonzero(block == depth) + start
+            if len(frontier):
+                children = space.neighbors(frontier).ravel()
+                dist[children[dist[children] == UNSEEN]] = depth + 1
+        count = int(np.count_nonzero(dist == depth + 1))
+        unseen -= count
+        depth += 1
+        if verbose and count:
+            print(f"[PDB {space.name}] profundidad {depth}: {count:,} estados "
+                  f"({'atrás' if backward else 'adelante'}, {time.time() - t0:.0f}s)", file=sys.stderr)
+    if unseen:
+        raise RuntimeError(f"El BFS de {space.name} no cubrió todo el espacio")
+    return dist
+
+# ---------- empaquetado y formato en disco ----------
+def pack(dist: np.ndarray) -> np.ndarray:
+    """Dos distancias por byte (saturadas a 15)."""
+    d = np.minimum(dist, MAX_DIST).astype(np.uint8)
+    if len(d) % 2:
+        d = np.append(d, np.uint8(0))
+    return d[0::2] | (d[1::2] << 4)
+
+class PackedPDB:
+    """Tabla de distancias empaquetada; table[idx] devuelve uint8 igual que un arreglo."""
+    def __init__(self, data: np.ndarray, size: int, meta: Optional[dict] = None):
+        self.data = data
+        self.size = size
+        self.meta = meta or {}
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, idx):
+        idx = np.asarray(idx, dtype=np.int64)
+        return (self.data[idx >> 1] >> ((idx & 1) << 2).astype(np.uint8)) & np.uint8(0xF)
+
+    def unpack(self) -> np.ndarray:
+        out = np.empty(2 * len(self.data), dtype=np.uint8)
+        out[0::2] = self.data & 0xF
+        out[1::2] = self.data >> 4
+        return out[:self.size]
+
+def _crc32(data: np.ndarray, chunk: int = 1 << 24) -> int:
+    crc = 0
+    for start in range(0, len(data), chunk):
+        crc = zlib.crc32(np.ascontiguousarray(data[start:start + chunk]), crc)
+    return crc
+
+def write_pdb(path: str, space, dist: np.ndarray) -> None:
+    """Escritura atómica (tmp + os.replace) del header y los datos empaquetados."""
+    data = pack(dist)
+    meta = {"version": VERSION, "name": space.name, "size": int(space.size),
+            "moves": list(space.moves), "crc32": _crc32(data),
+            "histogram": np.bincount(dist, minlength=int(dist.max()) + 1).tolist()}
+    header = MAGIC + json.dumps(meta).encode()
+    if len(header) > HEADER_SIZE:
+        raise ValueError("Header de PDB demasiado grande")
+    tmp = f"{path}.{os.getpid()}.tmp"  # otro proceso construyendo la misma tabla no pisa el temporal
+    with open(tmp, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b" "))
+        f.write(data.tobytes())
+    os.replace(tmp, path)
+
+def read_pdb(path: str, space=None, verify: bool = False) -> PackedPDB:
+    """
+    Abre una PDB con np.memmap (sólo se valida el header). verify=True además
+    recorre los datos y compara el crc32 (lee la tabla entera).
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if not header.startswith(MAGIC):
+        raise ValueError(f"{path} no es una PDB")
+    meta = json.loads(header[len(MAGIC):].decode().strip())
+    if meta.get("version") != VERSION:
+        raise ValueError(f"{path}: versión {meta.get('version')} (se esperaba {VERSION})")
+    if space is not None and (meta["name"] != space.name or meta["size"] != space.size
+                              or tuple(meta["moves"]) != tuple(space.moves)):
+        raise ValueError(f"{path} no corresponde al espacio {space.name}")
+    n_bytes = (meta["size"] + 1) // 2
+    if os.path.getsize(path) != HEADER_SIZE + n_bytes:
+        raise ValueError(f"{path} está truncada")
+    data = np.memmap(path, dtype=np.uint8, mode="r", offset=HEADER_SIZE, shape=(n_bytes,))
+    if verify and _crc32(data) != meta["crc32"]:
+        raise ValueError(f"{path}: checksum inválido")
+    return PackedPDB(data, meta["size"], meta)
+
+# tablas ya abiertas en este proceso, y un lock por archivo: varios hilos que
+# piden la misma PDB con la caché fría esperan a un único build_pdb
+_LOADED: Dict[str, PackedPDB] = {}
+_LOCKS: Dict[str, threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+def load_pdb(space, directory: Optional[str] = PDB_DIR, verify: bool = False,
+             verbose: bool = True) -> PackedPDB:
+    """
+    Abre la PDB de <directory>/<name>.pdb o la construye y la guarda
+    (directory=None: sólo en memoria). Thread-safe; la tabla abierta se reusa.
+    """
+    if directory is None:
+        return PackedPDB(pack(build_pdb(space, verbose=verbose)), space.size)
+    path = os.path.abspath(os.path.join(directory, space.name + ".pdb"))
+    with _LOCKS_GUARD:
+        lock = _LOCKS.setdefault(path, threading.Lock())
+    with lock:
+        table = _LOADED.get(path)
+        if table is None or verify:
+            table = _LOADED[path] = _open_or_build(space, directory, path, verify, verbose)
+        return table
+
+def _open_or_build(space, directory: str, path: str, verify: bool, verbose: bool) -> PackedPDB:
+    if os.path.exists(path):
+        try:
+            return read_pdb(path, space, verify=verify)
+        except ValueError as e:
+            if verbose:
+                print(f"[PDB {space.name}] {e}; se reconstruye", file=sys.stderr)
+    if verbose:
+        print(f"[PDB {space.name}] construyendo {space.size:,} entradas (se hace una sola vez)...",
+              file=sys.stderr)
+    dist = build_pdb(space, verbose=verbose)
+    os.makedirs(directory, exist_ok=True)
+    write_pdb(path, space, dist)
+    return read_pdb(path, space)
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from models.policy_value_net import PolicyValueNet
+
+# test_model.py prueba models/model.py (el prototipo de círculos con matplotlib), que
+# nunca estuvo en el repo: falla al importar y corta la colección de `pytest` pelado.
+collect_ignore = ["test_model.py"]
+
+
+@pytest.fixture
+def net():
+    """PolicyValueNet(324, 18) sin entrenar, con pesos fijos (semilla 0)."""
+    torch.manual_seed(0)
+    return PolicyValueNet(324, 18).eval()
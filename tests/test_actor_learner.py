@@ -0,0 +1,23 @@
+import os
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from envs.cube3x3 import MOVES, STATE_DIM
+from models.policy_value_net import PolicyValueNet
+from rl.actor_learner import train_actor_learner
+
+
+def test_actors_feed_learner_and_receive_weights(tmp_path):
+    out = str(tmp_path / "pvnet.pt")
+    t0 = time.monotonic()
+    res = train_actor_learner(out_path=out, steps=4, workers=2, batch_size=4, sync_every=1,
+                              sims_per_move=4, curriculum=(1, 1), max_steps=3, eval_every=2,
+                              tt_size=0, replay_capacity=256)
+    assert res["games"] == 4 and res["positions"] >= 4
+    assert res["updates"] >= 1 and res["version"] == res["updates"]  # se publicó en cada update
+    assert time.monotonic() - t0 < 120  # los actores que quedaron bloqueados en la cola no cuelgan el cierre
+    net = PolicyValueNet(STATE_DIM, len(MOVES))
+    net.load_state_dict(torch.load(out))
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from envs.cube3x3 import MOVE_PERMS, SOLVED_STATE
+from rl.arena import arena_loop, evaluate, fixed_suite
+from rl.checkpoint import CheckpointWriter, snapshot
+
+
+def test_arena_scores_fixed_suite_and_tracks_best(tmp_path, net):
+    def one_move_oracle(x):  # elige el giro que arma el cubo si existe a un movimiento
+        states = x.reshape(len(x), 54, 6).argmax(-1).numpy()
+        logits = torch.from_numpy((states[:, MOVE_PERMS] == SOLVED_STATE).all(-1).astype(np.float32))
+        return logits, torch.zeros(len(x))
+
+    suite = fixed_suite((1, 2), per_depth=10)
+    assert all(np.array_equal(suite[d], fixed_suite((1, 2), per_depth=10)[d]) for d in suite)
+    res = evaluate(one_move_oracle, suite, max_steps=5)
+    assert res["depths"]["1"]["solve_rate"] == 1.0 and res["depths"]["1"]["mean_moves"] == 1.0
+
+    writer = CheckpointWriter(str(tmp_path))
+    writer.save(snapshot(net, torch.optim.Adam(net.parameters()), 5))
+    writer.close()
+    best = arena_loop(str(tmp_path), depths=(1, 2), per_depth=5, max_steps=5, once=True, log=lambda s: None)
+    assert best["it"] == 5 and (tmp_path / "best.pt").exists() and (tmp_path / "arena.jsonl").exists()
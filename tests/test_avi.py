@@ -0,0 +1,26 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from envs.cube3x3 import Cube3x3Env, MOVES
+from rl.avi import generate_avi_batch
+
+
+def test_depth_one_states_point_back_to_solved(net):
+    states, pis, values, depths = generate_avi_batch(net, 64, (1, 1), gamma=0.9,
+                                                     rng=np.random.default_rng(0))
+    assert (depths == 1).all()
+    assert np.allclose(values, -1 + 2 * 0.9)
+    for s, p in zip(states, pis):
+        env = Cube3x3Env(s)
+        env.step(int(p.argmax()))
+        assert env.is_solved()
+
+
+def test_values_respect_scramble_depth_bound(net):
+    _, pis, values, depths = generate_avi_batch(net, 256, (1, 15), gamma=0.95, chunk=100,
+                                                rng=np.random.default_rng(1))
+    assert (values >= -1 + 2 * 0.95 ** depths - 1e-6).all() and (values <= 1).all()
+    assert np.allclose(pis.sum(1), 1.0) and pis.shape == (256, len(MOVES))
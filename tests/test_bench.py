@@ -0,0 +1,30 @@
+import os
+import sys
+
+import kociemba
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from bench.suite import bench_solver, compare, random_state_set, scramble_set
+from utils.move_compiler import simplify
+
+
+def test_bench_sets_are_fixed_and_exact():
+    for depth in (1, 7, 25):
+        seqs = scramble_set(depth, 5, seed=3)
+        assert seqs == scramble_set(depth, 5, seed=3)
+        assert all(len(simplify(s).split()) == depth for s in seqs)
+    states = random_state_set(5, seed=3)
+    assert states == random_state_set(5, seed=3) and len(set(states)) == 5
+    assert all(kociemba.solve(s) for s in states)  # estados alcanzables
+
+
+def test_bench_solver_and_regression_check():
+    res = bench_solver("kociemba", {"depth_03": scramble_set(3, 2), "random": random_state_set(2)})
+    assert res["sets"]["depth_03"]["solve_rate"] == 1.0 and res["sets"]["random"]["solve_rate"] == 1.0
+    current = {"solvers": {"kociemba": res}}
+    assert compare(current, current) == []
+    worse = {"solvers": {"kociemba": {"sets": {"random": {"solve_rate": 0.5, "p99_ms": 1e9}}}}}
+    flagged = compare(worse, current)
+    assert any("solve_rate" in r for r in flagged) and any("p99_ms" in r for r in flagged)
+    missing = compare({"solvers": {}}, current)  # el backend no corrió: no puede pasar el gate
+    assert missing and all("falta" in r for r in missing)
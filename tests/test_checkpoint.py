@@ -0,0 +1,51 @@
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from rl.checkpoint import CheckpointWriter, checkpoints, load_checkpoint, snapshot
+from rl.self_play import train_self_play
+from models.policy_value_net import PolicyValueNet
+from rl.replay import ReplayBuffer
+
+
+def test_writer_keeps_last_n_and_roundtrips_replay(tmp_path):
+    net = PolicyValueNet(324, 18)
+    opt = torch.optim.Adam(net.parameters())
+    buf = ReplayBuffer(10)
+    buf.push_many(np.random.randint(0, 6, (4, 54)), np.full((4, 18), 1 / 18), 1.0)
+    writer = CheckpointWriter(str(tmp_path / "ck"), keep=2, model_path=str(tmp_path / "pv.pt"))
+    for it in (1, 2, 3):
+        writer.save(snapshot(net, opt, it, buf, note=it))
+    writer.close()
+    paths = checkpoints(str(tmp_path / "ck"))
+    assert [os.path.basename(p) for p in paths] == ["ckpt_00000002.pt", "ckpt_00000003.pt"]
+    ck = load_checkpoint(paths[-1])
+    assert ck["it"] == 3 and ck["counters"]["note"] == 3
+    restored = ReplayBuffer(10)
+    restored.load_state_dict(ck["replay"])
+    assert len(restored) == 4 and np.array_equal(restored.states[:4], buf.states[:4])
+    assert set(torch.load(tmp_path / "pv.pt")) == set(net.state_dict())
+
+
+def test_resume_continues_exactly(tmp_path):
+    def run(d, steps, resume):
+        if not resume:
+            random.seed(0); np.random.seed(0); torch.manual_seed(0)
+        train_self_play(out_path=str(tmp_path / d / "pv.pt"), steps=steps, batch_size=8, sims_per_move=4,
+                        eval_every=3, max_steps=6, replay_capacity=200, tt_size=0, resume=resume)
+        return torch.load(tmp_path / d / "pv.pt")
+
+    straight = run("a", 6, False)
+    run("b", 3, False)
+    resumed = run("b", 6, True)
+    assert all(torch.equal(straight[k], resumed[k]) for k in straight)
+
+
+def test_resume_rejects_replay_on_disk(tmp_path):
+    with pytest.raises(ValueError, match="replay_path"):
+        train_self_play(out_path=str(tmp_path / "pv.pt"), steps=1, replay_path=str(tmp_path / "replay"), resume=True)
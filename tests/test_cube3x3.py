@@ -0,0 +1,71 @@
+import os
+import sys
+import random
+
+import numpy as np
+import pycuber as pc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from envs.cube3x3 import Cube3x3Env, MOVES, SOLVED_STATE
+from solver.kociemba_solver import scramble_to_facelets
+
+
+def test_engine_matches_pycuber_on_random_sequences():
+    rng = random.Random(0)
+    for _ in range(200):
+        seq = " ".join(rng.choice(MOVES) for _ in range(rng.randint(1, 30)))
+        cube = pc.Cube()
+        cube(pc.Formula(seq))
+        env = Cube3x3Env()
+        env.apply_moves(seq)
+        assert np.array_equal(env.state, Cube3x3Env.from_pycuber(cube).state), seq
+        assert env.to_facelets() == scramble_to_facelets(seq)
+
+
+def test_pycuber_roundtrip_and_solved_check():
+    env = Cube3x3Env()
+    assert env.is_solved()
+    env.apply_moves("R U R' U'")
+    assert not env.is_solved()
+    back = Cube3x3Env.from_pycuber(env.to_pycuber())
+    assert np.array_equal(back.state, env.state)
+    env.apply_moves("U R U' R'")
+    assert env.is_solved()
+
+
+def test_copy_is_independent_and_embedding_is_one_hot():
+    env = Cube3x3Env()
+    env.scramble(10)
+    other = env.copy()
+    other.step(0)
+    assert not np.array_equal(other.state, env.state)
+    emb = env.state_embedding()
+    assert emb.shape == (324,) and emb.dtype == np.float32
+    assert np.array_equal(emb.reshape(54, 6).argmax(1), env.state)
+    assert np.array_equal(Cube3x3Env().state, SOLVED_STATE)
+
+
+def test_vector_env_matches_single_env():
+    from envs.cube3x3 import VectorCube3x3Env
+
+    venv = VectorCube3x3Env(64, seed=1)
+    venv.scramble(np.arange(64) % 12)
+    envs = [venv.get_env(i) for i in range(64)]
+    actions = np.random.default_rng(2).integers(0, len(MOVES), size=64)
+    venv.step(actions)
+    for env, a in zip(envs, actions):
+        env.step(int(a))
+    assert np.array_equal(venv.states, VectorCube3x3Env.from_envs(envs).states)
+    assert np.array_equal(venv.is_solved(), [e.is_solved() for e in envs])
+    assert np.array_equal(venv.state_embedding(), np.stack([e.state_embedding() for e in envs]))
+    assert VectorCube3x3Env(3).is_solved().all()
+
+
+def test_vector_env_copy_has_its_own_rng():
+    from envs.cube3x3 import VectorCube3x3Env
+
+    venv = VectorCube3x3Env(8, seed=3)
+    twin = venv.copy()
+    twin.scramble(5)
+    venv.scramble(5)
+    assert np.array_equal(venv.states, twin.states)  # misma semilla, streams separados
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from envs.cube3x3 import SOLVED_STATE
+from gui.renderer import CELL, FACE_OFFSETS, PAD, StickerCanvas, hit_test
+from gui.solve_worker import SolveJob
+from utils.move_compiler import compile_moves, scramble_state, state_to_letters
+
+
+class FakeCanvas:
+    def __init__(self):
+        self.created, self.fills = 0, {}
+
+    def create_rectangle(self, *coords, **kw):
+        self.created += 1
+        return self.created
+
+    def itemconfigure(self, item, fill):
+        self.fills[item] = fill
+
+
+def test_sticker_canvas_only_recolors_changed_stickers():
+    canvas = FakeCanvas()
+    stickers = StickerCanvas(canvas)
+    state = scramble_state("R U R' F2 D")
+    stickers.render(state)
+    assert canvas.created == 54 and len(canvas.fills) == 54
+    canvas.fills.clear()
+    stickers.render(state)
+    assert canvas.fills == {}
+    stickers.render(SOLVED_STATE)
+    canvas.fills.clear()
+    moved = compile_moves("R").apply(SOLVED_STATE)
+    stickers.render(moved)
+    assert len(canvas.fills) == 12  # la cara R conserva su color: sólo cambian los laterales
+    canvas.fills.clear()
+    stickers.render_letters(state_to_letters(moved))
+    assert canvas.fills == {}
+
+
+def test_hit_test_matches_sticker_rectangles():
+    for face, (oc, orow) in FACE_OFFSETS.items():
+        for r in range(3):
+            for c in range(3):
+                x0, y0 = (oc + c) * (CELL + PAD), (orow + r) * (CELL + PAD)
+                assert hit_test(x0, y0) == hit_test(x0 + CELL, y0 + CELL) == (face, r, c)
+                assert hit_test(x0 + CELL + 1, y0) is None  # el borde entre stickers
+    assert hit_test(5, 5) is None and hit_test(-3, 40) is None
+
+
+def test_gui_solve_job_falls_back_and_cancels():
+    letters = state_to_letters(scramble_state("R U R' F2 D L"))
+    facelets = "".join(letters[f][r][c] for f in "URFDLB" for r in range(3) for c in range(3))
+
+    def wait(job):
+        while (res := job.poll()) is None:
+            time.sleep(0.01)
+        return res
+
+    res = wait(SolveJob(facelets, "mcts", budget_s=0.01).start())
+    assert res["fallback"] and res["method"] == "kociemba" and res["requested"] == "mcts" and "timeout" in res
+    assert np.array_equal(scramble_state("R U R' F2 D L " + res["solution"]), SOLVED_STATE)
+    job = SolveJob(facelets, "mcts", budget_s=30)
+    job.cancel()
+    assert wait(job.start())["error"] == "cancelado"
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from envs.cube3x3 import Cube3x3Env, MOVE_TO_IDX
+from models.inference_server import InferenceServer
+from rl.mcts import run_mcts
+
+
+def test_inference_server_is_drop_in_net_for_mcts(net):
+    net.share_memory()
+    server = InferenceServer(net, n_clients=2, max_rows=8).start()
+    try:
+        client = server.client(0)
+        x = torch.randn(20, 324)  # más filas que el slot: se parte en viajes
+        logits, v = client(x)
+        with torch.no_grad():
+            ref_logits, ref_v = net(x)
+        assert torch.allclose(logits, ref_logits, atol=1e-5) and torch.allclose(v, ref_v, atol=1e-5)
+        env = Cube3x3Env()
+        env.apply_moves("R")
+        pi = run_mcts(env, server.client(1), n_sims=32, batch_size=4)
+        assert int(pi.argmax()) == MOVE_TO_IDX["R'"]
+        stats = server.stats()
+    finally:
+        server.close()
+    assert stats["requests"] >= 3 and stats["mean_batch_rows"] > 0 and stats["mean_queue_ms"] >= 0
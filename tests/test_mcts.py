@@ -0,0 +1,140 @@
+import os
+import sys
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from envs.cube3x3 import Cube3x3Env, MOVE_TO_IDX
+from rl.mcts import run_mcts
+
+
+def test_mcts_finds_one_move_solution_sequential_and_batched(net):
+    env = Cube3x3Env()
+    env.apply_moves("R")
+    for k in (1, 8):
+        pi = run_mcts(env, net, n_sims=64, batch_size=k)
+        assert abs(pi.sum() - 1.0) < 1e-5
+        assert int(pi.argmax()) == MOVE_TO_IDX["R'"]
+
+
+def _reference_mcts(env, net, n_sims, c_puct=1.5):
+    """El run_mcts secuencial de antes del árbol en arrays (nodos con dict de hijos), tal cual."""
+    import math
+
+    class Node:
+        def __init__(self, prior):
+            self.P, self.N, self.W, self.Q = prior, 0, 0.0, 0.0
+            self.children, self.is_expanded = {}, False
+
+    def expand(node, env_copy):
+        with torch.no_grad():
+            logits, v = net(torch.from_numpy(env_copy.state_embedding()).float().unsqueeze(0))
+            p = torch.softmax(logits, dim=-1)[0].numpy()
+        for a in env_copy.legal_actions():
+            node.children[a] = Node(float(p[a]))
+        node.is_expanded = True
+        return float(v.item())
+
+    def simulate(node, env_copy, depth=0):
+        if env_copy.is_solved():
+            return 1.0
+        if depth > 100:
+            return -1.0
+        if not node.is_expanded:
+            return expand(node, env_copy)
+        total_N = sum(ch.N for ch in node.children.values()) + 1
+        best_score, best_a = -1e9, None
+        for a, ch in node.children.items():
+            score = ch.Q + c_puct * ch.P * math.sqrt(total_N) / (1 + ch.N)
+            if score > best_score:
+                best_score, best_a = score, a
+        next_env = env_copy.copy()
+        next_env.step(best_a)
+        v = simulate(node.children[best_a], next_env, depth + 1)
+        ch = node.children[best_a]
+        ch.N += 1
+        ch.W += v
+        ch.Q = ch.W / ch.N
+        return v
+
+    root = Node(1.0)
+    for _ in range(n_sims):
+        simulate(root, env.copy())
+    visits = np.zeros(len(env.legal_actions()), dtype=np.float32)
+    for a, ch in root.children.items():
+        visits[a] = ch.N
+    return visits / visits.sum()
+
+
+def test_mcts_batch_size_one_matches_reference_search(net):
+    for scramble in ("R U F' D2 L", "F2 B L' U R2 D"):
+        env = Cube3x3Env()
+        env.apply_moves(scramble)
+        assert np.allclose(run_mcts(env, net, n_sims=96, batch_size=1), _reference_mcts(env, net, 96))
+
+
+def test_batched_mcts_is_deterministic(net):
+    env = Cube3x3Env()
+    env.apply_moves("R U F' D2 L")
+    a = run_mcts(env, net, n_sims=48, batch_size=4)
+    b = run_mcts(env, net, n_sims=48, batch_size=4)
+    assert np.array_equal(a, b)
+    assert np.isclose(a.sum(), 1.0)
+
+
+def test_tree_reuse_keeps_subtree_statistics(net):
+    env = Cube3x3Env()
+    env.apply_moves("R U F'")
+    pi, tree = run_mcts(env, net, n_sims=64, batch_size=8, return_tree=True)
+    a = int(pi.argmax())
+    kept = int(tree.N[tree.root, a])
+    env.step(a)
+    tree.advance(a)
+    assert tree.root == 0 and tree.matches(env)
+    assert int(tree.N[tree.root].sum()) == kept - 1  # la primera visita sólo expandió el hijo
+    pi2, tree2 = run_mcts(env, net, n_sims=32, batch_size=8, tree=tree, return_tree=True)
+    assert tree2 is tree
+    assert int(tree.N[tree.root].sum()) == kept - 1 + 32
+
+
+def test_transposition_table_shares_evaluations(net):
+    from rl.transposition import TranspositionTable
+
+    env = Cube3x3Env()
+    env.apply_moves("R U F' D2 L")
+    tt = TranspositionTable(1 << 12)
+    pi = run_mcts(env, net, n_sims=128, batch_size=8, tt=tt)
+    st = tt.stats()
+    assert np.isclose(pi.sum(), 1.0)
+    assert st["net_evals_saved"] > 0
+    assert st["net_evals"] + st["hits"] == st["lookups"]
+
+    # una segunda búsqueda desde la misma posición sale casi toda de la tabla
+    tt.reset_stats()
+    run_mcts(env, net, n_sims=16, batch_size=8, tt=tt)
+    assert tt.stats()["hits"] > 0
+
+
+def test_profiling_records_mcts_phases_and_exports_trace(tmp_path, net):
+    import json
+    from utils import profiling as prof
+
+    env = Cube3x3Env()
+    env.apply_moves("R U")
+    prof.reset()
+    run_mcts(env, net, n_sims=16, batch_size=4)
+    assert prof.snapshot()["timers"] == {}  # apagado no registra nada
+
+    prof.enable(trace=True)
+    try:
+        run_mcts(env, net, n_sims=16, batch_size=4)
+        snap = prof.snapshot()
+        n = prof.export_chrome_trace(str(tmp_path / "trace.json"))
+    finally:
+        prof.disable()
+        prof.reset()
+    assert snap["counters"]["mcts.sims"] == 16 and snap["counters"]["mcts.net_calls"] >= 1
+    assert {"mcts.select", "mcts.embed", "mcts.forward", "mcts.expand", "mcts.backup"} <= set(snap["timers"])
+    events = json.load(open(tmp_path / "trace.json"))["traceEvents"]
+    assert sum(e["ph"] == "X" for e in events) == n > 0
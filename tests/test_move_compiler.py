@@ -0,0 +1,41 @@
+import os
+import sys
+import random
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from envs.cube3x3 import MOVES, MOVE_PERMS, MOVE_TO_IDX, SOLVED_STATE
+from utils.move_compiler import compile_moves, invert, scramble_state, simplify
+
+
+def _slow_apply(seq):
+    state = SOLVED_STATE.copy()
+    for m in seq.split():
+        state = state[MOVE_PERMS[MOVE_TO_IDX[m]]]
+    return state
+
+
+def test_simplify_cancels_merges_and_orders_opposite_faces():
+    assert simplify("U U'") == ""
+    assert simplify("R R") == "R2"
+    assert simplify("R R R") == "R'"
+    assert simplify("D U") == "U D"
+    assert simplify("U D U'") == "D"
+    assert simplify("R U U' R'") == ""
+    assert simplify("F, B2 F' L") == "B2 L"
+    with pytest.raises(ValueError):
+        compile_moves("R X")
+
+
+def test_compiled_permutation_matches_move_by_move():
+    rng = random.Random(0)
+    for n in (0, 1, 7, 1000):
+        seq = " ".join(rng.choice(MOVES) for _ in range(n))
+        compiled = compile_moves(seq)
+        assert np.array_equal(compiled.apply(SOLVED_STATE), _slow_apply(seq))
+        assert np.array_equal(scramble_state(str(compiled)), _slow_apply(seq))
+        assert np.array_equal(compiled.undo(compiled.apply(SOLVED_STATE)), SOLVED_STATE)
+        assert np.array_equal(compile_moves(seq + " " + invert(seq)).perm, np.arange(54))
+    assert compile_moves(seq) is compiled  # cacheado
@@ -0,0 +1,93 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from envs.cube3x3 import SOLVED_STATE
+from solver.ida_solver import IDAStarSolver
+from solver.pdb import (CornerSpace, EdgeSpace, Phase1Space, Phase2Space, build_pdb, load_pdb, pack, read_pdb,
+                        PackedPDB, HEADER_SIZE)
+from utils.move_compiler import scramble_state
+
+
+def test_packed_lookup_matches_unpacked_distances():
+    dist = build_pdb(CornerSpace(permutation=False))
+    table = PackedPDB(pack(dist), len(dist))
+    idx = np.arange(len(dist))
+    assert np.array_equal(table[idx], dist)
+    assert np.array_equal(table.unpack(), dist)
+
+
+def test_kociemba_phase_tables_have_known_depths():
+    assert build_pdb(Phase1Space("twist")).max() == 9
+    assert build_pdb(Phase1Space("flip")).max() == 9
+    assert build_pdb(Phase2Space("corners")).max() == 14
+
+
+def test_pdb_file_roundtrip_and_checksum(tmp_path):
+    space = CornerSpace(orientation=False)
+    table = load_pdb(space, str(tmp_path), verbose=False)
+    path = tmp_path / (space.name + ".pdb")
+    assert isinstance(table.data, np.memmap)
+    assert table.meta["histogram"] == [1, 18, 243, 2646, 12516, 17624, 7080, 192]
+    assert np.array_equal(read_pdb(str(path), space, verify=True).unpack(), build_pdb(space))
+
+    with pytest.raises(ValueError):
+        read_pdb(str(path), CornerSpace(permutation=False))
+    raw = bytearray(path.read_bytes())
+    raw[HEADER_SIZE + 100] ^= 0xFF
+    path.write_bytes(bytes(raw))
+    read_pdb(str(path), space)  # sin verify sólo se mira el header
+    with pytest.raises(ValueError):
+        read_pdb(str(path), space, verify=True)
+
+
+def _small_pdb_spaces():
+    return [CornerSpace(orientation=False), CornerSpace(permutation=False),
+            EdgeSpace(range(4)), EdgeSpace(range(4, 8)), EdgeSpace(range(8, 12))]
+
+
+def test_pdb_distances_match_known_counts():
+    dist = build_pdb(CornerSpace(orientation=False))
+    assert np.bincount(dist).tolist() == [1, 18, 243, 2646, 12516, 17624, 7080, 192]
+
+
+def test_ida_star_returns_optimal_solutions():
+    solver = IDAStarSolver(_small_pdb_spaces(), pdb_dir=None)
+    assert solver.solve("") == ""
+    for scramble, optimal in (("R U", 2), ("R U R' U'", 4), ("F2 D L' B U2 R", 6), ("R L", 2)):
+        sol = solver.solve(scramble)
+        assert np.array_equal(scramble_state(f"{scramble} {sol}"), SOLVED_STATE) and len(sol.split()) == optimal
+        assert solver.last_stats["nodes_per_sec"] > 0
+    solver.max_nodes = 100
+    assert solver.solve("R U F D L B R2 U2 F2 D' L2 B'") is None
+
+
+def test_concurrent_cold_load_builds_once(tmp_path, monkeypatch):
+    import threading
+    import solver.pdb as pdb
+
+    calls = []
+    real_build = pdb.build_pdb
+    monkeypatch.setattr(pdb, "build_pdb", lambda space, **kw: calls.append(space.name) or real_build(space, **kw))
+    tables = [None] * 4
+
+    def load(i):
+        tables[i] = load_pdb(CornerSpace(orientation=False), str(tmp_path), verbose=False)
+
+    threads = [threading.Thread(target=load, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == ["corner_perm"] and all(t is tables[0] for t in tables)
+    on_disk = read_pdb(str(tmp_path / "corner_perm.pdb"), verify=True)
+    assert np.array_equal(on_disk.unpack(), real_build(CornerSpace(orientation=False)))
+
+
+def test_build_progress_goes_to_stderr(tmp_path, capsys):
+    load_pdb(CornerSpace(permutation=False), str(tmp_path))
+    out, err = capsys.readouterr()
+    assert out == "" and "construyendo" in err  # stdout puede ser el JSONL de batch
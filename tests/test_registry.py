@@ -0,0 +1,40 @@
+import os
+import sys
+
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from models.policy_value_net import PolicyValueNet
+from models.registry import ModelRegistry
+
+
+def test_registry_caches_and_hot_reloads(tmp_path):
+    path = str(tmp_path / "pv.pt")
+    torch.manual_seed(0)
+    torch.save(PolicyValueNet(324, 18).state_dict(), path)
+    reg = ModelRegistry()
+
+    m1 = reg.get(path)
+    assert reg.get(path) is m1 and m1.version == 1
+    x = torch.zeros(2, 324)
+    logits, v = m1(x)
+    assert logits.shape == (2, 18) and v.shape == (2,)
+
+    torch.save(PolicyValueNet(324, 18).state_dict(), path)
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 10))
+    m2 = reg.get(path)
+    assert m2 is not m1 and m2.version == 2
+    assert not torch.allclose(m2(x)[0], logits)
+
+    assert reg.get(str(tmp_path / "missing.pt")) is None
+
+
+def test_torchscript_backend_matches_eager(tmp_path):
+    path = str(tmp_path / "pv.pt")
+    torch.save(PolicyValueNet(324, 18).state_dict(), path)
+    reg = ModelRegistry()
+    x = torch.rand(4, 324)
+    eager, script = reg.get(path), reg.get(path, backend="torchscript")
+    assert torch.allclose(eager(x)[0], script(x)[0], atol=1e-5)
+    assert torch.allclose(eager(x)[1], script(x)[1], atol=1e-5)
@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from envs.cube3x3 import Cube3x3Env
+from rl.replay import ReplayBuffer
+
+
+def _episode(n, seed):
+    rng = np.random.default_rng(seed)
+    states = []
+    env = Cube3x3Env()
+    for _ in range(n):
+        env.step(int(rng.integers(18)))
+        states.append(env.state_embedding())
+    pis = rng.dirichlet(np.ones(18), size=n).astype(np.float32)
+    return states, list(pis)
+
+
+def test_ring_buffer_wraps_and_samples_embeddings():
+    buf = ReplayBuffer(capacity=10)
+    states, pis = _episode(7, 0)
+    buf.push_episode(states, pis, 1.0)
+    buf.push_episode(*_episode(6, 1), -1.0)
+    assert len(buf) == 10 and buf.pos == 3
+    # las 3 más viejas se pisaron: quedan las 4 últimas del primer episodio
+    assert np.array_equal(buf.states[3], states[3].reshape(54, 6).argmax(1))
+    s, p, z = buf.sample(32)
+    assert s.shape == (32, 324) and p.shape == (32, 18) and z.shape == (32,)
+    assert np.allclose(s.numpy().reshape(32, 54, 6).sum(-1), 1.0)
+    assert set(np.unique(z.numpy())) <= {1.0, -1.0}
+
+
+def test_memmap_buffer_survives_reopen(tmp_path):
+    path = str(tmp_path / "replay")
+    buf = ReplayBuffer(capacity=16, path=path)
+    states, pis = _episode(5, 2)
+    buf.push_episode(states, pis, 1.0)
+    buf.push_many(np.stack(states[:2]), np.stack(pis[:2]), [0.5, 0.2], depth=[3, 7])
+    buf.flush()
+    del buf
+    again = ReplayBuffer(capacity=16, path=path)
+    assert len(again) == 7 and again.pos == 7
+    assert again.depth[:7].tolist() == [-1] * 5 + [3, 7]  # self-play no conoce la distancia
+    assert np.array_equal(again.states[4], states[4].reshape(54, 6).argmax(1))
+    assert np.allclose(again.pis[0].astype(np.float32), pis[0], atol=1e-3)
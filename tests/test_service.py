@@ -0,0 +1,78 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+import torch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from models.batching import DeadlineExceeded, MicroBatcher
+
+
+def test_micro_batcher_merges_concurrent_calls(net):
+    batcher = MicroBatcher(net, max_batch=64, max_wait_ms=50.0)
+    xs = [torch.randn(2, 324) for _ in range(8)]
+    outs = [None] * len(xs)
+
+    def call(i):
+        outs[i] = batcher.client()(xs[i])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(xs))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = batcher.stats()
+    batcher.close()
+    assert stats["requests"] == 8 and stats["batches"] < 8
+    with torch.no_grad():
+        for x, (logits, v) in zip(xs, outs):
+            ref_logits, ref_v = net(x)
+            assert torch.allclose(logits, ref_logits, atol=1e-5) and torch.allclose(v, ref_v, atol=1e-5)
+
+
+def test_micro_batcher_expired_deadline(net):
+    batcher = MicroBatcher(net)
+    with pytest.raises(DeadlineExceeded):
+        batcher.client(deadline=time.monotonic() - 1)(torch.zeros(1, 324))
+    batcher.close()
+
+
+def test_service_solves_and_reports_metrics():
+    from service.server import SolveService
+
+    async def request(port, verb, path, payload=None):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps(payload).encode() if payload is not None else b""
+        writer.write(f"{verb} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        raw = await reader.read()
+        writer.close()
+        head, _, data = raw.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(data)
+
+    async def scenario():
+        service = SolveService(method="kociemba", workers=2)
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            ok = await request(port, "POST", "/solve", {"cube": "R U R' F2 D"})
+            bad = await request(port, "POST", "/solve", {"cube": "R X"})
+            bad_opts = [await request(port, "POST", "/solve", {"cube": "R U", "method": "beam", "options": o})
+                        for o in ({"beam_witdh": 64}, {"beam_width": "64"}, {"beam_width": -1})]
+            metrics = await request(port, "GET", "/metrics")
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+        return ok, bad, bad_opts, metrics
+
+    (status, result), (bad_status, _), bad_opts, (_, metrics) = asyncio.run(scenario())
+    assert status == 200 and result["method"] == "kociemba" and result["moves"] == len(result["solution"].split())
+    assert bad_status == 400
+    assert [code for code, _ in bad_opts] == [400, 400, 400] and "beam_witdh" in bad_opts[0][1]["error"]
+    assert metrics["latency_ms"]["kociemba"]["count"] == 1
+    assert metrics["queue_depth"] == {"solve": 0, "inference": 0}
@@ -0,0 +1,73 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from envs.cube3x3 import Cube3x3Env
+
+
+def _solves(scramble, solution):
+    env = Cube3x3Env()
+    env.apply_moves(scramble)
+    env.apply_moves(solution)
+    return env.is_solved()
+
+
+def test_batch_astar_solves_short_scrambles_and_reports_rate(net):
+    from solver.astar_solver import BatchAStarSolver
+
+    solver = BatchAStarSolver(net, batch_size=32, max_nodes=5_000)
+    for scramble in ("R", "R U", "F' D2 L"):
+        sol = solver.solve(scramble)
+        assert sol is not None and _solves(scramble, sol)
+        assert solver.last_stats["solved"] and solver.last_stats["nodes_per_sec"] >= 0
+    assert solver.solve("") == ""
+
+
+def test_batch_astar_respects_node_budget(net):
+    from solver.astar_solver import BatchAStarSolver
+
+    solver = BatchAStarSolver(net, batch_size=8, max_nodes=16)
+    assert solver.solve("R U F D L B R2 U2 F2 D'") is None
+    assert solver.last_stats["expanded"] <= 16 + 8
+
+
+def test_beam_search_solves_short_scrambles_with_one_call_per_depth(net):
+    from solver.beam_solver import BeamSearchSolver
+
+    solver = BeamSearchSolver(net, beam_width=512, max_depth=6)
+    for scramble in ("R", "R U", "F' D2 L"):
+        sol = solver.solve(scramble)
+        assert sol is not None and _solves(scramble, sol)
+        stats = solver.last_stats
+        assert stats["net_calls"] <= stats["depth"]
+    assert solver.solve("R U F D L B R2 U2 F2 D'") is None
+    assert solver.last_stats["net_calls"] == 6 + 1
+
+
+def test_kociemba_solve_many_keeps_order_and_reports_errors():
+    from solver.kociemba_solver import solve_many, scramble_to_facelets
+
+    items = ["R U R' U'", scramble_to_facelets("F2 D L'"), "R X", "B2 L U'", "U" * 54]
+    results = list(solve_many(items, workers=2, chunksize=2))
+    assert [r.index for r in results] == list(range(len(items)))
+    assert [r.input for r in results] == items
+    assert results[2].error and results[2].solution is None
+    assert results[4].error  # facelets imposibles
+    for i in (0, 3):
+        assert results[i].error is None and _solves(items[i], results[i].solution)
+    assert _solves("F2 D L'", results[1].solution)
+
+
+def test_run_batch_streams_jsonl_in_order():
+    import io
+    import json
+    from solver.batch import run_batch
+
+    inp = io.StringIO("R U\n\n{\"id\": \"a\", \"scramble\": \"F2 D\"}\nR X\n{\"id\": \"b\"}\n")
+    out = io.StringIO()
+    summary = run_batch(inp, out, workers=2)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["index"] for r in rows] == [0, 1, 2, 3] and rows[1]["id"] == "a"
+    assert _solves("R U", rows[0]["solution"]) and rows[0]["moves"] == 2
+    assert rows[2]["error"] and summary["items"] == 4 and summary["errors"] == 2
+    assert rows[3]["id"] == "b" and rows[3]["solution"] is None and "Falta el cubo" in rows[3]["error"]
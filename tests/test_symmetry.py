@@ -0,0 +1,51 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from envs.cube3x3 import Cube3x3Env, MOVE_PERMS, SOLVED_STATE
+from envs.symmetry import (N_SYMMETRIES, IS_MIRROR, MOVE_MAP, apply_symmetry, augment,
+                           canonical, canonical_hashes)
+
+
+def _scrambled(seed):
+    rng = np.random.default_rng(seed)
+    env = Cube3x3Env()
+    for a in rng.integers(0, 18, size=25):
+        env.step(int(a))
+    return env.state
+
+
+def test_symmetries_fix_solved_and_conjugate_moves():
+    assert N_SYMMETRIES == 48 and IS_MIRROR.sum() == 24
+    state = _scrambled(0)
+    for s in range(N_SYMMETRIES):
+        assert np.array_equal(apply_symmetry(SOLVED_STATE, s), SOLVED_STATE)
+        for m in range(18):
+            lhs = apply_symmetry(state[MOVE_PERMS[m]], s)
+            rhs = apply_symmetry(state, s)[MOVE_PERMS[MOVE_MAP[s, m]]]
+            assert np.array_equal(lhs, rhs)
+
+
+def test_canonical_form_is_symmetry_invariant():
+    state = _scrambled(1)
+    images = np.stack([apply_symmetry(state, s) for s in range(N_SYMMETRIES)])
+    canon, s = canonical(state)
+    assert np.array_equal(canon, apply_symmetry(state, s))
+    for img in images:
+        assert np.array_equal(canonical(img)[0], canon)
+    assert len(set(canonical_hashes(images).tolist())) == 1
+
+
+def test_augment_keeps_policy_pointing_at_the_same_move():
+    # estado a un movimiento de armado: la política one-hot apunta a la inversa
+    env = Cube3x3Env()
+    env.apply_moves("R")
+    pi = np.zeros((48, 18), dtype=np.float32)
+    pi[:, 10] = 1.0  # R'
+    states, pis = augment(np.repeat(env.state[None], 48, 0), pi, syms=np.arange(48))
+    for s, p in zip(states, pis):
+        e = Cube3x3Env(s)
+        e.step(int(p.argmax()))
+        assert e.is_solved()
@@ -0,0 +1,63 @@
+# utils/metrics.py
+"""Histogramas de latencia con buckets fijos (ms), baratos de actualizar desde varios hilos."""
+import threading
+from typing import Dict, List, Optional
+
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+class LatencyHistogram:
+    def __init__(self, buckets=BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # el último es +inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, ms: float) -> None:
+        i = next((k for k, b in enumerate(self.buckets) if ms <= b), len(self.buckets))
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total += ms
+            self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Cota superior del bucket que contiene el cuantil q (None si no hay datos)."""
+        if self.count == 0:
+            return None
+        target, acc = q * self.count, 0
+        for k, c in enumerate(self.counts):
+            acc += c
+            if acc >= target:
+                return float(self.buckets[k]) if k < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            buckets = {f"<={b}": c for b, c in zip(self.buckets, self.counts)}
+            buckets["+inf"] = self.counts[-1]
+            return {"count": self.count, "mean_ms": self.total / self.count if self.count else None,
+                    "p50_ms": self.quantile(0.5), "p90_ms": self.quantile(0.9),
+                    "p99_ms": self.quantile(0.99), "max_ms": self.max, "buckets": buckets}
+
+class HistogramSet:
+    """Un histograma por etiqueta (p.ej. método de resolución), creados a demanda."""
+    def __init__(self):
+        self._hists: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label: str, ms: float) -> None:
+        with self._lock:
+            hist = self._hists.get(label)
+            if hist is None:
+                hist = self._hists[label] = LatencyHistogram()
+        hist.observe(ms)
+
+    def labels(self) -> List[str]:
+        return sorted(self._hists)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            items = list(self._hists.items())
+        return {label: h.snapshot() for label, h in sorted(items)}
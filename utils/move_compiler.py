@@ -0,0 +1,122 @@
+# utils/move_compiler.py
+"""
+Compilador de secuencias de movimientos: se parsea el string una sola vez
+(normalize_scramble), se simplifica (U U' -> nada, R R -> R2, caras opuestas en
+orden canónico: "D U" -> "U D") y se compone todo en UNA permutación de 54
+stickers. Aplicar la secuencia a un estado es un solo gather:
+
+    nuevo = estado[compiled.perm]
+
+Los resultados quedan cacheados por string (LRU), así reaplicar el mismo
+scramble o la misma solución no vuelve a parsear ni a componer.
+"""
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Tuple
+import numpy as np
+from utils.scramble_utils import normalize_scramble
+from envs.cube3x3 import MOVE_TO_IDX, MOVE_PERMS, SOLVED_STATE, ORDER, N_STICKERS
+
+FACES = "UDLRFB"  # orden canónico: dentro de cada eje (UD, LR, FB) va primero la de la izquierda
+_SUFFIX = {1: "", 2: "2", 3: "'"}
+_AMOUNT = {"": 1, "2": 2, "'": 3}
+_IDENTITY = np.arange(N_STICKERS)
+_FACELETS_RE = re.compile(r"[URFDLB]{54}")
+
+def _axis(face: str) -> int:
+    return FACES.index(face) // 2
+
+def simplify_moves(moves: List[str]) -> List[str]:
+    """
+    Cancela y fusiona giros redundantes. La salida es una sucesión de bloques por
+    eje (a lo sumo un giro por cara, en orden canónico) y bloques consecutivos
+    nunca comparten eje, así las cancelaciones en cascada salen solas:
+    "R U U' R'" -> "".
+    """
+    out: List[Tuple[str, int]] = []
+    for m in moves:
+        face, amount = m[0], _AMOUNT[m[1:]]
+        j = len(out)
+        while j > 0 and _axis(out[j - 1][0]) == _axis(face):
+            j -= 1
+        amounts = dict(out[j:])
+        amounts[face] = (amounts.get(face, 0) + amount) % 4
+        del out[j:]
+        out.extend((f, amounts[f]) for f in FACES if amounts.get(f))
+    return [f + _SUFFIX[a] for f, a in out]
+
+def invert_moves(moves: List[str]) -> List[str]:
+    return [m[0] + _SUFFIX[(4 - _AMOUNT[m[1:]]) % 4] for m in reversed(moves)]
+
+class CompiledMoves(NamedTuple):
+    moves: Tuple[str, ...]   # secuencia simplificada
+    perm: np.ndarray         # nuevo = estado[perm]
+    inverse: np.ndarray      # deshace la secuencia: estado = nuevo[inverse]
+
+    def __str__(self):
+        return " ".join(self.moves)
+
+    def __len__(self):
+        return len(self.moves)
+
+    def apply(self, state: np.ndarray) -> np.ndarray:
+        """Aplica la secuencia a un estado (54,) o a un lote (N, 54)."""
+        return np.asarray(state)[..., self.perm]
+
+    def undo(self, state: np.ndarray) -> np.ndarray:
+        return np.asarray(state)[..., self.inverse]
+
+@lru_cache(maxsize=4096)
+def compile_moves(seq: str) -> CompiledMoves:
+    """Parsea, simplifica y compone. ValueError ante un movimiento inválido."""
+    moves = simplify_moves(normalize_scramble(seq).split())
+    perm = _IDENTITY
+    for m in moves:
+        perm = perm[MOVE_PERMS[MOVE_TO_IDX[m]]]
+    perm = np.array(perm)
+    inverse = np.argsort(perm)
+    perm.setflags(write=False); inverse.setflags(write=False)
+    return CompiledMoves(tuple(moves), perm, inverse)
+
+def simplify(seq: str) -> str:
+    return str(compile_moves(seq))
+
+def invert(seq: str) -> str:
+    """Secuencia inversa (simplificada): invert("R U2 F'") == "F U2 R'"."""
+    return " ".join(invert_moves(list(compile_moves(seq).moves)))
+
+def apply_moves(state: np.ndarray, seq: str) -> np.ndarray:
+    return compile_moves(seq).apply(state)
+
+def scramble_state(seq: str) -> np.ndarray:
+    """Estado de stickers que resulta de aplicar `seq` al cubo armado."""
+    return compile_moves(seq).apply(SOLVED_STATE)
+
+def state_to_facelets(state: np.ndarray) -> str:
+    """String de 54 facelets URFDLB (formato kociemba) de un estado de stickers."""
+    return "".join(ORDER[i] for i in state)
+
+def scramble_to_facelets(seq: str) -> str:
+    return state_to_facelets(scramble_state(seq))
+
+def to_state(item: str) -> np.ndarray:
+    """Acepta un string de 54 facelets URFDLB o un scramble y devuelve los stickers."""
+    item = item.strip()
+    if _FACELETS_RE.fullmatch(item):
+        return np.array([ORDER.index(ch) for ch in item], dtype=np.uint8)
+    return scramble_state(item)
+
+def to_facelets(item: str) -> str:
+    """Como to_state, pero devuelve el string de facelets (lo que espera kociemba)."""
+    item = item.strip()
+    return item if _FACELETS_RE.fullmatch(item) else scramble_to_facelets(item)
+
+def state_to_letters(state: np.ndarray) -> dict:
+    """{cara: matriz 3x3 de letras}, el formato que dibujan la GUI y el visor 3D."""
+    state = np.asarray(state)
+    return {f: [[ORDER[state[9 * i + 3 * r + c]] for c in range(3)] for r in range(3)]
+            for i, f in enumerate(ORDER)}
+
+def letters_to_state(letters: dict) -> np.ndarray:
+    return np.array([ORDER.index(letters[f][r][c]) for f in ORDER for r in range(3) for c in range(3)],
+                    dtype=np.uint8)
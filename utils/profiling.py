@@ -0,0 +1,145 @@
+# utils/profiling.py
+"""
+Instrumentación liviana de los caminos calientes (MCTS, self-play, training).
+
+    from utils import profiling as prof
+    with prof.span("mcts.forward"):
+        ...
+    prof.count("mcts.sims", k)
+
+Apagada (default) span() devuelve un context manager nulo compartido y count()
+retorna enseguida: el costo es una llamada y un if. Prendida, acumula
+contadores y tiempos por nombre; con trace=True además graba cada span como
+evento "X" para exportar en formato Chrome trace (chrome://tracing, Perfetto).
+"""
+import json, os, threading, time
+from typing import Dict, List, Optional
+
+ENABLED = False
+_TRACE = False
+_MAX_EVENTS = 1_000_000  # el trace no crece sin límite en corridas largas
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_timers: Dict[str, List[float]] = {}  # nombre -> [llamadas, total_s, max_s]
+_events: List[dict] = []
+_dropped = 0
+_t_origin = time.perf_counter()
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL = _NullSpan()
+
+class _Span:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        global _dropped
+        t1 = time.perf_counter()
+        dt = t1 - self.t0
+        with _lock:
+            t = _timers.get(self.name)
+            if t is None:
+                t = _timers[self.name] = [0, 0.0, 0.0]
+            t[0] += 1
+            t[1] += dt
+            if dt > t[2]:
+                t[2] = dt
+            if _TRACE:
+                if len(_events) < _MAX_EVENTS:
+                    _events.append({"name": self.name, "ph": "X", "pid": os.getpid(),
+                                    "tid": threading.get_ident(), "ts": (self.t0 - _t_origin) * 1e6,
+                                    "dur": dt * 1e6})
+                else:
+                    _dropped += 1
+        return False
+
+def span(name: str):
+    return _Span(name) if ENABLED else _NULL
+
+def count(name: str, n: float = 1) -> None:
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+def enable(trace: bool = False) -> None:
+    global ENABLED, _TRACE
+    ENABLED, _TRACE = True, trace
+
+def disable() -> None:
+    global ENABLED, _TRACE
+    ENABLED, _TRACE = False, False
+
+def reset() -> None:
+    global _dropped, _t_origin
+    with _lock:
+        _counters.clear(); _timers.clear(); _events.clear()
+        _dropped = 0
+        _t_origin = time.perf_counter()
+
+def snapshot() -> dict:
+    with _lock:
+        timers = {k: {"calls": int(c), "total_ms": s * 1000, "mean_us": s / c * 1e6 if c else 0.0,
+                      "max_ms": m * 1000} for k, (c, s, m) in _timers.items()}
+        return {"counters": dict(_counters), "timers": timers, "trace_events": len(_events),
+                "trace_dropped": _dropped}
+
+def export_chrome_trace(path: str) -> int:
+    """Escribe el trace (JSON Trace Event Format). Devuelve la cantidad de eventos."""
+    with _lock:
+        events = list(_events)
+        counters = dict(_counters)
+    tids = {e["tid"] for e in events}
+    names = {t.ident: t.name for t in threading.enumerate()}
+    meta = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+             "args": {"name": names.get(tid, str(tid))}} for tid in tids]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": meta + events, "displayTimeUnit": "ms",
+                   "otherData": {"counters": counters}}, f)
+    return len(events)
+
+class RateLogger:
+    """
+    Cada `interval` segundos imprime tasas (deltas de contadores / tiempo) y el
+    reparto del tiempo entre spans desde el último log. Se llama en cada iteración.
+    """
+    RATES = (("selfplay.games", "games/s"), ("selfplay.positions", "positions/s"),
+             ("mcts.sims", "sims/s"), ("mcts.net_calls", "net-calls/s"), ("train.steps", "steps/s"))
+
+    def __init__(self, interval: float = 30.0, log=print):
+        self.interval = interval
+        self.log = log
+        self._t = time.perf_counter()
+        self._last = snapshot()
+
+    def maybe_log(self, force: bool = False) -> Optional[dict]:
+        now = time.perf_counter()
+        dt = now - self._t
+        if not ENABLED or (dt < self.interval and not force) or dt <= 0:
+            return None
+        snap = snapshot()
+        prev_c, prev_t = self._last["counters"], self._last["timers"]
+        rates = {label: (snap["counters"].get(k, 0) - prev_c.get(k, 0)) / dt for k, label in self.RATES}
+        spent = {k: v["total_ms"] - prev_t.get(k, {}).get("total_ms", 0.0) for k, v in snap["timers"].items()}
+        wall_ms = dt * 1000
+        self.log("[prof] " + " ".join(f"{label}={r:,.1f}" for label, r in rates.items()))
+        self.log("       " + " ".join(f"{k}={ms / wall_ms:.1%}" for k, ms in
+                                     sorted(spent.items(), key=lambda kv: -kv[1]) if ms > 0))
+        self._t, self._last = now, snap
+        return rates